@@ -0,0 +1,8 @@
+"""Performance benchmarks for specialsauce's hot paths.
+
+The benchmarks follow airspeed velocity (asv) conventions, so they can
+be tracked across releases with `asv run` (see asv.conf.json). They can
+also be run offline, in the current environment, with
+
+  python -m benchmarks.run [--json results.json] [substring ...]
+"""
@@ -0,0 +1,35 @@
+"""Synthetic inputs shared by the benchmarks."""
+import numpy as np
+
+
+def activity(hours, seed=0):
+  """A 1 Hz activity of the given duration.
+
+  Returns:
+    dict: arrays of 'time' (s), 'speed' (m/s) and 'grade' (decimal).
+  """
+  n = int(hours * 3600)
+  rng = np.random.default_rng(seed)
+
+  # Rolling terrain with some noise, and speed that slows on climbs.
+  grade = 0.15 * np.sin(np.arange(n) / 600) + rng.normal(0, 0.02, n)
+  speed = np.clip(3.5 - 6 * grade + rng.normal(0, 0.2, n), 0.5, None)
+
+  return {
+    'time': np.arange(n, dtype=float),
+    'speed': speed,
+    'grade': grade,
+  }
+
+
+def tss_history(years, athletes=1, seed=0):
+  """Daily TSS for some athletes, with about 2 rest days per week.
+
+  Returns:
+    numpy.ndarray: 1-D if `athletes` is 1, otherwise athletes x days.
+  """
+  rng = np.random.default_rng(seed)
+  shape = (athletes, int(years * 365))
+  tss = rng.gamma(4, 20, shape) * (rng.random(shape) > 2 / 7)
+
+  return tss[0] if athletes == 1 else tss
@@ -0,0 +1,85 @@
+"""Previous implementations of hot-path functions.
+
+These are kept only so the benchmarks can report before/after timings.
+They are not part of the package.
+"""
+from scipy.interpolate import interp1d
+import numpy as np
+
+
+def gap_speed_factor(decimal_grade):
+  decimal_grade = np.clip(decimal_grade, -0.45, 0.45)
+
+  adjustment_factors = {
+    45: 4.286, 30: 3.158, 25: 2.727, 20: 2.297, 15: 1.846, 10: 1.459,
+    8: 1.337, 6: 1.228, 4: 1.135, 2: 1.055, 0: 1.0, -2: 0.96, -4: 0.918,
+    -6: 0.891, -8: 0.876, -10: 0.876, -15: 0.941, -20: 1.081, -25: 1.273,
+    -30: 1.495, -45: 2.096
+  }
+
+  interp_fn = interp1d(
+    list(adjustment_factors.keys()),
+    list(adjustment_factors.values())
+  )
+
+  return interp_fn(decimal_grade * 100)
+
+
+def ngp_speed_factor(decimal_grade):
+  decimal_grade = np.clip(decimal_grade, -0.25, 0.3)
+
+  adjustment_factors = {
+    45: 28.235, 32: 20.0, 31: 3.556, 30: 3.429, 25: 2.874, 20: 2.365,
+    15: 1.905, 10: 1.514, 8: 1.383, 6: 1.266, 4: 1.162, 2: 1.074, 0: 1.0,
+    -2: 0.941, -4: 0.897, -6: 0.87, -8: 0.856, -10: 0.857, -15: 0.921,
+    -20: 1.067, -25: 1.28, -26: 1.33, -27: 2.051, -30: 2.297, -45: 3.934
+  }
+
+  interp_fn = interp1d(
+    list(adjustment_factors.keys()),
+    list(adjustment_factors.values())
+  )
+
+  return interp_fn(decimal_grade * 100)
+
+
+def ewma_days(x_array, n_days, init=0.0):
+  alpha = 1 / n_days
+  
+  return [
+    init * (1 - alpha) ** i + sum(
+      x_array[i - n] * alpha * (1 - alpha) ** n 
+      for n in range(i + 1)) 
+    for i in range(len(x_array))
+  ]
+
+
+def ewma_halflife(x_series, half_life, time_series):
+  """The zero-padded pandas EWMA (time-series branch only)."""
+  import pandas as pd
+
+  if isinstance(half_life, (int, float)):
+    half_life = pd.to_timedelta(half_life, unit='s')
+  elif isinstance(half_life, str):
+    half_life = pd.to_timedelta(half_life)
+
+  num_padding = int(half_life.seconds * 40)
+  x_series_pad = pd.Series(
+    [0.0 for i in range(num_padding)] + x_series.to_list()
+  )
+  time_series = time_series - time_series[0]
+  time_series_pad = pd.Series(
+    [i for i in range(num_padding)] + (time_series + num_padding).to_list(),
+  ).apply(pd.to_datetime, unit='s')
+
+  ewm_pad = x_series_pad.ewm(
+    halflife=half_life,
+    times=time_series_pad,
+    adjust=False,
+    ignore_na=True,
+  ).mean()
+
+  ewm = ewm_pad[num_padding:]
+  ewm.index = x_series.index
+
+  return ewm
@@ -0,0 +1,69 @@
+"""Benchmarks for metabolic power in `specialsauce.core`."""
+from specialsauce import core
+from benchmarks import _data
+
+
+class PowerMet:
+  """Metabolic power for 1-, 10- and 100-hour activities at 1 Hz."""
+  params = [1, 10, 100]
+  param_names = ['hours']
+
+  def setup(self, hours):
+    self.activity = _data.activity(hours)
+
+  def time_power_met_ss(self, hours):
+    core.power_met_ss(self.activity['speed'], self.activity['grade'])
+
+  def peakmem_power_met_ss(self, hours):
+    core.power_met_ss(self.activity['speed'], self.activity['grade'])
+
+  def time_power_met_ss_auto_gait(self, hours):
+    core.power_met_ss(
+      self.activity['speed'], self.activity['grade'], gait='auto',
+      walk_grade=0.15)
+
+  def time_power_met(self, hours):
+    core.power_met(
+      self.activity['speed'],
+      self.activity['grade'],
+      self.activity['time']
+    )
+
+  def peakmem_power_met(self, hours):
+    core.power_met(
+      self.activity['speed'],
+      self.activity['grade'],
+      self.activity['time']
+    )
+
+
+class PowerMetDtype:
+  """Metabolic power for a 100-hour activity in float64 and float32."""
+  params = ['float64', 'float32']
+  param_names = ['dtype']
+
+  def setup(self, dtype):
+    activity = _data.activity(100)
+    self.activity = {
+      'speed': activity['speed'].astype(dtype),
+      'grade': activity['grade'].astype(dtype),
+      # A 5-second pause every 10 minutes, so that the EWMA cannot use
+      # a linear filter. Times stay float64.
+      'time': activity['time'] + activity['time'] // 600 * 5,
+    }
+
+  def time_power_met(self, dtype):
+    core.power_met(
+      self.activity['speed'],
+      self.activity['grade'],
+      self.activity['time'],
+      dtype=dtype,
+    )
+
+  def peakmem_power_met(self, dtype):
+    core.power_met(
+      self.activity['speed'],
+      self.activity['grade'],
+      self.activity['time'],
+      dtype=dtype,
+    )
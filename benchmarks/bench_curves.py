@@ -0,0 +1,36 @@
+"""Benchmarks for mean-maximal curves in `specialsauce.curves`."""
+from specialsauce import core, curves
+from benchmarks import _data
+
+
+class MeanMaxCurve:
+  """Mean-maximal curve of metabolic power for 1- and 10-hour activities."""
+  params = [1, 10]
+  param_names = ['hours']
+
+  def setup(self, hours):
+    activity = _data.activity(hours)
+    self.power = core.power_met_ss(activity['speed'], activity['grade'])
+
+  def time_mean_max_curve(self, hours):
+    curves.mean_max_curve(self.power)
+
+  def peakmem_mean_max_curve(self, hours):
+    curves.mean_max_curve(self.power)
+
+
+class SeasonBest:
+  """Season-best curve from 200 one-hour activities."""
+
+  def setup(self):
+    self.activities = [
+      core.power_met_ss(a['speed'], a['grade'])
+      for a in (_data.activity(1, seed=seed) for seed in range(200))
+    ]
+
+  def time_batched(self):
+    curves.merge_curves(curves.mean_max_curves(self.activities))
+
+  def time_loop(self):
+    curves.merge_curves(
+      [curves.mean_max_curve(power) for power in self.activities])
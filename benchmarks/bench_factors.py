@@ -0,0 +1,87 @@
+"""Benchmarks for the grade adjustment factors.
+
+Written as airspeed velocity (asv) benchmarks. They can also be run
+without asv: `python -m benchmarks.run`.
+"""
+import numpy as np
+
+from specialsauce import models
+from specialsauce.sources.strava import gap_speed_factor
+from specialsauce.sources.trainingpeaks import ngp_speed_factor
+from benchmarks import _data, _legacy
+
+
+FUNCS = {
+  'gap': (gap_speed_factor, _legacy.gap_speed_factor),
+  'ngp': (ngp_speed_factor, _legacy.ngp_speed_factor),
+}
+
+
+class FactorScalar:
+  """1000 scalar calls, as in a per-sample Python loop."""
+  params = [list(FUNCS), ['legacy', 'interp', 'table']]
+  param_names = ['model', 'method']
+
+  def setup(self, model, method):
+    func, legacy_func = FUNCS[model]
+    self.grades = np.random.default_rng(0).uniform(-0.5, 0.5, 1000).tolist()
+    if method == 'legacy':
+      self.func = legacy_func
+    elif method == 'interp':
+      self.func = func
+    else:
+      self.func = lambda g: func(g, resolution=0.001)
+
+  def time_scalar_calls(self, model, method):
+    func = self.func
+    for g in self.grades:
+      func(g)
+
+
+class FactorVector:
+  """One call on a 1-million-sample grade array."""
+  params = [list(FUNCS), ['legacy', 'interp', 'table']]
+  param_names = ['model', 'method']
+
+  def setup(self, model, method):
+    func, legacy_func = FUNCS[model]
+    self.grades = np.random.default_rng(0).uniform(-0.5, 0.5, 1_000_000)
+    if method == 'legacy':
+      self.func = legacy_func
+    elif method == 'interp':
+      self.func = func
+    else:
+      self.func = lambda g: func(g, resolution=0.001)
+      self.func(self.grades[:1])
+
+  def time_vector(self, model, method):
+    self.func(self.grades)
+
+
+class FactorActivity:
+  """Factors for every sample of 1-, 10- and 100-hour activities."""
+  params = [list(FUNCS), [1, 10, 100]]
+  param_names = ['model', 'hours']
+
+  def setup(self, model, hours):
+    self.func = FUNCS[model][0]
+    self.grades = _data.activity(hours)['grade']
+
+  def time_factor(self, model, hours):
+    self.func(self.grades)
+
+  def peakmem_factor(self, model, hours):
+    self.func(self.grades)
+
+
+class EvaluateMany:
+  """Every registered model on a 1-million-sample grade array."""
+
+  def setup(self):
+    self.grades = np.random.default_rng(0).uniform(-0.5, 0.5, 1_000_000)
+
+  def time_evaluate_many(self):
+    models.evaluate_many(self.grades)
+
+  def peakmem_evaluate_many(self):
+    models.evaluate_many(self.grades)
@@ -0,0 +1,17 @@
+"""Import-time benchmarks, each run in a fresh interpreter."""
+
+
+class Import:
+  params = [
+    'numpy',
+    'specialsauce.sources.minetti',
+    'specialsauce.sources.strava',
+    'specialsauce.sources.trainingpeaks',
+    'specialsauce.core',
+    'pandas',
+    'scipy.signal',
+  ]
+  param_names = ['module']
+
+  def timeraw_import(self, module):
+    return f'import {module}'
@@ -0,0 +1,31 @@
+"""Benchmarks for `specialsauce.resample`."""
+import numpy as np
+
+from specialsauce import core, resample
+from benchmarks import _data
+
+
+class Resample:
+  """Smart-recorded 10-hour activity, with a pause every 20 minutes."""
+
+  def setup(self):
+    activity = _data.activity(10)
+    rng = np.random.default_rng(0)
+    keep = np.sort(rng.choice(
+      len(activity['time']), len(activity['time']) // 3, replace=False))
+    self.time = activity['time'][keep] + activity['time'][keep] // 1200 * 120
+    self.speed = activity['speed'][keep]
+    self.grade = activity['grade'][keep]
+
+  def time_resample(self):
+    resample.resample(self.time, self.speed, self.grade)
+
+  def peakmem_resample(self):
+    resample.resample(self.time, self.speed, self.grade)
+
+  def time_power_met_irregular(self):
+    core.power_met(self.speed, self.grade, self.time)
+
+  def time_power_met_resampled(self):
+    streams = resample.resample(self.time, self.speed, self.grade)
+    core.power_met(streams['speed'], streams['grade'])
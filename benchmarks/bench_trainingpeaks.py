@@ -0,0 +1,96 @@
+"""Benchmarks for NGP and training load in `specialsauce.sources.trainingpeaks`."""
+import numpy as np
+
+from specialsauce import fitness
+from specialsauce.sources import trainingpeaks
+from benchmarks import _data, _legacy
+
+
+class Normalize:
+  """NGP for 1-, 10- and 100-hour activities at 1 Hz."""
+  params = [1, 10, 100]
+  param_names = ['hours']
+
+  def setup(self, hours):
+    self.activity = _data.activity(hours)
+    self.ngp_speed = self.activity['speed'] * trainingpeaks.ngp_speed_factor(
+      self.activity['grade'])
+
+  def time_normalize(self, hours):
+    trainingpeaks.normalize(self.ngp_speed)
+
+  def peakmem_normalize(self, hours):
+    trainingpeaks.normalize(self.ngp_speed)
+
+  def time_normalize_time_series(self, hours):
+    trainingpeaks.normalize(
+      self.ngp_speed, time_series=self.activity['time'])
+
+  def peakmem_normalize_time_series(self, hours):
+    trainingpeaks.normalize(
+      self.ngp_speed, time_series=self.activity['time'])
+
+
+class EwmaDays:
+  """CTL over multi-year daily TSS histories."""
+  params = [[1, 5, 20], [1, 1000]]
+  param_names = ['years', 'athletes']
+
+  def setup(self, years, athletes):
+    self.tss = _data.tss_history(years, athletes)
+
+  def time_ewma_days(self, years, athletes):
+    trainingpeaks.ewma_days(self.tss, 42)
+
+  def peakmem_ewma_days(self, years, athletes):
+    trainingpeaks.ewma_days(self.tss, 42)
+
+
+class EwmaDaysLegacy:
+  """The previous, quadratic CTL, on a single athlete's history."""
+  params = [1, 5]
+  param_names = ['years']
+  timeout = 600
+
+  def setup(self, years):
+    self.tss = _data.tss_history(years)
+
+  def time_ewma_days(self, years):
+    _legacy.ewma_days(self.tss, 42)
+
+
+class TrainingLoadTable:
+  """ATL, CTL, TSB and status from a long table of daily TSS."""
+  params = [10, 1000]
+  param_names = ['athletes']
+
+  def setup(self, athletes):
+    import pandas as pd
+
+    tss = _data.tss_history(2, athletes).reshape(athletes, -1)
+    athlete, day = np.nonzero(tss)
+    self.table = pd.DataFrame({
+      'athlete': athlete,
+      'date': np.datetime64('2022-01-01') + day.astype('timedelta64[D]'),
+      'tss': tss[athlete, day],
+    })
+
+  def time_training_load_table(self, athletes):
+    fitness.training_load_table(self.table)
+
+  def peakmem_training_load_table(self, athletes):
+    fitness.training_load_table(self.table)
+
+
+class TrainingLoadTableGroupby:
+  """The groupby-apply approach the table replaces, for CTL alone."""
+  params = [10, 1000]
+  param_names = ['athletes']
+  timeout = 600
+
+  setup = TrainingLoadTable.setup
+
+  def time_chronic_training_load(self, athletes):
+    self.table.groupby('athlete')[['date', 'tss']].apply(
+      lambda group: trainingpeaks.chronic_training_load(
+        group['tss'], dates=group['date']))
@@ -0,0 +1,62 @@
+"""Benchmarks for the moving averages in `specialsauce.util`."""
+import math
+
+import numpy as np
+import pandas as pd
+
+from specialsauce import util
+from benchmarks import _data, _legacy
+
+
+HALF_LIFE = 20 * math.log(2)
+
+
+class EwmaHalflife:
+  """EWMA of a 10-hour activity recorded at 1 Hz."""
+  params = [['regular', 'irregular'], ['legacy', 'pandas', 'native']]
+  param_names = ['sampling', 'method']
+
+  def setup(self, sampling, method):
+    n = 36000
+    rng = np.random.default_rng(0)
+    self.x = pd.Series(rng.uniform(0, 20, n))
+    if sampling == 'regular':
+      self.t = pd.Series(np.arange(n))
+    else:
+      self.t = pd.Series(np.cumsum(rng.choice([1, 1, 1, 2, 5], n)))
+
+    if method == 'legacy':
+      # Skips the benchmark (by raising NotImplementedError) on pandas
+      # versions that do not support `times` with `adjust=False`.
+      _legacy.ewma_halflife(self.x[:2], HALF_LIFE, self.t[:2])
+    elif method == 'pandas' and sampling != 'regular':
+      raise NotImplementedError
+
+  def time_ewma_halflife(self, sampling, method):
+    if method == 'legacy':
+      _legacy.ewma_halflife(self.x, HALF_LIFE, self.t)
+    elif method == 'pandas':
+      # Lower bound for any pandas-based approach on regular samples.
+      pd.concat([pd.Series([0.0]), self.x]).ewm(
+        halflife=HALF_LIFE, adjust=False).mean()
+    else:
+      util.ewma_halflife(self.x, HALF_LIFE, time_series=self.t)
+
+
+class EwmaHalflifeDuration:
+  """EWMA of 1-, 10- and 100-hour activities recorded at 1 Hz."""
+  params = [[1, 10, 100], ['regular', 'irregular']]
+  param_names = ['hours', 'sampling']
+
+  def setup(self, hours, sampling):
+    activity = _data.activity(hours)
+    self.x = activity['speed']
+    self.t = activity['time']
+    if sampling == 'irregular':
+      self.t = self.t + np.random.default_rng(0).uniform(0, 0.5, len(self.t))
+
+  def time_ewma_halflife(self, hours, sampling):
+    util.ewma_halflife(self.x, HALF_LIFE, time_series=self.t)
+
+  def peakmem_ewma_halflife(self, hours, sampling):
+    util.ewma_halflife(self.x, HALF_LIFE, time_series=self.t)
@@ -0,0 +1,139 @@
+"""Run the benchmarks without asv.
+
+Usage:
+  python -m benchmarks.run [--json PATH] [--repeat N] [substring ...]
+
+Only benchmarks whose `module.Class.method` name contains one of the
+given substrings are run. `time_*` methods report the best time for one
+call; `peakmem_*` methods report the peak memory allocated during one
+call (traced with tracemalloc, so it counts allocations made through
+Python and NumPy, not the process's total footprint as asv does).
+`timeraw_*` methods return code that is timed in a fresh interpreter
+(excluding the interpreter's own startup), eg to measure import time.
+"""
+import argparse
+import gc
+import importlib
+import inspect
+import itertools
+import json
+import pkgutil
+import subprocess
+import sys
+import timeit
+import tracemalloc
+
+import benchmarks
+
+
+PREFIXES = ('time_', 'peakmem_', 'timeraw_')
+
+
+def iter_benchmarks():
+  """Yield (name, class, method name) for every benchmark method."""
+  for info in pkgutil.iter_modules(benchmarks.__path__):
+    if not info.name.startswith('bench_'):
+      continue
+    module = importlib.import_module(f'benchmarks.{info.name}')
+    for cls_name, cls in inspect.getmembers(module, inspect.isclass):
+      if cls.__module__ != module.__name__:
+        continue
+      for meth_name, _ in inspect.getmembers(cls, inspect.isfunction):
+        if meth_name.startswith(PREFIXES):
+          yield f'{info.name}.{cls_name}.{meth_name}', cls, meth_name
+
+
+def iter_params(cls):
+  params = getattr(cls, 'params', None)
+  if params is None:
+    return [()]
+  if not params or not isinstance(params[0], (list, tuple)):
+    params = [params]
+  return itertools.product(*params)
+
+
+def run_benchmark(cls, meth_name, params, repeat=3):
+  """Seconds per call (time_*) or peak bytes (peakmem_), or None if skipped."""
+  bench = cls()
+  if hasattr(bench, 'setup'):
+    try:
+      bench.setup(*params)
+    except NotImplementedError:
+      # asv's convention for skipping a parameter combination.
+      return None
+  method = getattr(bench, meth_name)
+
+  try:
+    if meth_name.startswith('timeraw_'):
+      return min(
+        _time_in_subprocess(method(*params)) for _ in range(repeat))
+    elif meth_name.startswith('time_'):
+      number, _ = timeit.Timer(lambda: method(*params)).autorange()
+      times = timeit.repeat(
+        lambda: method(*params), number=number, repeat=repeat)
+      return min(times) / number
+    else:
+      gc.collect()
+      tracemalloc.start()
+      try:
+        method(*params)
+        return tracemalloc.get_traced_memory()[1]
+      finally:
+        tracemalloc.stop()
+  finally:
+    if hasattr(bench, 'teardown'):
+      bench.teardown(*params)
+
+
+def _time_in_subprocess(code):
+  wrapper = (
+    'import time\n'
+    't = time.perf_counter()\n'
+    f'exec({code!r})\n'
+    'print(time.perf_counter() - t)\n'
+  )
+  output = subprocess.run(
+    [sys.executable, '-c', wrapper],
+    check=True, capture_output=True, text=True
+  ).stdout
+  return float(output.strip().splitlines()[-1])
+
+
+def format_result(meth_name, value):
+  if value is None:
+    return 'skipped'.rjust(11)
+  if meth_name.startswith('peakmem_'):
+    for unit, scale in (('GB', 2**30), ('MB', 2**20), ('kB', 2**10)):
+      if value >= scale:
+        return f'{value / scale:8.3f} {unit}'
+    return f'{value:8.0f}  B'
+  for unit, scale in (('s', 1), ('ms', 1e-3), ('us', 1e-6)):
+    if value >= scale:
+      return f'{value / scale:8.3f} {unit}'
+  return f'{value / 1e-9:8.3f} ns'
+
+
+def main(argv=None):
+  parser = argparse.ArgumentParser(prog='python -m benchmarks.run')
+  parser.add_argument('patterns', nargs='*')
+  parser.add_argument('--json', help='also write the results to this file')
+  parser.add_argument('--repeat', type=int, default=3)
+  args = parser.parse_args(argv)
+
+  results = {}
+  for name, cls, meth_name in iter_benchmarks():
+    if args.patterns and not any(p in name for p in args.patterns):
+      continue
+    for params in iter_params(cls):
+      label = f'{name}({", ".join(map(str, params))})'
+      value = run_benchmark(cls, meth_name, params, repeat=args.repeat)
+      results[label] = value
+      print(f'{label:<72} {format_result(meth_name, value)}', flush=True)
+
+  if args.json:
+    with open(args.json, 'w') as f:
+      json.dump(results, f, indent=2)
+
+
+if __name__ == '__main__':
+  main()
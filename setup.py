@@ -42,8 +42,11 @@ setup(
   #   'Documentation': 'https://specialsauce.readthedocs.io/en/stable/',
   # },
   license='MIT',
-  packages=find_packages(),
+  packages=find_packages(exclude=['benchmarks', 'tests']),
   include_package_data=True,
+  entry_points={
+    'console_scripts': ['specialsauce=specialsauce.cli:main'],
+  },
   classifiers=[
     'License :: OSI Approved :: MIT License',
     'Intended Audience :: Developers',
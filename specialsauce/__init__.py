@@ -1 +1,7 @@
 __version__ = '0.0.3a2'
+
+import os as _os
+
+if _os.environ.get('SPECIALSAUCE_PROFILE'):
+  from specialsauce import profiling as _profiling
+  _profiling.profile_from_env()
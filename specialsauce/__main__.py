@@ -0,0 +1,4 @@
+from specialsauce.cli import main
+
+
+main()
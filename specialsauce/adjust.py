@@ -0,0 +1,115 @@
+"""Grade-adjusted speed for whole activities, and its inverses.
+
+Three models of the speed adjustment for grade are available:
+
+  * 'strava': Strava's Grade Adjusted Pace (GAP), see
+    `strava.gap_speed_factor`.
+  * 'trainingpeaks': TrainingPeaks' Normalized Graded Pace (NGP), see
+    `trainingpeaks.ngp_speed_factor`.
+  * 'minetti': the flat speed with the same metabolic power, according
+    to Minetti (2002), see `core.power_met_ss`.
+
+Each adjustment factor is U-shaped in grade, so a given factor is
+reached at (up to) one downhill and one uphill grade. Inverse lookups
+use precomputed monotonic segments of each model's factor curve.
+
+The models themselves live in the `models` registry; any registered
+speed-factor model (or a GradeModel) may be passed as `model`.
+"""
+import numpy as np
+
+from specialsauce import models, util
+
+
+MODELS = ('strava', 'trainingpeaks', 'minetti')
+
+
+def minetti_speed_factor(decimal_grade):
+  """Ratio of flat speed to horizontal speed at equal metabolic power.
+
+  Args:
+    decimal_grade (float or array-like): decimal grade of terrain.
+  Returns:
+    float or numpy.ndarray: Factor that converts speed to the flat
+    speed with the same metabolic power.
+  """
+  return models.get('minetti')(decimal_grade)
+
+
+def speed_factor(decimal_grade, model='strava'):
+  """The factor that converts speed to grade-adjusted speed."""
+  return models.get(model)(decimal_grade)
+
+
+def adjusted_speed(speed, grade, model='strava'):
+  """Convert actual (horizontal) speed to grade-adjusted speed.
+
+  Args:
+    speed (array-like): horizontal speed, in m/s.
+    grade (array-like): decimal grade.
+    model (str): 'strava', 'trainingpeaks' or 'minetti'.
+
+  Returns:
+    numpy.ndarray, or pandas.Series if `speed` or `grade` is a Series.
+  """
+  result = np.asarray(speed, dtype=float) * speed_factor(
+    np.asarray(grade, dtype=float), model)
+  return util.wrap_like(result, speed, grade)
+
+
+def actual_speed_for_adjusted(adjusted_speed, grade, model='strava'):
+  """Convert grade-adjusted speed back to actual (horizontal) speed.
+
+  For example, the speed to run up a given grade at the effort of a
+  given flat speed.
+
+  Args:
+    adjusted_speed (array-like): grade-adjusted speed, in m/s.
+    grade (array-like): decimal grade.
+    model (str): 'strava', 'trainingpeaks' or 'minetti'.
+
+  Returns:
+    numpy.ndarray, or pandas.Series if either input is a Series.
+  """
+  result = np.asarray(adjusted_speed, dtype=float) / speed_factor(
+    np.asarray(grade, dtype=float), model)
+  return util.wrap_like(result, adjusted_speed, grade)
+
+
+def grade_for_factor(factor, model='strava', side='uphill'):
+  """The grade at which the model's adjustment factor is `factor`.
+
+  Args:
+    factor (array-like): adjustment factor(s).
+    model (str): 'strava', 'trainingpeaks' or 'minetti'.
+    side (str): 'uphill' or 'downhill' - which side of the factor's
+      minimum to look on.
+
+  Returns:
+    numpy.ndarray: decimal grade, or NaN where the factor is not
+    reached on that side within the model's valid range of grades. Where
+    the factor is constant over a range of grades, the grade closest to
+    the factor's minimum is returned.
+  """
+  return models.get(model).inverse(factor, side=side)
+
+
+def grade_for_adjusted(speed, adjusted_speed, model='strava', side='uphill'):
+  """The grade at which `speed` is equivalent to `adjusted_speed`.
+
+  For example, the steepest climb that can be run at a given speed
+  without exceeding the effort of a given flat speed.
+
+  Args:
+    speed (array-like): horizontal speed, in m/s.
+    adjusted_speed (array-like): grade-adjusted speed, in m/s.
+    model (str): 'strava', 'trainingpeaks' or 'minetti'.
+    side (str): 'uphill' or 'downhill'.
+
+  Returns:
+    numpy.ndarray: decimal grade, or NaN if there is no such grade.
+  """
+  with np.errstate(divide='ignore', invalid='ignore'):
+    factor = np.asarray(adjusted_speed, dtype=float) / np.asarray(
+      speed, dtype=float)
+  return grade_for_factor(factor, model=model, side=side)
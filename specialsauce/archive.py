@@ -0,0 +1,280 @@
+"""Columnar activity archives, memory-mapped from disk.
+
+An archive holds equal-length columns (eg 'time', 'speed' and 'grade'
+at 1 Hz over several years) in one binary file:
+
+  bytes 0-7     magic, b'SSARCHV1'
+  bytes 8-11    header length H, as a little-endian uint32
+  bytes 12-     H bytes of UTF-8 JSON:
+                  {"length": n, "columns": [
+                    {"name": "speed", "dtype": "<f8", "offset": 64},
+                    ...]}
+  at offset     each column's n values, contiguous, starting at its
+                byte offset from the start of the file. Offsets are
+                multiples of 64.
+
+Columns are opened with `numpy.memmap`, so only the pages that are used
+are read, and archives larger than RAM can be processed in windows with
+`evaluate_archive`.
+"""
+import collections.abc
+import json
+import os
+import struct
+
+import numpy as np
+
+from specialsauce import streaming
+from specialsauce.sources import strava, trainingpeaks
+
+
+MAGIC = b'SSARCHV1'
+
+# Byte alignment of each column's data.
+ALIGNMENT = 64
+
+# Samples evaluated at a time by `evaluate_archive`: a bit over 12 days
+# at 1 Hz, or about 8 MB per float64 column.
+WINDOW_SIZE = 1 << 20
+
+
+class Archive(collections.abc.Mapping):
+  """The columns of an archive file, as memory-mapped arrays.
+
+  An Archive is a mapping of column names to arrays, so it can be used
+  wherever a dict of arrays or a DataFrame of streams is, eg in
+  `batch.activity_summary`. Its `len` is the number of columns; the
+  number of samples is `length`.
+
+  Args:
+    path (str): path to the archive file.
+    mode (str): 'r' to open the columns read-only, or 'r+' to write
+      to them in place.
+  """
+  def __init__(self, path, mode='r'):
+    self.path = path
+    with open(path, 'rb') as f:
+      header = _read_header(f)
+
+    self.length = header['length']
+    self._columns = {
+      column['name']: _map_column(
+        path, column['dtype'], column['offset'], self.length, mode)
+      for column in header['columns']
+    }
+
+  def __getitem__(self, name):
+    return self._columns[name]
+
+  def __iter__(self):
+    return iter(self._columns)
+
+  def __len__(self):
+    return len(self._columns)
+
+  def windows(self, size=WINDOW_SIZE):
+    """Generate the columns in consecutive windows of `size` samples.
+
+    Yields:
+      dict: views of each column over the window.
+    """
+    for start in range(0, self.length, size):
+      yield {
+        name: column[start:start + size]
+        for name, column in self._columns.items()
+      }
+
+  def flush(self):
+    """Write any changes to the columns to disk."""
+    for column in self._columns.values():
+      if isinstance(column, np.memmap):
+        column.flush()
+
+
+def open_archive(path, mode='r'):
+  """Open an archive file. See `Archive`."""
+  return Archive(path, mode=mode)
+
+
+def create_archive(path, length, dtypes):
+  """Create an archive of zero-filled columns, open for writing.
+
+  The file is extended to its full size without writing the data, so
+  creating a large archive is fast (and sparse on most file systems).
+
+  Args:
+    path (str): path of the file to create. Any existing file is
+      overwritten.
+    length (int): number of samples in each column.
+    dtypes (mapping): dtype of each column, by name, in file order.
+
+  Returns:
+    Archive: the new archive, opened with mode 'r+'.
+
+  Raises:
+    ValueError: if a dtype is not a fixed-size numeric or datetime type.
+  """
+  columns = []
+  for name, dtype in dtypes.items():
+    dtype = np.dtype(dtype)
+    if dtype.hasobject or dtype.kind not in 'biufcmM':
+      raise ValueError(f'Column {name!r} has unsupported dtype {dtype}.')
+    columns.append({'name': str(name), 'dtype': dtype.str})
+
+  # Column offsets depend on the header's length, which depends on the
+  # offsets, so start the data after the header and recheck.
+  data_start = ALIGNMENT
+  while True:
+    offset = data_start
+    for column in columns:
+      column['offset'] = offset
+      offset = _align(offset + length * np.dtype(column['dtype']).itemsize)
+    header = json.dumps({'length': length, 'columns': columns}).encode()
+    if len(MAGIC) + 4 + len(header) <= data_start:
+      break
+    data_start = _align(len(MAGIC) + 4 + len(header))
+
+  with open(path, 'wb') as f:
+    f.write(MAGIC)
+    f.write(struct.pack('<I', len(header)))
+    f.write(header)
+    f.truncate(offset)
+
+  return Archive(path, mode='r+')
+
+
+def write_archive(path, columns):
+  """Write equal-length columns to a new archive file.
+
+  Args:
+    path (str): path of the file to create. Any existing file is
+      overwritten.
+    columns (mapping): arrays of numbers or datetimes, by name, eg a
+      dict of arrays or a DataFrame. Arrays may themselves be memory
+      mapped.
+
+  Returns:
+    Archive: the new archive, opened with mode 'r+'.
+  """
+  arrays = {name: np.asarray(columns[name]) for name in columns}
+  lengths = {len(array) for array in arrays.values()}
+  if len(lengths) > 1:
+    raise ValueError('Columns must all have the same length.')
+
+  archive = create_archive(
+    path,
+    lengths.pop() if lengths else 0,
+    {name: array.dtype for name, array in arrays.items()},
+  )
+  for name, array in arrays.items():
+    archive[name][:] = array
+  archive.flush()
+
+  return archive
+
+
+def evaluate_archive(
+  archive,
+  out=None,
+  tau=20,
+  window='30s',
+  window_size=WINDOW_SIZE,
+  time_col='time',
+  speed_col='speed',
+  grade_col='grade',
+):
+  """Calculate metabolic power, GAP and NGP over an archive, in windows.
+
+  Each window of samples is read from disk, evaluated and (optionally)
+  written out before the next one is read. The EWMA of metabolic power
+  and the rolling average of NGP carry their state from one window to
+  the next, so the results are the same as evaluating the whole
+  archive at once, with memory bounded by `window_size`.
+
+  Args:
+    archive (Archive or str): the archive, or the path to it.
+    out (str): if given, path of an archive to write with the
+      'power_met' (W/kg), 'gap_speed' and 'ngp_speed' (m/s) of each
+      sample.
+    tau (float): time constant of the metabolic response, in seconds.
+      See `core.power_met`.
+    window (int, float, str, or pandas.Timedelta): duration of NGP's
+      rolling average. See `trainingpeaks.normalize`.
+    window_size (int): number of samples evaluated at a time.
+    time_col (str): name of the column of seconds (or datetimes). If
+      missing, samples are assumed to be 1 second apart.
+    speed_col (str): name of the column of speeds, in m/s.
+    grade_col (str): name of the column of decimal grades. If missing,
+      the terrain is assumed to be flat.
+
+  Returns:
+    dict: mean metabolic power (W/kg) and mean GAP (m/s) over the
+    samples, and NGP (m/s) of the whole archive.
+  """
+  if isinstance(archive, (str, os.PathLike)):
+    archive = open_archive(archive)
+
+  output = None
+  if out is not None:
+    output = create_archive(
+      out,
+      archive.length,
+      dict.fromkeys(('power_met', 'gap_speed', 'ngp_speed'), float),
+    )
+
+  power_stream = streaming.PowerMetStream(tau=tau)
+  ngp_stream = streaming.NormalizeStream(window=window)
+  sums = {'power_met': 0.0, 'gap_speed': 0.0}
+  counts = dict.fromkeys(sums, 0)
+
+  for start, chunk in zip(
+    range(0, archive.length, window_size), archive.windows(window_size)
+  ):
+    speed = np.asarray(chunk[speed_col], dtype=float)
+    grade = chunk[grade_col] if grade_col in chunk else None
+    time = chunk[time_col] if time_col in chunk else None
+
+    results = {'power_met': power_stream.update(speed, grade, time)}
+    if grade is None:
+      results['gap_speed'] = results['ngp_speed'] = speed
+    else:
+      results['gap_speed'] = speed * strava.gap_speed_factor(grade)
+      results['ngp_speed'] = speed * trainingpeaks.ngp_speed_factor(grade)
+    ngp_stream.update(results['ngp_speed'], time=time)
+
+    for name in sums:
+      sums[name] += np.nansum(results[name])
+      counts[name] += np.count_nonzero(~np.isnan(results[name]))
+
+    if output is not None:
+      for name, values in results.items():
+        output[name][start:start + len(speed)] = values
+
+  if output is not None:
+    output.flush()
+
+  summary = {
+    name: sums[name] / counts[name] if counts[name] else np.nan
+    for name in sums
+  }
+  summary['ngp'] = ngp_stream.value
+
+  return summary
+
+
+def _read_header(f):
+  if f.read(len(MAGIC)) != MAGIC:
+    raise ValueError(f'{f.name} is not an archive file.')
+  header_len, = struct.unpack('<I', f.read(4))
+  return json.loads(f.read(header_len))
+
+
+def _align(offset):
+  return -(-offset // ALIGNMENT) * ALIGNMENT
+
+
+def _map_column(path, dtype, offset, length, mode):
+  # numpy.memmap cannot map zero bytes.
+  if not length:
+    return np.empty(0, dtype=dtype)
+  return np.memmap(path, dtype=dtype, mode=mode, offset=offset, shape=(length,))
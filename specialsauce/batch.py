@@ -0,0 +1,194 @@
+"""Summaries of many activities at once.
+
+Each activity is a table of streams with (at least) a speed column, and
+optionally time and grade columns. Activities can be given as
+DataFrames or as paths to CSV or Parquet files.
+"""
+import concurrent.futures
+import functools
+import os
+
+import numpy as np
+import pandas as pd
+
+from specialsauce import resample, util
+from specialsauce.sources import trainingpeaks
+
+
+ACTIVITY_EXTENSIONS = ('.csv', '.parquet')
+
+
+def read_activity(path):
+  """Read an activity's streams from a CSV or Parquet file.
+
+  Reading Parquet requires pyarrow or fastparquet.
+  """
+  ext = os.path.splitext(path)[1].lower()
+  if ext == '.csv':
+    return pd.read_csv(path)
+  elif ext == '.parquet':
+    return pd.read_parquet(path)
+  raise ValueError(f'Unsupported activity file type: {path}')
+
+
+def find_activities(directory):
+  """List the CSV and Parquet files in a directory, sorted by name."""
+  return sorted(
+    os.path.join(directory, f) for f in os.listdir(directory)
+    if os.path.splitext(f)[1].lower() in ACTIVITY_EXTENSIONS
+  )
+
+
+def activity_summary(
+  activity,
+  threshold_speed,
+  time_col='time',
+  speed_col='speed',
+  grade_col='grade',
+  max_gap=resample.MAX_GAP,
+):
+  """Calculate NGP, IF and TSS for one activity.
+
+  Args:
+    activity (pandas.DataFrame, mapping or str): the activity's streams
+      (a DataFrame, or a dict of arrays keyed by column name), or the
+      path to a file containing them.
+    threshold_speed (float): functional threshold speed, in m/s, which
+      plays the role of FTP for NGP.
+    time_col (str): name of the column of seconds since the start of
+      the activity (or datetimes). If missing, samples are assumed to
+      be 1 second apart.
+    speed_col (str): name of the column of speeds, in m/s.
+    grade_col (str): name of the column of decimal grades. If missing,
+      the activity is assumed to be flat.
+    max_gap (float): longest gap in seconds between samples that is not
+      a pause. A sample after a pause only adds one second's distance,
+      rather than its speed over the whole gap.
+
+  Returns:
+    dict: duration (s, elapsed, including pauses), distance (m),
+    average speed (m/s, over the elapsed duration), NGP (m/s),
+    intensity factor, and TSS.
+  """
+  if isinstance(activity, (str, os.PathLike)):
+    activity = read_activity(activity)
+
+  speed = np.asarray(activity[speed_col], dtype=float)
+  n = len(speed)
+
+  if time_col in activity:
+    t = util.to_seconds(activity[time_col])
+  else:
+    t = np.arange(n, dtype=float)
+
+  if grade_col in activity:
+    ngp_speed = speed * trainingpeaks.ngp_speed_factor(
+      np.asarray(activity[grade_col], dtype=float))
+  else:
+    ngp_speed = speed
+
+  # Each sample covers the second leading up to its timestamp.
+  duration = t[-1] - t[0] + 1 if n else 0.0
+  distance = np.nansum(speed * resample.sample_weights(t, max_gap))
+  ngp = trainingpeaks.normalize(ngp_speed, time_series=t) if n else np.nan
+
+  return {
+    'duration': duration,
+    'distance': distance,
+    'avg_speed': distance / duration if duration else np.nan,
+    'ngp': ngp,
+    'intensity_factor': ngp / threshold_speed,
+    'tss': trainingpeaks.training_stress_score(ngp, threshold_speed, duration),
+  }
+
+
+def summarize_activities(
+  activities,
+  threshold_speed,
+  processes=None,
+  chunksize=1,
+  **kwargs
+):
+  """Calculate NGP, IF and TSS for many activities.
+
+  Activities are summarized in a pool of worker processes. Paths are
+  read by the workers, so only the file names are sent between
+  processes.
+
+  Args:
+    activities: a directory containing CSV/Parquet files, a mapping of
+      names to DataFrames (or paths), or an iterable of DataFrames or
+      paths.
+    threshold_speed (float): functional threshold speed, in m/s.
+    processes (int): number of worker processes. Defaults to the number
+      of CPUs. If 1, activities are summarized in this process.
+    chunksize (int): number of activities sent to a worker at a time.
+      Larger chunks cut inter-process overhead for many small
+      activities.
+    **kwargs: column names and `max_gap`, passed on to
+      `activity_summary`.
+
+  Returns:
+    pandas.DataFrame: one row per activity, indexed by name (file name
+    without extension, mapping key, or position in the iterable).
+  """
+  names, items = _collect_activities(activities)
+
+  summarize = functools.partial(
+    activity_summary, threshold_speed=threshold_speed, **kwargs)
+
+  if processes == 1:
+    rows = list(map(summarize, items))
+  else:
+    with concurrent.futures.ProcessPoolExecutor(processes) as executor:
+      rows = list(executor.map(summarize, items, chunksize=chunksize))
+
+  return pd.DataFrame(
+    rows,
+    index=pd.Index(names, name='activity'),
+    columns=[
+      'duration', 'distance', 'avg_speed', 'ngp', 'intensity_factor', 'tss'
+    ],
+  )
+
+
+def _collect_activities(activities):
+  """Return lists of names and activities (streams or paths)."""
+  if isinstance(activities, (str, os.PathLike)):
+    paths = find_activities(activities)
+    return _path_names(paths), paths
+
+  if hasattr(activities, 'items'):
+    names, items = zip(*activities.items()) if activities else ((), ())
+    return list(names), list(items)
+
+  items = list(activities)
+  is_path = [isinstance(item, (str, os.PathLike)) for item in items]
+  path_names = iter(_path_names(
+    [item for item, path in zip(items, is_path) if path]))
+  names = [
+    next(path_names) if path else i for i, path in enumerate(is_path)]
+  return names, items
+
+
+def _path_names(paths):
+  """Name activity files by file name, without the extension.
+
+  If two files would get the same name (eg 'a/run.csv' and 'b/run.csv'),
+  each is named by its path relative to the files' common directory
+  instead.
+
+  Raises:
+    ValueError: if the same file is given more than once.
+  """
+  names = [os.path.splitext(os.path.basename(p))[0] for p in paths]
+  if len(set(names)) == len(names):
+    return names
+
+  paths = [os.path.abspath(p) for p in paths]
+  if len(set(paths)) < len(paths):
+    duplicates = sorted({p for p in paths if paths.count(p) > 1})
+    raise ValueError(f'Activity files given more than once: {duplicates}')
+
+  common = os.path.commonpath(paths)
+  return [os.path.relpath(p, common) for p in paths]
@@ -0,0 +1,121 @@
+"""Command-line interface, installed as the `specialsauce` command."""
+import argparse
+import os
+import sys
+
+from specialsauce import batch, fitting
+
+
+def main(argv=None):
+  parser = argparse.ArgumentParser(
+    prog='specialsauce',
+    description='Physiological formulas in Python',
+  )
+  subparsers = parser.add_subparsers(dest='command', required=True)
+
+  summarize = subparsers.add_parser(
+    'summarize',
+    help='Calculate NGP, IF and TSS for a set of activities.',
+    description=(
+      'Calculate NGP, IF and TSS for activity files (CSV or Parquet) '
+      'with time, speed and grade columns.'
+    ),
+  )
+  summarize.add_argument(
+    'paths', nargs='+',
+    help='activity files, or directories containing them',
+  )
+  summarize.add_argument(
+    '--threshold-speed', type=float, required=True,
+    help='functional threshold speed, in m/s',
+  )
+  summarize.add_argument(
+    '-o', '--output',
+    help='CSV file to write the summary to (default: standard output)',
+  )
+  summarize.add_argument(
+    '-j', '--processes', type=int, default=None,
+    help='number of worker processes (default: number of CPUs)',
+  )
+  summarize.add_argument(
+    '--chunksize', type=int, default=1,
+    help='number of activities sent to a worker at a time',
+  )
+  for col in ('time', 'speed', 'grade'):
+    summarize.add_argument(
+      f'--{col}-col', default=col,
+      help=f'name of the {col} column (default: {col})',
+    )
+
+  fit = subparsers.add_parser(
+    'fit-factors',
+    help='Fit grade adjustment factors to the NGP/GAP dataset.',
+    description=(
+      'Fit GAP and NGP speed factors to the packaged pace dataset, and '
+      'write a factor table for each plus a report of the fit errors.'
+    ),
+  )
+  fit.add_argument(
+    '-o', '--output-dir', required=True,
+    help='directory to write GAP.csv, NGP.csv and report.csv to',
+  )
+  fit.add_argument(
+    '--method', choices=fitting.METHODS, default='pchip',
+    help='model to fit (default: pchip)',
+  )
+  fit.add_argument(
+    '--degree', type=int, default=5,
+    help='degree of the poly model (default: 5)',
+  )
+  fit.add_argument(
+    '--pace', type=float, default=480.0,
+    help='actual pace, in seconds, of the rows to fit (default: 480)',
+  )
+
+  args = parser.parse_args(argv)
+
+  if args.command == 'fit-factors':
+    _fit_factors(args)
+  else:
+    _summarize(args)
+
+
+def _summarize(args):
+  paths = []
+  for path in args.paths:
+    if os.path.isdir(path):
+      paths.extend(batch.find_activities(path))
+    else:
+      paths.append(path)
+
+  summary = batch.summarize_activities(
+    paths,
+    args.threshold_speed,
+    processes=args.processes,
+    chunksize=args.chunksize,
+    time_col=args.time_col,
+    speed_col=args.speed_col,
+    grade_col=args.grade_col,
+  )
+  summary.to_csv(args.output if args.output else sys.stdout)
+
+
+def _fit_factors(args):
+  import pandas as pd
+
+  from specialsauce.datasets import load_ngp_gap
+
+  fits = fitting.fit_dataset(
+    load_ngp_gap(), pace=args.pace, method=args.method, degree=args.degree)
+
+  os.makedirs(args.output_dir, exist_ok=True)
+  for col, fit in fits.items():
+    pd.DataFrame(fit.table(), columns=['Grade', 'Factor']).to_csv(
+      os.path.join(args.output_dir, f'{col}.csv'), index=False)
+  pd.DataFrame.from_dict(
+    {col: fit.report() for col, fit in fits.items()}, orient='index'
+  ).to_csv(os.path.join(args.output_dir, 'report.csv'), index_label='column')
+
+
+if __name__ == '__main__':
+  main()
@@ -1,46 +1,179 @@
 import math
 
 import numpy as np
-import pandas as pd
 
 from specialsauce import util
 from specialsauce.sources import minetti
 
 
-def power_met_ss(speed, grade=0.0):
-  return speed * minetti.cost_of_running(grade)
+# Gaits for `power_met_ss`. 'auto' walks below `walk_speed` (and,
+# optionally, above `walk_grade`) and runs otherwise.
+GAITS = ('run', 'walk', 'auto')
 
+# Speed (m/s) below which the 'auto' gait walks. People switch from
+# walking to running at about 2 m/s on level ground.
+WALK_SPEED = 2.0
 
-def power_met_ss(speed_series, grade_series=None):
+
+def power_met_ss(
+  speed_series,
+  grade_series=None,
+  out=None,
+  dtype=None,
+  gait='run',
+  walk_speed=WALK_SPEED,
+  walk_grade=None,
+):
   """Calculate steady-state metabolic power in the moderate domain.
 
   For more info, see `heartandsole_local/heartandsole/powerutils.py`.
+
+  Args:
+    speed_series (array-like): horizontal speed in meters per second.
+      May be a list, numpy array, or pandas Series.
+    grade_series (array-like): decimal grade at each sample. If None,
+      the terrain is assumed to be flat.
+    out (numpy.ndarray): optional float array to write the result into.
+      It must have the broadcast shape of the inputs, and may be one of
+      them (eg `out=speed` to work in place).
+    dtype (numpy.dtype): float type to compute in. Defaults to the
+      type of `out` if given, else float64. If both are given, they
+      must match. In float32, power is within about 1e-6 (relative) of
+      the float64 result. Either way, the working memory is two
+      input-sized buffers besides the output.
+    gait (str): 'run' to use Minetti's cost of running, 'walk' to use
+      the cost of walking, or 'auto' to walk at samples slower than
+      `walk_speed` (or steeper than `walk_grade`) and run elsewhere.
+      Minetti's walking cost is the minimum over walking speeds, and it
+      is below the running cost at every grade, so it should only be
+      applied where the athlete actually walks.
+    walk_speed (float): for 'auto', the speed in m/s below which the
+      athlete walks.
+    walk_grade (float): for 'auto', the decimal grade above which the
+      athlete walks (hikes) at any speed. Default None, meaning grade
+      alone never implies walking.
+
+  Returns:
+    numpy.ndarray or pandas.Series: metabolic power in W/kg. A Series
+    (sharing memory with `out`, if given) is returned if either input
+    is a Series.
   """
-  if grade_series is None:
-    grade_series = pd.Series([0 for i in range(len(speed_series))])
+  if gait not in GAITS:
+    raise ValueError(f'gait must be one of {GAITS}, not {gait!r}.')
+  if out is not None:
+    if dtype is not None and np.dtype(dtype) != out.dtype:
+      raise ValueError(
+        f'dtype {np.dtype(dtype)} does not match out.dtype {out.dtype}.')
+    dtype = out.dtype
+  dtype = util.float_dtype(dtype)
+
+  speed = np.asarray(speed_series, dtype=dtype)
+  gait_args = (gait, walk_speed, walk_grade)
 
-  c_i_series = grade_series.apply(minetti.cost_of_running)
+  if grade_series is None:
+    # Instantaneous running power (W/kg) is simply cost of running 
+    # (J/kg/m) multiplied by speed (m/s).
+    cost = _cost(speed, np.zeros((), dtype=dtype), *gait_args)
+    power = np.multiply(speed, cost, out=out)
+    return util.wrap_like(power, speed_series)
+
+  grade = np.asarray(grade_series, dtype=dtype)
+  shape = np.broadcast_shapes(speed.shape, grade.shape)
+  if out is None:
+    if not shape:
+      # Scalar inputs.
+      return float(
+        speed * _cost(speed, grade, *gait_args) * np.sqrt(1 + grade ** 2)
+      )
+    out = np.empty(shape, dtype=dtype)
+  else:
+    # The inputs are read after `out` is first written, so work from a
+    # copy of any input that shares its memory (eg `out=speed`).
+    if np.shares_memory(out, speed):
+      speed = speed.copy()
+    if np.shares_memory(out, grade):
+      grade = grade.copy()
 
-  # Instantaneous running power (W/kg) is simply cost of running 
-  # (J/kg/m) multiplied by speed (m/s).
-  power_series = c_i_series * speed_series
-  
   # Updated to account for the fact that the horizontal speed is
   # measured, but cost of running relates to the distance along the
-  # incline.
-  power_series = power_series / np.cos(np.arctan(grade_series))
+  # incline: divide by cos(arctan(grade)), which equals
+  # sqrt(1 + grade ** 2).
+  power = np.multiply(grade, grade, out=out)
+  power += 1.0
+  np.sqrt(power, out=power)
+
+  power *= speed
 
-  return power_series
+  # Evaluate the cost (clipping and Horner steps) in one buffer.
+  cost_shape = shape if gait == 'auto' else grade.shape
+  power *= _cost(
+    speed, grade, *gait_args, out=np.empty(cost_shape, dtype=dtype))
 
+  return util.wrap_like(power, speed_series, grade_series)
 
-def power_met(speed_series, grade_series=None, time_series=None, tau=20):
-  """Calculate metabolic power in the moderate domain as a time series."""
-  if time_series is None:
-    time_series = pd.Series([i for i in range(len(speed_series))])
 
+def _cost(speed, grade, gait, walk_speed, walk_grade, out=None):
+  """Cost of locomotion in J/kg/m for `gait` at each sample.
+
+  For 'auto', the running cost is evaluated everywhere and the walking
+  cost only at the walking samples, which are then overwritten.
+  """
+  if gait == 'run':
+    return minetti.cost_of_running(grade, out=out)
+  if gait == 'walk':
+    return minetti.cost_of_walking(grade, out=out)
+
+  walk = np.less(speed, walk_speed)
+  if walk_grade is not None:
+    walk = walk | (grade > walk_grade)
+  grade, walk = np.broadcast_arrays(grade, walk)
+
+  if out is None:
+    out = np.empty(grade.shape, dtype=np.result_type(grade.dtype, 1.0))
+  minetti.cost_of_running(grade, out=out)
+  out[walk] = minetti.cost_of_walking(grade[walk])
+
+  return out
+
+
+def power_met(
+  speed_series,
+  grade_series=None,
+  time_series=None,
+  tau=20,
+  dtype=None,
+  gait='run',
+  walk_speed=WALK_SPEED,
+  walk_grade=None,
+):
+  """Calculate metabolic power in the moderate domain as a time series.
+
+  Args:
+    speed_series (array-like): horizontal speed in meters per second.
+    grade_series (array-like): decimal grade at each sample. If None,
+      the terrain is assumed to be flat.
+    time_series (array-like): seconds from the start of the activity.
+      If None, samples are assumed to be 1 second apart.
+    tau (float): time constant of the metabolic response, in seconds.
+    dtype (numpy.dtype): float type for the power and the result.
+      Default float64. See `power_met_ss` and `util.ewma_halflife` for
+      the float32 error bounds.
+    gait (str): 'run', 'walk' or 'auto'. See `power_met_ss`.
+    walk_speed (float): for 'auto', the speed in m/s below which the
+      athlete walks.
+    walk_grade (float): for 'auto', the decimal grade above which the
+      athlete walks at any speed.
+  """
   # Calculate the theoretical steady-state power associated with the
   # speed and grade value at each timestep.
-  power_met_inst = power_met_ss(speed_series, grade_series=grade_series)
+  power_met_inst = power_met_ss(
+    speed_series,
+    grade_series=grade_series,
+    dtype=dtype,
+    gait=gait,
+    walk_speed=walk_speed,
+    walk_grade=walk_grade,
+  )
 
   halflife = tau * math.log(2)
 
@@ -52,6 +185,7 @@ def power_met(speed_series, grade_series=None, time_series=None, tau=20):
     power_met_inst,
     halflife,
     time_series=time_series,
+    dtype=dtype,
   )
 
 
@@ -75,4 +209,8 @@ def run_cost(grade=0.0):
 
 
 def run_power(speed, grade=0.0):
-  return run_cost(speed, grade=grade) * speed / math.cos(math.atan(grade))
+  """Calculates steady-state running power, in W/kg.
+
+  Same as `power_met_ss`, with a flat default grade.
+  """
+  return power_met_ss(speed, grade)
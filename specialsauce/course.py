@@ -0,0 +1,178 @@
+"""Race pacing over a course.
+
+A `CoursePlan` divides a route into segments and works out each
+segment's grade and adjustment factor once. After that, finish times
+and splits for any target grade-adjusted speed take a single pass over
+the segments.
+"""
+import functools
+
+import numpy as np
+
+from specialsauce import adjust
+
+
+class CoursePlan(object):
+  """Per-segment grades and adjustment factors for a route.
+
+  Args:
+    distance (array-like): non-decreasing distance along the route, in
+      meters.
+    elevation (array-like): elevation at each distance, in meters.
+    segment_length (float): length of each segment, in meters. The last
+      segment is shorter if the route's length is not a multiple of it.
+  """
+  def __init__(self, distance, elevation, segment_length=100.0):
+    distance = np.asarray(distance, dtype=float)
+    elevation = np.asarray(elevation, dtype=float)
+    valid = ~np.isnan(elevation)
+
+    self.segment_length = segment_length
+    self.boundaries = np.append(
+      np.arange(distance[0], distance[-1], segment_length), distance[-1])
+    self.lengths = np.diff(self.boundaries)
+    self.elevations = np.interp(
+      self.boundaries, distance[valid], elevation[valid])
+    self.grades = np.diff(self.elevations) / self.lengths
+    self._factors = {}
+
+  def __len__(self):
+    return len(self.lengths)
+
+  @property
+  def distance(self):
+    """Total length of the route, in meters."""
+    return self.boundaries[-1] - self.boundaries[0]
+
+  def factors(self, model='strava'):
+    """Each segment's speed adjustment factor (computed once per model)."""
+    if model not in self._factors:
+      self._factors[model] = adjust.speed_factor(self.grades, model)
+    return self._factors[model]
+
+  def segment_times(self, target_speed, model='strava', overrides=None):
+    """Time to cover each segment at a target grade-adjusted speed.
+
+    Args:
+      target_speed (float or array-like): grade-adjusted speed in m/s.
+        If an array, the result has a row per target speed.
+      model (str): 'strava', 'trainingpeaks' or 'minetti'.
+      overrides (dict or array-like): multipliers on the time of
+        particular segments, eg 1.2 for technical terrain or aid
+        stations. Either a mapping of segment index to multiplier, or
+        one multiplier per segment.
+
+    Returns:
+      numpy.ndarray: seconds per segment, with shape
+      `np.shape(target_speed) + (len(self),)`.
+    """
+    # Time at actual speed = length / (target / factor).
+    weighted = self.lengths * self.factors(model)
+    if overrides is not None:
+      weighted = weighted * self._multipliers(overrides)
+
+    target_speed = np.asarray(target_speed, dtype=float)
+    return weighted / target_speed[..., np.newaxis]
+
+  def finish_time(self, target_speed, model='strava', overrides=None):
+    """Seconds to finish the route at a target grade-adjusted speed.
+
+    See `segment_times` for the arguments.
+    """
+    return self.segment_times(target_speed, model, overrides).sum(axis=-1)
+
+  def target_speed(self, finish_time, model='strava', overrides=None):
+    """The grade-adjusted speed, in m/s, that finishes in `finish_time` seconds.
+
+    See `segment_times` for the other arguments.
+    """
+    return self.finish_time(1.0, model, overrides) / np.asarray(
+      finish_time, dtype=float)
+
+  def splits(
+    self,
+    target_speed,
+    model='strava',
+    overrides=None,
+    split_length=1000.0,
+  ):
+    """Elapsed time at regular distances along the route.
+
+    Speed is constant within each segment, so times between segment
+    boundaries are interpolated linearly.
+
+    Args:
+      split_length (float): distance between splits, in meters. The
+        last split is at the finish.
+      See `segment_times` for the other arguments.
+
+    Returns:
+      tuple(numpy.ndarray, numpy.ndarray): distances of the splits, and
+      elapsed seconds at each (with a row per target speed, if
+      `target_speed` is an array).
+    """
+    segment_times = self.segment_times(target_speed, model, overrides)
+    cum_times = np.concatenate(
+      [np.zeros(segment_times.shape[:-1] + (1,)),
+       np.cumsum(segment_times, axis=-1)],
+      axis=-1
+    )
+
+    split_distances = np.append(
+      np.arange(
+        self.boundaries[0] + split_length, self.boundaries[-1], split_length),
+      self.boundaries[-1]
+    )
+
+    # Locate each split within its segment.
+    ix = np.clip(
+      np.searchsorted(self.boundaries, split_distances, side='right') - 1,
+      0,
+      len(self) - 1
+    )
+    frac = (split_distances - self.boundaries[ix]) / self.lengths[ix]
+    split_times = cum_times[..., ix] + frac * segment_times[..., ix]
+
+    return split_distances, split_times
+
+  def _multipliers(self, overrides):
+    if hasattr(overrides, 'items'):
+      multipliers = np.ones(len(self))
+      for i, value in overrides.items():
+        multipliers[i] = value
+      return multipliers
+
+    multipliers = np.asarray(overrides, dtype=float)
+    if multipliers.shape != (len(self),):
+      raise ValueError(
+        f'Expected {len(self)} segment overrides, got {multipliers.shape}.')
+    return multipliers
+
+
+def get_plan(distance, elevation, segment_length=100.0):
+  """A `CoursePlan` for the route, reusing one built recently if possible.
+
+  The most recent plans (see `PLAN_CACHE_SIZE`) are kept, keyed on the
+  route's data, so the same route submitted again skips the per-segment
+  precomputation.
+  """
+  distance = np.ascontiguousarray(distance, dtype=float)
+  elevation = np.ascontiguousarray(elevation, dtype=float)
+  return _cached_plan(
+    distance.tobytes(), elevation.tobytes(), float(segment_length))
+
+
+def clear_plan_cache():
+  _cached_plan.cache_clear()
+
+
+PLAN_CACHE_SIZE = 32
+
+
+@functools.lru_cache(maxsize=PLAN_CACHE_SIZE)
+def _cached_plan(distance_bytes, elevation_bytes, segment_length):
+  return CoursePlan(
+    np.frombuffer(distance_bytes),
+    np.frombuffer(elevation_bytes),
+    segment_length
+  )
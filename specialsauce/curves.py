@@ -0,0 +1,140 @@
+"""Mean-maximal (best effort) curves.
+
+A mean-maximal curve gives, for each duration, the highest average of a
+series over any window of that duration, eg the best 5-minute metabolic
+power or grade-adjusted speed:
+
+  power = core.power_met_ss(speed, grade)
+  curve = curves.mean_max_curve(power)     # at DEFAULT_DURATIONS
+
+Window sums come from differences of one cumulative sum, so each
+duration costs a single pass over the samples, and a curve at K
+durations costs O(n K) rather than the O(n^2) of every duration. The
+default durations are spaced logarithmically from 1 second to 6 hours.
+
+Curves of many activities are computed together by `mean_max_curves`,
+and merged into a season-best curve by `merge_curves`.
+
+Samples are taken to be uniform, `step` seconds apart. Irregular
+recordings can be put on a uniform grid with `resample.resample`.
+"""
+import numpy as np
+
+from specialsauce import util
+
+
+# Durations in seconds: every second up to 10 s, then about 20 per
+# decade up to 6 hours.
+DEFAULT_DURATIONS = np.unique(np.concatenate([
+  np.arange(1, 10),
+  np.round(np.geomspace(10, 6 * 3600, 68)),
+])).astype(int)
+
+
+def mean_max_curve(series, durations=None, step=1.0):
+  """Calculate the mean-maximal curve of one series.
+
+  Args:
+    series (array-like): uniformly-spaced samples, eg metabolic power
+      or speed. Missing (NaN) samples count as zero.
+    durations (array-like): durations in seconds. Default
+      `DEFAULT_DURATIONS`.
+    step (float): seconds between samples.
+
+  Returns:
+    numpy.ndarray: best average over each duration, NaN for durations
+    longer than the series. A Series indexed by duration if `series`
+    is a Series.
+  """
+  durations = _durations(durations)
+  curve = mean_max_curves([series], durations, step=step)[0]
+
+  if util.first_series(series) is not None:
+    import pandas as pd
+
+    return pd.Series(curve, index=pd.Index(durations, name='duration'))
+
+  return curve
+
+
+def mean_max_curves(activities, durations=None, step=1.0):
+  """Calculate the mean-maximal curves of many activities at once.
+
+  The activities are concatenated into one cumulative sum. For each
+  duration, the window sums of every activity are one subtraction, and
+  each activity's best is a `numpy.maximum.reduceat` over the windows
+  that lie within it.
+
+  Args:
+    activities (iterable): one array-like of uniformly-spaced samples
+      per activity. Missing (NaN) samples count as zero.
+    durations (array-like): durations in seconds. Default
+      `DEFAULT_DURATIONS`.
+    step (float): seconds between samples.
+
+  Returns:
+    numpy.ndarray: activities x durations array of best averages, NaN
+    where an activity is shorter than the duration.
+  """
+  durations = _durations(durations)
+  arrays = [np.asarray(a, dtype=float).reshape(-1) for a in activities]
+  lengths = np.array([len(a) for a in arrays], dtype=np.intp)
+  starts = np.cumsum(lengths) - lengths
+  values = np.concatenate(arrays) if arrays else np.empty(0)
+  n = len(values)
+
+  cum_sum = np.empty(n + 1)
+  cum_sum[0] = 0.0
+  np.cumsum(np.nan_to_num(values, nan=0.0), out=cum_sum[1:])
+  del values
+
+  windows = np.maximum(np.round(durations / step).astype(np.intp), 1)
+  curves = np.full((len(arrays), len(durations)), np.nan)
+  sums = np.empty(n)
+
+  for j, window in enumerate(windows):
+    fits = np.flatnonzero(lengths >= window)
+    if not len(fits):
+      continue
+    window_sums = np.subtract(
+      cum_sum[window:], cum_sum[:-window], out=sums[:n - window + 1])
+
+    # Each activity's windows start from its first sample through its
+    # `window`th-last. Reduce over those ranges only; the results for
+    # the ranges in between are discarded. The last range may end at
+    # the end of the array, which reduceat takes implicitly.
+    bounds = np.empty(2 * len(fits), dtype=np.intp)
+    bounds[0::2] = starts[fits]
+    bounds[1::2] = starts[fits] + lengths[fits] - window + 1
+    if bounds[-1] == len(window_sums):
+      bounds = bounds[:-1]
+    best = np.maximum.reduceat(window_sums, bounds)[0::2]
+
+    curves[fits, j] = best / window
+
+  return curves
+
+
+def merge_curves(curves):
+  """Merge mean-maximal curves into a best-of curve, eg a season best.
+
+  Args:
+    curves (array-like): curves at the same durations, as rows of a 2-D
+      array or a list of 1-D arrays (eg from `mean_max_curves`).
+
+  Returns:
+    numpy.ndarray: the best value at each duration, ignoring NaNs.
+  """
+  curves = np.asarray(curves, dtype=float)
+  if curves.ndim == 1:
+    return curves.copy()
+  return np.fmax.reduce(curves, axis=0)
+
+
+def _durations(durations):
+  if durations is None:
+    return DEFAULT_DURATIONS
+  durations = np.atleast_1d(np.asarray(durations, dtype=float))
+  if (durations <= 0).any():
+    raise ValueError('Durations must be positive.')
+  return durations
@@ -1,19 +1,92 @@
+import functools
+import hashlib
 import os
 
+import numpy as np
 import pandas as pd
 
 
-def load_ngp_gap():
+DATA_DIR = os.path.join(os.path.dirname(__file__), 'data')
+
+
+def load_ngp_gap(as_seconds=False):
     """Load and return the NGP / GAP dataset.
     
     Inspired by sklearn's `load_iris()`.
+
+    The data is read once per process from a precompiled binary copy
+    (`ngp_gap.npz`) of `ngp_gap.csv`, falling back to parsing the CSV if
+    the binary copy is missing or out of date. Each call returns a new
+    DataFrame, so callers may modify it.
+
+    Args:
+        as_seconds (bool): return paces as float seconds, rather than
+            as timedeltas.
+
+    Returns:
+        pandas.DataFrame: paces indexed by percent grade.
+    """
+    return _load_ngp_gap(as_seconds).copy()
+
+
+@functools.lru_cache(maxsize=None)
+def _load_ngp_gap(as_seconds):
+    df_seconds = _read_ngp_gap_npz()
+    if df_seconds is None:
+        df_seconds = _read_ngp_gap_csv()
+
+    if as_seconds:
+        return df_seconds
+
+    return df_seconds.apply(pd.to_timedelta, unit='s')
+
+
+def _read_ngp_gap_csv():
+    """Parse the CSV's 'm:ss' paces into float seconds."""
+    csv_filename = os.path.join(DATA_DIR, 'ngp_gap.csv')
+    df_adjusted_pace_str = pd.read_csv(
+        csv_filename, index_col='Grade', dtype=str)
+    df_adjusted_pace_str.index = df_adjusted_pace_str.index.astype(int)
+
+    return df_adjusted_pace_str.apply(
+        lambda series: pd.to_timedelta('00:' + series).dt.total_seconds())
+
+
+def _read_ngp_gap_npz():
+    """Read the binary copy, or return None if it is missing or stale."""
+    try:
+        with np.load(_npz_filename(), allow_pickle=False) as data:
+            if str(data['csv_sha1']) != _csv_sha1():
+                return None
+            return pd.DataFrame(
+                data['values'],
+                index=pd.Index(data['grade'], name='Grade'),
+                columns=list(data['columns']),
+            )
+    except (OSError, KeyError, ValueError):
+        return None
+
+
+def _write_ngp_gap_npz():
+    """Regenerate the binary copy of the dataset from the CSV.
+
+    Run this after editing `ngp_gap.csv`; until then, the CSV is parsed
+    instead.
     """
-    module_path = os.path.dirname(__file__)
-    ngp_gap_csv_filename = os.path.join(module_path, 'data', 'ngp_gap.csv')
-    df_adjusted_pace_str = pd.read_csv(ngp_gap_csv_filename, index_col='Grade')
-    df_adjusted_pace_td = df_adjusted_pace_str  \
-        .applymap(lambda x: f'00:{x}' if not pd.isnull(x) else x)  \
-        .applymap(pd.to_timedelta) 
-        # .apply(lambda series: series.dt.total_seconds())
-
-    return df_adjusted_pace_td
+    df_seconds = _read_ngp_gap_csv()
+    np.savez(
+        _npz_filename(),
+        grade=df_seconds.index.to_numpy(),
+        columns=np.array(df_seconds.columns, dtype=str),
+        values=df_seconds.to_numpy(dtype=float),
+        csv_sha1=np.array(_csv_sha1()),
+    )
+
+
+def _npz_filename():
+    return os.path.join(DATA_DIR, 'ngp_gap.npz')
+
+
+def _csv_sha1():
+    with open(os.path.join(DATA_DIR, 'ngp_gap.csv'), 'rb') as f:
+        return hashlib.sha1(f.read()).hexdigest()
@@ -0,0 +1,99 @@
+"""Fitness, fatigue and form for many athletes at once.
+
+Daily TSS for every athlete is pivoted into a single athletes x days
+array, so ATL and CTL are each computed by one filter over all
+athletes, rather than by a groupby around `chronic_training_load`.
+"""
+import numpy as np
+import pandas as pd
+
+from specialsauce.sources import trainingpeaks
+
+
+def training_load_table(
+  tss_table,
+  athlete_col='athlete',
+  date_col='date',
+  tss_col='tss',
+  init_atl=0.0,
+  init_ctl=0.0,
+  end=None,
+):
+  """Calculate daily ATL, CTL, TSB and training status for many athletes.
+
+  Each athlete's days run from their first date in the table through
+  `end`. Days with no TSS count as rest days (zero TSS), and several
+  values on the same day are summed.
+
+  Args:
+    tss_table (pandas.DataFrame or mapping): long-form table with one row
+      per athlete and date (or datetime).
+    athlete_col (str): name of the column of athlete identifiers.
+    date_col (str): name of the column of dates.
+    tss_col (str): name of the column of Training Stress Scores.
+    init_atl (float or array-like): ATL before each athlete's first day.
+      May be one value per athlete, in sorted athlete order.
+    init_ctl (float or array-like): CTL before each athlete's first day,
+      like `init_atl`.
+    end (date-like): last day to report. Defaults to the last date in
+      the table. Later rows are ignored.
+
+  Returns:
+    pandas.DataFrame: tidy table of athlete, date, tss, atl, ctl, tsb
+    and status, sorted by athlete and date. Status is an ordered
+    categorical, from 'Overreaching' up to 'Likely losing fitness
+    quickly'.
+  """
+  athlete = np.asarray(tss_table[athlete_col])
+  days = _to_days(tss_table[date_col])
+  tss = np.asarray(tss_table[tss_col], dtype=float)
+
+  end = days.max() if end is None else _to_days([end])[0]
+  keep = days <= end
+  if not keep.all():
+    athlete, days, tss = athlete[keep], days[keep], tss[keep]
+
+  athlete_ix, athletes = pd.factorize(athlete, sort=True)
+
+  # Each athlete's row starts on their own first day, so that their
+  # initial loads apply from then on.
+  first = np.full(len(athletes), end)
+  np.minimum.at(first, athlete_ix, days)
+  n_days = end - first + 1
+
+  daily_tss = np.zeros((len(athletes), n_days.max(initial=0)))
+  np.add.at(daily_tss, (athlete_ix, days - first[athlete_ix]), tss)
+
+  atl = trainingpeaks.acute_training_load(daily_tss, init=init_atl)
+  ctl = trainingpeaks.chronic_training_load(daily_tss, init=init_ctl)
+
+  # Flatten the filled part of each row into one tidy table.
+  filled = np.arange(daily_tss.shape[1]) < n_days[:, np.newaxis]
+  row_athlete = np.repeat(np.arange(len(athletes)), n_days)
+  row_day = np.nonzero(filled)[1] + first[row_athlete]
+  atl, ctl = atl[filled], ctl[filled]
+  tsb = ctl - atl
+
+  statuses = [status for status, _ in trainingpeaks.TRAINING_STATUSES]
+
+  return pd.DataFrame({
+    athlete_col: athletes.take(row_athlete),
+    date_col: row_day.astype('datetime64[D]').astype('datetime64[ns]'),
+    tss_col: daily_tss[filled],
+    'atl': atl,
+    'ctl': ctl,
+    'tsb': tsb,
+    'status': pd.Categorical.from_codes(
+      trainingpeaks.training_status_codes(tsb),
+      categories=statuses,
+      ordered=True,
+    ),
+  })
+
+
+def _to_days(dates):
+  """Whole days since the epoch, as integers."""
+  days = pd.DatetimeIndex(pd.to_datetime(dates))
+  if days.tz is not None:
+    days = days.tz_localize(None)
+  return days.to_numpy().astype('datetime64[D]').astype(np.int64)
@@ -0,0 +1,287 @@
+"""Fit grade adjustment factors to paired pace data.
+
+The tables in `strava.py` and `trainingpeaks.py` came from spoofed
+activities: a runner at a constant pace up a constant grade, with the
+vendor's adjusted pace read back (see `datasets.load_ngp_gap`). This
+module turns such a dataset into speed factors (pace / adjusted pace),
+fits a smooth model of factor vs. grade, and reports how well the model
+matches the data, so the tables can be regenerated whenever a vendor
+changes its curve:
+
+  fits = fitting.fit_dataset(load_ngp_gap(), pace=480)
+  fits['GAP'].table()    # like strava.ADJUSTMENT_FACTORS
+  fits['GAP'].report()   # fit errors
+
+Two models are available:
+
+  * 'pchip' (the default): a shape-preserving piecewise cubic through
+    every point. It is monotone between neighboring points, so it never
+    adds wiggles to the data's monotone (downhill and uphill) segments.
+    Tabulated at the data's grades, it reproduces the shipped tables.
+  * 'poly': a least-squares polynomial in decimal grade, like
+    `minetti.poly_5`.
+"""
+import numpy as np
+import pandas as pd
+
+from specialsauce.sources import strava, trainingpeaks
+
+
+METHODS = ('poly', 'pchip')
+
+# Columns of `datasets.load_ngp_gap()` and the decimal grades over which
+# each vendor's factor is defined.
+DATASET_RANGES = {
+  'GAP': strava.GRADE_RANGE,
+  'NGP': trainingpeaks.GRADE_RANGE,
+}
+
+
+def speed_factors(paces, pace_col='Pace', pace=None):
+  """Calculate speed factors from actual and adjusted paces.
+
+  Args:
+    paces (pandas.DataFrame): paces (timedeltas or seconds) indexed by
+      percent grade, with a column of actual paces and one column per
+      adjusted pace, like `datasets.load_ngp_gap()`.
+    pace_col (str): name of the column of actual paces.
+    pace (float or timedelta): if given, only rows at this actual pace
+      (seconds, if a number) are used.
+
+  Returns:
+    pandas.DataFrame: factor for each adjusted column, indexed by
+    percent grade in increasing order. A factor greater than 1 means the
+    adjusted pace is faster than the actual pace. Factors for the same
+    grade at several paces are averaged.
+  """
+  seconds = _to_seconds(paces)
+  if pace is not None:
+    pace = pd.to_timedelta(pace, unit='s').total_seconds()
+    seconds = seconds[seconds[pace_col] == pace]
+
+  factors = seconds.drop(columns=pace_col).rdiv(seconds[pace_col], axis=0)
+  return factors.groupby(level=0).mean().sort_index()
+
+
+def pace_dependence(paces, pace_col='Pace'):
+  """How much the factor at each grade varies with the actual pace.
+
+  Both vendors' factors are meant to depend on grade alone; this checks
+  that assumption wherever a grade was measured at several paces.
+
+  Returns:
+    pandas.DataFrame: relative spread, (max - min) / mean, of each
+    column's factors, for the grades measured at more than one pace.
+  """
+  seconds = _to_seconds(paces)
+  by_grade = seconds.drop(columns=pace_col).rdiv(
+    seconds[pace_col], axis=0).groupby(level=0)
+
+  spread = (by_grade.max() - by_grade.min()) / by_grade.mean()
+  return spread[by_grade.size() > 1]
+
+
+def fit_factors(
+  percent_grades,
+  factors,
+  method='pchip',
+  degree=5,
+  grade_range=None,
+):
+  """Fit a smooth model of speed factor vs. grade.
+
+  Args:
+    percent_grades (array-like): percent grade of each point.
+    factors (array-like): speed factor at each point. NaNs are dropped.
+    method (str): 'poly' or 'pchip'. See the module docstring.
+    degree (int): degree of the 'poly' model.
+    grade_range (tuple(float)): decimal grades to fit over. Points
+      outside are dropped, and the model is constant beyond them.
+      Defaults to the range of the data.
+
+  Returns:
+    FactorFit: the fitted model.
+  """
+  if method not in METHODS:
+    raise ValueError(f'method must be one of {METHODS}, not {method!r}.')
+
+  grades = np.asarray(percent_grades, dtype=float) / 100
+  factors = np.asarray(factors, dtype=float)
+  keep = ~np.isnan(factors)
+  if grade_range is not None:
+    keep &= (grades >= grade_range[0]) & (grades <= grade_range[1])
+  order = np.argsort(grades[keep], kind='stable')
+  grades, factors = grades[keep][order], factors[keep][order]
+
+  if grade_range is None:
+    grade_range = (grades[0], grades[-1])
+
+  return FactorFit(grades, factors, method, degree, tuple(grade_range))
+
+
+def fit_dataset(paces, ranges=None, pace=None, **kwargs):
+  """Fit every adjusted-pace column of a dataset.
+
+  Args:
+    paces (pandas.DataFrame): dataset like `datasets.load_ngp_gap()`.
+    ranges (dict): decimal grade range to fit for each column. Defaults
+      to `DATASET_RANGES`.
+    pace (float or timedelta): only use rows at this actual pace. See
+      `speed_factors`.
+    **kwargs: passed on to `fit_factors`.
+
+  Returns:
+    dict: FactorFit for each column.
+  """
+  ranges = DATASET_RANGES if ranges is None else ranges
+  factors = speed_factors(paces, pace=pace)
+  return {
+    col: fit_factors(
+      factors.index, factors[col], grade_range=grade_range, **kwargs)
+    for col, grade_range in ranges.items()
+  }
+
+
+class FactorFit(object):
+  """A smooth model of speed factor vs. decimal grade, fit to data.
+
+  Calling the model evaluates it at decimal grades, which are clipped
+  to `grade_range`, like `strava.gap_speed_factor`.
+
+  Attributes:
+    grades (numpy.ndarray): decimal grades of the data, increasing.
+    factors (numpy.ndarray): speed factor at each grade.
+    method (str): 'poly' or 'pchip'.
+    degree (int): degree of a 'poly' model.
+    grade_range (tuple(float)): decimal grades the model is defined on.
+    coefficients (numpy.ndarray): a 'poly' model's coefficients, highest
+      degree first. For degree 5, these are the `a`-`f` arguments of
+      `minetti.poly_5`.
+  """
+  def __init__(self, grades, factors, method, degree, grade_range):
+    self.grades = grades
+    self.factors = factors
+    self.method = method
+    self.degree = degree
+    self.grade_range = grade_range
+    self._model = self._fit(grades, factors)
+    self.coefficients = self._model if method == 'poly' else None
+
+  def __call__(self, decimal_grade):
+    grade = np.clip(np.asarray(decimal_grade, dtype=float), *self.grade_range)
+    return self._evaluate(self._model, grade)
+
+  def table(self, percent_grades=None):
+    """Tabulate the model like `strava.ADJUSTMENT_FACTORS`.
+
+    Args:
+      percent_grades (array-like): grades to tabulate. Defaults to the
+        data's grades.
+
+    Returns:
+      numpy.ndarray: rows of [percent grade, factor], rounded to three
+      decimals like the shipped tables.
+    """
+    if percent_grades is None:
+      percent_grades = self._percent_grades()
+    percent_grades = np.asarray(percent_grades, dtype=float)
+    factors = self(percent_grades / 100)
+    return np.column_stack([percent_grades, np.round(factors, 3)])
+
+  def errors(self):
+    """Residuals of the fit at each data point.
+
+    Returns:
+      pandas.DataFrame: by percent grade, the factor, the fitted value,
+      the error (fitted - factor), and the leave-one-out error: the
+      error of a model fit without that point. Leave-one-out errors
+      show how well an interpolating model predicts unseen grades; they
+      are NaN at the two ends, which cannot be predicted.
+    """
+    fitted = self(self.grades)
+    return pd.DataFrame(
+      {
+        'factor': self.factors,
+        'fitted': fitted,
+        'error': fitted - self.factors,
+        'loo_error': self._loo_errors(),
+      },
+      index=pd.Index(self._percent_grades(), name='Grade'),
+    )
+
+  def report(self):
+    """Summary of the fit errors.
+
+    Returns:
+      dict: number of points, RMS and maximum absolute error, RMS
+      leave-one-out error, the maximum relative error, and whether the
+      model is monotone within each of the data's monotone segments.
+    """
+    errors = self.errors()
+    return {
+      'method': self.method,
+      'n_points': len(errors),
+      'rmse': float(np.sqrt(np.mean(errors['error'] ** 2))),
+      'max_abs_error': float(errors['error'].abs().max()),
+      'max_rel_error': float((errors['error'] / errors['factor']).abs().max()),
+      'loo_rmse': float(np.sqrt(np.nanmean(errors['loo_error'] ** 2))),
+      'monotone': self._is_segment_monotone(),
+    }
+
+  def _percent_grades(self):
+    # Undo the rounding error of converting from percent.
+    return np.round(self.grades * 100, 9)
+
+  def _fit(self, grades, factors):
+    if self.method == 'poly':
+      degree = min(self.degree, len(grades) - 1)
+      return np.polyfit(grades, factors, degree)
+
+    from scipy.interpolate import PchipInterpolator
+
+    return PchipInterpolator(grades, factors, extrapolate=True)
+
+  def _evaluate(self, model, grade):
+    if self.method == 'poly':
+      return np.polyval(model, grade)
+    return model(grade)
+
+  def _loo_errors(self):
+    n = len(self.grades)
+    errors = np.full(n, np.nan)
+    for i in range(1, n - 1):
+      keep = np.arange(n) != i
+      model = self._fit(self.grades[keep], self.factors[keep])
+      errors[i] = self._evaluate(model, self.grades[i]) - self.factors[i]
+    return errors
+
+  def _is_segment_monotone(self, points_per_interval=200):
+    """Whether the model rises (falls) wherever the data does.
+
+    Intervals next to the data's extrema are not checked, since the
+    model's extremum may fall anywhere near the data's.
+    """
+    # Direction of each interval between neighboring points, with flat
+    # intervals taking the direction of the last sloped one.
+    direction = np.sign(np.diff(self.factors))
+    filled = direction.copy()
+    for i in range(1, len(filled)):
+      if not filled[i]:
+        filled[i] = filled[i - 1]
+    turns = np.flatnonzero(np.diff(filled)) + 1
+    near_turn = np.zeros(len(direction), dtype=bool)
+    near_turn[turns] = near_turn[turns - 1] = True
+
+    for i in np.flatnonzero(~near_turn & (direction != 0)):
+      grid = np.linspace(
+        self.grades[i], self.grades[i + 1], points_per_interval)
+      if (np.diff(self(grid)) * direction[i] < -1e-12).any():
+        return False
+    return True
+
+
+def _to_seconds(paces):
+  """A copy of the paces as float seconds."""
+  return paces.apply(
+    lambda col: col.dt.total_seconds()
+    if pd.api.types.is_timedelta64_dtype(col) else col.astype(float))
@@ -0,0 +1,139 @@
+"""Grade from raw distance and elevation streams.
+
+Elevation from GPS or a barometric altimeter is noisy, and dividing
+its differences by small distance steps gives wild grades. The
+functions here smooth over a fixed distance rather than a fixed number
+of samples, so the result does not depend on the recording rate or on
+how fast the athlete was moving.
+"""
+import numpy as np
+
+from specialsauce import util
+from specialsauce.sources import minetti, strava, trainingpeaks
+
+
+# Valid decimal grade range of each source's formula.
+GRADE_RANGES = {
+  'minetti': minetti.GRADE_RANGE,
+  'strava': strava.GRADE_RANGE,
+  'trainingpeaks': trainingpeaks.GRADE_RANGE,
+}
+
+
+def grade_from_elevation(
+  distance,
+  elevation,
+  window=50.0,
+  method='regression',
+  clip=None,
+  step=1.0,
+  polyorder=2,
+):
+  """Calculate decimal grade from distance and elevation.
+
+  Args:
+    distance (array-like): non-decreasing distance in meters.
+    elevation (array-like): elevation in meters. NaN values are ignored.
+    window (float): distance, in meters, over which to smooth.
+    method (str): how to smooth.
+
+      * 'regression': the slope of a least-squares line through the
+        points within `window / 2` meters on either side of each point,
+        computed from cumulative sums in linear time.
+      * 'savgol': elevation is interpolated onto a grid with `step`
+        meters between points, differentiated with a Savitzky-Golay
+        filter of order `polyorder` spanning `window` meters, and the
+        result is interpolated back to the original distances.
+    clip (str or tuple): constrain the result to the valid range of a
+      source's formula ('minetti', 'strava' or 'trainingpeaks'), or to
+      a (min, max) range.
+    step (float): maximum grid spacing in meters, for the 'savgol'
+      method.
+    polyorder (int): polynomial order, for the 'savgol' method.
+
+  Returns:
+    numpy.ndarray, or pandas.Series if either input is a Series: decimal
+    grade at each point. Grade is NaN where it is undefined, eg when
+    every point in the window is at the same distance.
+  """
+  distance_arr = np.asarray(distance, dtype=float)
+  elevation_arr = np.asarray(elevation, dtype=float)
+
+  if method == 'regression':
+    grade = _grade_regression(distance_arr, elevation_arr, window)
+  elif method == 'savgol':
+    grade = _grade_savgol(
+      distance_arr, elevation_arr, window, step, polyorder)
+  else:
+    raise ValueError(f'Unknown method: {method}')
+
+  if clip is not None:
+    if isinstance(clip, str):
+      clip = GRADE_RANGES[clip]
+    np.clip(grade, *clip, out=grade)
+
+  return util.wrap_like(grade, distance, elevation)
+
+
+def _grade_regression(distance, elevation, window):
+  valid = ~np.isnan(elevation)
+
+  # Work relative to the start, and relative to the mean elevation,
+  # to limit the size of the cumulative sums.
+  x = distance - distance[0] if len(distance) else distance
+  y = np.where(valid, elevation - np.nanmean(elevation), 0.0) \
+    if valid.any() else np.zeros(len(elevation))
+  x_valid = np.where(valid, x, 0.0)
+
+  start = np.searchsorted(distance, distance - window / 2, side='left')
+  end = np.searchsorted(distance, distance + window / 2, side='right')
+
+  def window_sums(values):
+    cum = np.concatenate([[0.0], np.cumsum(values)])
+    return cum[end] - cum[start]
+
+  n = window_sums(valid.astype(float))
+  s_x = window_sums(x_valid)
+  s_y = window_sums(y)
+  s_xx = window_sums(x_valid * x_valid)
+  s_xy = window_sums(x_valid * y)
+
+  with np.errstate(invalid='ignore', divide='ignore'):
+    var_x = s_xx - s_x * s_x / n
+    grade = (s_xy - s_x * s_y / n) / var_x
+
+  # Guard against windows whose spread in distance is lost to rounding.
+  grade[~(var_x > 1e-9 * np.maximum(s_xx, 1.0))] = np.nan
+
+  return grade
+
+
+def _grade_savgol(distance, elevation, window, step, polyorder):
+  from scipy import signal
+
+  valid = ~np.isnan(elevation)
+
+  # No distance is covered, so there is nothing to differentiate along.
+  if len(distance) < 2 or not distance[-1] > distance[0]:
+    return np.full(len(distance), np.nan)
+
+  # Shrink the step slightly so the grid ends exactly at the last point.
+  n = int(np.ceil((distance[-1] - distance[0]) / step)) + 1
+  grid, step = np.linspace(distance[0], distance[-1], n, retstep=True)
+
+  # The filter needs an odd number of points, more than `polyorder`.
+  window_length = max(int(window / step), polyorder + 1)
+  window_length += 1 - window_length % 2
+  if window_length > len(grid) or not valid.any():
+    return np.full(len(distance), np.nan)
+
+  elevation_grid = np.interp(grid, distance[valid], elevation[valid])
+  grade_grid = signal.savgol_filter(
+    elevation_grid,
+    window_length,
+    polyorder,
+    deriv=1,
+    delta=step,
+  )
+
+  return np.interp(distance, grid, grade_grid)
@@ -0,0 +1,310 @@
+"""A registry of models of running as a function of grade.
+
+Each model is a `GradeModel`: a function of decimal grade with a range
+of validity (grades outside it are clipped), an inverse, and metadata.
+Polynomial models are evaluated with `minetti.poly_5`, and table models
+with `util.interp` over breakpoints precomputed in decimal grade, so the
+registered models match the source functions.
+
+Registered models:
+
+  * 'strava': Strava's GAP speed factor, see `strava.gap_speed_factor`.
+  * 'trainingpeaks': TrainingPeaks' NGP speed factor, see
+    `trainingpeaks.ngp_speed_factor`.
+  * 'minetti': the flat speed with the same metabolic power, as a
+    factor of horizontal speed, according to Minetti (2002).
+  * 'minetti_run_cost', 'minetti_walk_cost': Minetti's costs of running
+    and walking in J/kg/m, see `minetti.cost_of_running`.
+
+Several models are compared side by side with `evaluate_many`.
+"""
+import numpy as np
+
+from specialsauce import util
+from specialsauce.sources import minetti, strava, trainingpeaks
+
+
+# Decimal grade spacing of the tables used for inverse lookups.
+INVERSE_RESOLUTION = 1e-4
+
+_REGISTRY = {}
+
+
+class GradeModel(object):
+  """A model of some quantity as a function of decimal grade.
+
+  Subclasses implement `_evaluate(grade, out)`, which evaluates a block
+  of grades into `out`, clipping them to the model's range.
+
+  Args:
+    name (str): name the model is registered under.
+    grade_range (tuple(float)): decimal grades over which the model is
+      valid. Grades outside are clipped to this range.
+    **metadata: descriptive details, eg `quantity`, `units`, `source`.
+  """
+  def __init__(self, name, grade_range, **metadata):
+    self.name = name
+    self.grade_range = tuple(grade_range)
+    self.metadata = metadata
+    self._segments = None
+
+  def __repr__(self):
+    return f'{type(self).__name__}({self.name!r})'
+
+  def __call__(self, decimal_grade, dtype=None):
+    """Evaluate the model.
+
+    Args:
+      decimal_grade (float or array-like): decimal grade(s).
+      dtype (numpy.dtype): float type of the result. Default float64.
+
+    Returns:
+      float, or numpy.ndarray (a Series if the input is one).
+    """
+    grade = np.asarray(decimal_grade)
+    out = np.empty(grade.shape, dtype=util.float_dtype(dtype))
+    for grade_block, out_block in util.blocks(grade, out):
+      self._evaluate(grade_block, out_block)
+
+    if not out.ndim:
+      return float(out)
+    return util.wrap_like(out, decimal_grade)
+
+  def _evaluate(self, grade, out):
+    raise NotImplementedError
+
+  def _clip(self, grade):
+    return np.clip(grade, *self.grade_range)
+
+  def inverse(self, value, side='uphill'):
+    """The grade at which the model takes `value`.
+
+    The model's curve over its range is split at its minimum into a
+    downhill and an uphill piece, each tabulated at
+    `INVERSE_RESOLUTION`.
+
+    Args:
+      value (array-like): value(s) of the model.
+      side (str): 'uphill' or 'downhill' - which side of the minimum to
+        look on.
+
+    Returns:
+      numpy.ndarray: decimal grade, or NaN where the value is not
+      reached on that side within the model's range. Where the model is
+      constant over a range of grades, the grade closest to the minimum
+      is returned.
+    """
+    if self._segments is None:
+      self._segments = self._monotonic_segments()
+    if side == 'uphill':
+      grades, values = self._segments[-1]
+    elif side == 'downhill':
+      grades, values = self._segments[0]
+    else:
+      raise ValueError(f'side must be "uphill" or "downhill", not {side}')
+
+    value = np.asarray(value, dtype=float)
+    return np.interp(value, values, grades, left=np.nan, right=np.nan)
+
+  def _monotonic_segments(self):
+    """Split the model's curve into a downhill and an uphill piece.
+
+    Returns:
+      tuple: ((grades, values), (grades, values)) for the downhill and
+      uphill sides, each sorted by increasing value.
+    """
+    lo, hi = self.grade_range
+    n = int(round((hi - lo) / INVERSE_RESOLUTION)) + 1
+    grades = np.linspace(lo, hi, n)
+    values = self(grades)
+
+    # Split at the minimum. Where the minimum is flat, each side ends at
+    # the edge of the flat part nearest the other side.
+    is_min = values == values.min()
+    first_min = np.argmax(is_min)
+    last_min = n - 1 - np.argmax(is_min[::-1])
+
+    downhill = (grades[:last_min + 1][::-1], values[:last_min + 1][::-1])
+    uphill = (grades[first_min:], values[first_min:])
+
+    return tuple(
+      _strictly_increasing(g, v) for g, v in (downhill, uphill))
+
+
+class PolynomialModel(GradeModel):
+  """A fifth-degree polynomial in decimal grade, see `minetti.poly_5`.
+
+  Args:
+    name (str): name the model is registered under.
+    coefficients (list-like): the six coefficients, highest degree
+      first (the `a`-`f` arguments of `minetti.poly_5`).
+    grade_range (tuple(float)): decimal grades over which the model is
+      valid.
+    along_incline (bool): if True, the polynomial gives a quantity per
+      unit distance along the incline, and the model multiplies it by
+      sqrt(1 + grade ** 2) to give it per unit horizontal distance.
+      Like `core.power_met_ss`, this uses the actual grade, even where
+      the polynomial is clipped.
+    **metadata: descriptive details.
+  """
+  def __init__(
+    self,
+    name,
+    coefficients,
+    grade_range,
+    along_incline=False,
+    **metadata
+  ):
+    super().__init__(name, grade_range, **metadata)
+    self.coefficients = tuple(float(c) for c in coefficients)
+    if len(self.coefficients) != 6:
+      raise ValueError('A polynomial model needs six coefficients.')
+    self.along_incline = along_incline
+
+  def _evaluate(self, grade, out):
+    minetti.poly_5(self._clip(grade), *self.coefficients, out=out)
+
+    if self.along_incline:
+      out *= np.sqrt(1.0 + grade * grade)
+
+
+class TableModel(GradeModel):
+  """Values tabulated at a few grades, interpolated with `util.interp`.
+
+  Args:
+    name (str): name the model is registered under.
+    grades (list-like): increasing decimal grades of the table.
+    values (list-like): the model's value at each grade.
+    grade_range (tuple(float)): decimal grades over which the model is
+      valid. Defaults to the range of the table. Beyond the table, the
+      model is constant.
+    **metadata: descriptive details.
+  """
+  def __init__(self, name, grades, values, grade_range=None, **metadata):
+    self.grades = np.asarray(grades, dtype=float)
+    self.values = np.asarray(values, dtype=float)
+    if grade_range is None:
+      grade_range = (self.grades[0], self.grades[-1])
+    super().__init__(name, grade_range, **metadata)
+
+    if len(self.grades) < 2 or (np.diff(self.grades) <= 0).any():
+      raise ValueError('Table grades must be strictly increasing.')
+
+  @classmethod
+  def from_percent_table(cls, name, table, grade_range=None, **metadata):
+    """Build a model from rows of [percent grade, value], like
+    `strava.ADJUSTMENT_FACTORS`."""
+    table = np.asarray(table, dtype=float)
+    return cls(
+      name, table[:, 0] / 100, table[:, 1], grade_range, **metadata)
+
+  def _evaluate(self, grade, out):
+    out[...] = util.interp(
+      grade, self.grades, self.values, bounds=self.grade_range,
+      dtype=out.dtype)
+
+
+def register(model, replace=False):
+  """Add a model to the registry under its name.
+
+  Raises:
+    ValueError: if a model of that name is registered, unless `replace`.
+  """
+  if model.name in _REGISTRY and not replace:
+    raise ValueError(f'A model named {model.name!r} is already registered.')
+  _REGISTRY[model.name] = model
+  return model
+
+
+def get(name):
+  """Look up a registered model by name (or pass a GradeModel through)."""
+  if isinstance(name, GradeModel):
+    return name
+  try:
+    return _REGISTRY[name]
+  except KeyError:
+    raise ValueError(
+      f'Unknown model {name!r}; expected one of {", ".join(_REGISTRY)}.')
+
+
+def names():
+  """Names of the registered models, in registration order."""
+  return list(_REGISTRY)
+
+
+def evaluate_many(decimal_grade, models=None, dtype=None):
+  """Evaluate several models at the same grades, side by side.
+
+  Args:
+    decimal_grade (array-like): decimal grades.
+    models (list): names of registered models, or GradeModels. Defaults
+      to every registered model.
+    dtype (numpy.dtype): float type of the results. Default float64.
+
+  Returns:
+    dict: array of values for each model, by name. If `decimal_grade`
+    is a Series, a DataFrame with one column per model instead.
+  """
+  models = [get(m) for m in (names() if models is None else models)]
+  grade = np.asarray(decimal_grade)
+  results = {model.name: model(grade, dtype=dtype) for model in models}
+
+  if util.first_series(decimal_grade) is not None:
+    import pandas as pd
+
+    return pd.DataFrame(results, index=decimal_grade.index)
+
+  return results
+
+
+def _strictly_increasing(grades, values):
+  """Drop points where the value does not increase (flat stretches).
+
+  The first grade of each flat stretch is kept.
+  """
+  keep = np.concatenate([[True], np.diff(values) > 0])
+  return grades[keep], values[keep]
+
+
+register(TableModel.from_percent_table(
+  'strava',
+  strava.ADJUSTMENT_FACTORS,
+  strava.GRADE_RANGE,
+  quantity='speed factor',
+  units='',
+  source="Strava's Grade Adjusted Pace (GAP), reverse-engineered",
+))
+register(TableModel.from_percent_table(
+  'trainingpeaks',
+  trainingpeaks.ADJUSTMENT_FACTORS,
+  trainingpeaks.GRADE_RANGE,
+  quantity='speed factor',
+  units='',
+  source="TrainingPeaks' Normalized Graded Pace (NGP), reverse-engineered",
+))
+register(PolynomialModel(
+  'minetti',
+  # Normalized by the cost of running on the flat.
+  np.divide(minetti.RUN_COEFFICIENTS, minetti.RUN_COEFFICIENTS[-1]),
+  minetti.GRADE_RANGE,
+  along_incline=True,
+  quantity='speed factor',
+  units='',
+  source='Minetti et al. (2002), equal metabolic power on the flat',
+))
+register(PolynomialModel(
+  'minetti_run_cost',
+  minetti.RUN_COEFFICIENTS,
+  minetti.GRADE_RANGE,
+  quantity='cost of running',
+  units='J/kg/m',
+  source='Minetti et al. (2002)',
+))
+register(PolynomialModel(
+  'minetti_walk_cost',
+  minetti.WALK_COEFFICIENTS,
+  minetti.GRADE_RANGE,
+  quantity='cost of walking',
+  units='J/kg/m',
+  source='Minetti et al. (2002)',
+))
@@ -0,0 +1,282 @@
+"""Opt-in instrumentation of the calculation functions.
+
+While a `Profiler` is active, every public function of `core`, `util`
+and the `sources` modules is replaced by a wrapper that records its
+calls, input sizes, wall time and memory allocated:
+
+  with profiling.Profiler() as profiler:
+    batch.activity_summary(...)
+  profiler.stats()           # {'util.ewma_halflife': {'calls': ...}, ...}
+  profiler.to_json('profile.json')
+
+Functions are patched on entering the profiler and restored on leaving
+it, so there is no overhead at all when profiling is off. Calls between
+the patched modules go through module attributes (eg `util.interp`), so
+nested calls are recorded too.
+
+Setting the environment variable `SPECIALSAUCE_PROFILE` profiles a
+whole process from the import of `specialsauce` until exit, and writes
+the JSON summary to the file it names (or to standard error, if it is
+'-' or '1'):
+
+  SPECIALSAUCE_PROFILE=profile.json specialsauce summarize ...
+
+Memory is measured with `tracemalloc`, which traces numpy's array data
+as well as Python objects. Tracing slows allocation-heavy code by a
+factor of about two; pass `track_memory=False` to time without it.
+Per-call peaks need `tracemalloc.reset_peak` (Python 3.9+); on older
+Pythons, `peak_bytes` falls back to the memory still allocated when
+each call returns.
+Profiling is not thread-safe: profile one thread at a time.
+"""
+import atexit
+import importlib
+import inspect
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+
+ENV_VAR = 'SPECIALSAUCE_PROFILE'
+
+# Modules whose public functions are instrumented.
+MODULES = (
+  'specialsauce.core',
+  'specialsauce.util',
+  'specialsauce.sources.minetti',
+  'specialsauce.sources.strava',
+  'specialsauce.sources.trainingpeaks',
+)
+
+_FIELDS = (
+  'calls', 'time', 'self_time', 'max_time', 'elements', 'max_elements',
+  'peak_bytes',
+)
+
+# Whether the peak traced memory can be reset between calls (Python 3.9+).
+_RESET_PEAK = hasattr(tracemalloc, 'reset_peak')
+
+
+class Profiler(object):
+  """Records calls to the functions of `MODULES` while active.
+
+  Recorded for each function, by `module.name` (without the
+  'specialsauce.' prefix):
+
+    * calls: number of calls.
+    * time: total wall time in seconds, including nested calls to other
+      instrumented functions.
+    * self_time: total wall time excluding those nested calls.
+    * max_time: longest single call, in seconds.
+    * elements: total number of input elements (the sizes of any array,
+      Series or list arguments).
+    * max_elements: most input elements in a single call.
+    * peak_bytes: largest peak of memory allocated during a call, above
+      what was allocated when it started. Zero if `track_memory` is
+      False. Before Python 3.9, the memory still allocated at the end
+      of the call instead.
+
+  A profiler may be entered several times; its records accumulate.
+
+  Args:
+    modules (list(str)): modules to instrument. Default `MODULES`.
+    track_memory (bool): whether to measure allocations with
+      `tracemalloc`.
+  """
+  def __init__(self, modules=MODULES, track_memory=True):
+    self.modules = tuple(modules)
+    self.track_memory = track_memory
+    self._records = {}
+    self._stack = []
+    self._patched = []
+    self._started_tracing = False
+
+  def __enter__(self):
+    self.start()
+    return self
+
+  def __exit__(self, *exc_info):
+    self.stop()
+
+  @property
+  def active(self):
+    return bool(self._patched)
+
+  def start(self):
+    """Instrument the functions."""
+    if self.active:
+      raise RuntimeError('Profiler is already active.')
+    if self.track_memory and not tracemalloc.is_tracing():
+      tracemalloc.start()
+      self._started_tracing = True
+
+    for module_name in self.modules:
+      module = importlib.import_module(module_name)
+      key_prefix = module_name.replace('specialsauce.', '', 1)
+      for name, func in _public_functions(module):
+        wrapper = self._wrap(func, f'{key_prefix}.{name}')
+        setattr(module, name, wrapper)
+        self._patched.append((module, name, func))
+
+  def stop(self):
+    """Restore the original functions."""
+    for module, name, func in reversed(self._patched):
+      setattr(module, name, func)
+    self._patched = []
+    self._stack = []
+
+    if self._started_tracing:
+      tracemalloc.stop()
+      self._started_tracing = False
+
+  def reset(self):
+    """Discard the records so far."""
+    self._records = {}
+
+  def stats(self):
+    """The records so far.
+
+    Returns:
+      dict: for each function called, a dict of its records (see the
+      class docstring), sorted by decreasing self time.
+    """
+    return dict(sorted(
+      ((name, dict(zip(_FIELDS, record)))
+       for name, record in self._records.items()),
+      key=lambda item: -item[1]['self_time'],
+    ))
+
+  def to_json(self, path=None, indent=2):
+    """Write the records as JSON.
+
+    Args:
+      path (str): file to write to. If None, the JSON is returned
+        instead.
+
+    Returns:
+      str: the JSON, if `path` is None.
+    """
+    text = json.dumps(self.stats(), indent=indent)
+    if path is None:
+      return text
+    with open(path, 'w') as f:
+      f.write(text + '\n')
+
+  def _wrap(self, func, key):
+    stack = self._stack
+    records = self._records
+    track_memory = self.track_memory
+
+    def wrapper(*args, **kwargs):
+      elements = sum(map(_size, args)) + sum(map(_size, kwargs.values()))
+      # Each frame is [start time, time in nested calls, start memory,
+      # peak memory seen in nested calls].
+      if track_memory:
+        current, peak = _traced_memory()
+        if stack:
+          stack[-1][3] = max(stack[-1][3], peak)
+        if _RESET_PEAK:
+          tracemalloc.reset_peak()
+      else:
+        current = 0
+      frame = [time.perf_counter(), 0.0, current, current]
+      stack.append(frame)
+
+      try:
+        return func(*args, **kwargs)
+      finally:
+        elapsed = time.perf_counter() - frame[0]
+        stack.pop()
+        peak = current
+        if track_memory:
+          peak = max(frame[3], _traced_memory()[1])
+        if stack:
+          stack[-1][1] += elapsed
+          stack[-1][3] = max(stack[-1][3], peak)
+
+        record = records.get(key)
+        if record is None:
+          record = records[key] = [0, 0.0, 0.0, 0.0, 0, 0, 0]
+        record[0] += 1
+        record[1] += elapsed
+        record[2] += elapsed - frame[1]
+        record[3] = max(record[3], elapsed)
+        record[4] += elements
+        record[5] = max(record[5], elements)
+        record[6] = max(record[6], peak - frame[2])
+
+    wrapper.__wrapped__ = func
+    wrapper.__name__ = func.__name__
+    wrapper.__qualname__ = func.__qualname__
+    wrapper.__doc__ = func.__doc__
+    return wrapper
+
+
+def profile_from_env(environ=None):
+  """Start a process-wide profiler if `SPECIALSAUCE_PROFILE` is set.
+
+  Called when `specialsauce` is imported. The summary is written when
+  the interpreter exits.
+
+  Returns:
+    Profiler: the running profiler, or None.
+  """
+  environ = os.environ if environ is None else environ
+  target = environ.get(ENV_VAR)
+  if not target:
+    return None
+
+  profiler = Profiler()
+  profiler.start()
+
+  def write_summary():
+    profiler.stop()
+    if target in ('-', '1'):
+      print(profiler.to_json(), file=sys.stderr)
+    else:
+      profiler.to_json(target)
+
+  atexit.register(write_summary)
+  return profiler
+
+
+def _traced_memory():
+  """Current and peak traced memory, in bytes.
+
+  Without `tracemalloc.reset_peak`, the peak is since tracing started
+  rather than since the last call, so the current size stands in for it.
+  """
+  current, peak = tracemalloc.get_traced_memory()
+  if not _RESET_PEAK:
+    peak = current
+  return current, peak
+
+
+def _public_functions(module):
+  """Functions defined in `module` with names not starting with '_'.
+
+  Generator functions are skipped, since a wrapper would only time the
+  creation of the generator.
+  """
+  for name, obj in vars(module).items():
+    if (
+      not name.startswith('_')
+      and inspect.isfunction(obj)
+      and obj.__module__ == module.__name__
+      and not inspect.isgeneratorfunction(obj)
+    ):
+      yield name, obj
+
+
+def _size(arg):
+  """Number of elements of an array-like argument, else 0."""
+  if isinstance(arg, (str, bytes)):
+    return 0
+  size = getattr(arg, 'size', None)
+  if isinstance(size, int):
+    return size
+  if isinstance(arg, (list, tuple)):
+    return len(arg)
+  return 0
@@ -0,0 +1,152 @@
+"""Resampling of irregular recordings onto a uniform time grid.
+
+Watches record every second, at irregular "smart recording" intervals,
+or with gaps where the athlete paused. The functions downstream are
+fastest on uniform 1-second samples with `time_series=None`, so this
+module puts a recording onto a uniform grid first:
+
+  streams = resample.resample(time, speed, grade)
+  power = core.power_met(streams['speed'], streams['grade'])
+  ngp = trainingpeaks.normalize(
+    streams['speed'] * trainingpeaks.ngp_speed_factor(streams['grade']))
+
+A gap between samples longer than `max_gap` seconds is a pause. By
+default, paused grid points are removed, so the samples are uniform in
+moving time. Alternatively, `sample_weights` gives the duration each
+original sample covers, for weighted averages without resampling.
+
+As elsewhere in this package, each sample covers the interval leading
+up to its timestamp.
+"""
+import numpy as np
+
+from specialsauce import util
+
+
+# Gap (seconds) between samples beyond which the athlete is considered
+# paused. Smart recording rarely leaves gaps over 8 seconds.
+MAX_GAP = 10.0
+
+# What `resample` does with the grid points in a pause.
+PAUSE_MODES = ('remove', 'zero', 'nan')
+
+
+def pause_mask(time_series, max_gap=MAX_GAP):
+  """Which samples come right after a pause.
+
+  Args:
+    time_series (array-like): increasing seconds (or datetimes) of each
+      sample.
+    max_gap (float): longest gap in seconds that is not a pause.
+
+  Returns:
+    numpy.ndarray(bool): True where the gap before a sample is longer
+    than `max_gap`. The first sample is never after a pause.
+  """
+  t = util.to_seconds(time_series)
+  return np.diff(t, prepend=t[:1]) > max_gap
+
+
+def sample_weights(time_series, max_gap=MAX_GAP, step=1.0):
+  """The duration each sample covers, excluding pauses.
+
+  A sample covers the interval since the sample before it. The first
+  sample, and each sample after a pause, covers `step` seconds.
+
+  Args:
+    time_series (array-like): increasing seconds (or datetimes) of each
+      sample.
+    max_gap (float): longest gap in seconds that is not a pause.
+    step (float): seconds covered by a sample with no (unpaused)
+      sample before it.
+
+  Returns:
+    numpy.ndarray: seconds covered by each sample. These sum to the
+    moving time, and weight averages of irregular samples, eg
+    `numpy.average(speed, weights=weights)` for the average moving
+    speed.
+  """
+  t = util.to_seconds(time_series)
+  weights = np.diff(t, prepend=t[:1] - step)
+  weights[weights > max_gap] = step
+  return weights
+
+
+def resample(
+  time_series,
+  speed_series,
+  grade_series=None,
+  step=1.0,
+  max_gap=MAX_GAP,
+  min_speed=None,
+  pauses='remove',
+):
+  """Linearly interpolate speed and grade onto a uniform time grid.
+
+  Each stream is interpolated with one `numpy.interp` over the sorted
+  grid, which costs O(n) in the number of samples.
+
+  Args:
+    time_series (array-like): increasing seconds (or datetimes) of each
+      sample.
+    speed_series (array-like): speed in m/s at each sample.
+    grade_series (array-like): decimal grade at each sample.
+    step (float): grid spacing in seconds.
+    max_gap (float): longest gap in seconds between samples that is
+      not a pause.
+    min_speed (float): if given, grid points slower than this (m/s)
+      are also paused, eg for devices that keep recording while
+      stopped.
+    pauses (str): what to do with grid points within a pause: 'remove'
+      them, so the samples are uniform in moving time; set their speed
+      to 'zero', keeping the grade; or set every stream to 'nan'.
+
+  Returns:
+    dict: arrays of 'time' (seconds since the first sample, at the
+    remaining grid points), 'speed' and, if given, 'grade'. With
+    `pauses='remove'`, 'time' jumps over the pauses, but the samples
+    are `step` apart in moving time, so downstream functions can treat
+    them as uniform.
+  """
+  if pauses not in PAUSE_MODES:
+    raise ValueError(f'pauses must be one of {PAUSE_MODES}, not {pauses!r}.')
+
+  t = util.to_seconds(time_series)
+  if not len(t):
+    streams = ('time', 'speed') + (() if grade_series is None else ('grade',))
+    return {name: np.empty(0) for name in streams}
+  if (np.diff(t) < 0).any():
+    raise ValueError('Times must be increasing.')
+
+  t = t - t[0]
+  grid = step * np.arange(int(np.floor(t[-1] / step)) + 1)
+  streams = {
+    'speed': np.interp(grid, t, np.asarray(speed_series, dtype=float))}
+  if grade_series is not None:
+    streams['grade'] = np.interp(
+      grid, t, np.asarray(grade_series, dtype=float))
+
+  # A grid point is paused if it falls strictly inside a long gap. Gaps
+  # are few, so only their ends are looked up on the grid, and the
+  # paused spans are filled by a cumulative sum of +1 at each start and
+  # -1 after each end.
+  gap = np.flatnonzero(np.diff(t) > max_gap)
+  edges = np.zeros(len(grid) + 1, dtype=np.intp)
+  np.add.at(edges, np.searchsorted(grid, t[gap], side='right'), 1)
+  np.add.at(edges, np.searchsorted(grid, t[gap + 1], side='left'), -1)
+  paused = np.cumsum(edges[:-1]) > 0
+  if min_speed is not None:
+    paused |= streams['speed'] < min_speed
+
+  if pauses == 'remove':
+    if paused.any():
+      moving = ~paused
+      grid = grid[moving]
+      streams = {name: values[moving] for name, values in streams.items()}
+  elif pauses == 'zero':
+    streams['speed'][paused] = 0.0
+  else:
+    for values in streams.values():
+      values[paused] = np.nan
+
+  return {'time': grid, **streams}
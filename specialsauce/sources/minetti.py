@@ -1,8 +1,23 @@
 import numpy as np
 
+from specialsauce import util
 
-def poly_5(x, a, b, c, d, e, f):
+
+# Range of decimal grades over which Minetti's curve fits are valid.
+GRADE_RANGE = (-0.45, 0.45)
+
+# Coefficients of the curve fits for the costs of running and walking,
+# in J/kg/m, highest degree first (the arguments of `poly_5`).
+RUN_COEFFICIENTS = (155.4, -30.4, -43.3, 46.3, 19.5, 3.6)
+WALK_COEFFICIENTS = (280.5, -58.7, -76.8, 51.9, 19.6, 2.5)
+
+
+def poly_5(x, a, b, c, d, e, f, out=None):
   """Generic 5th-order polynomial function.
+
+  The polynomial is evaluated by Horner's method. For arrays, every
+  step is done in place in a single buffer, which keeps the dtype of
+  `x` if it is a float type (eg float32).
   
   Args:
     x (float or array(float)): the quantity to apply the polynomial to.
@@ -13,14 +28,29 @@ def poly_5(x, a, b, c, d, e, f):
     d (float): coefficient for the second-order term.
     e (float): coefficient for the first-order term.
     f (float): coefficient for the zeroth-order term.
+    out (numpy.ndarray): optional array to write the result into. It
+      must not share memory with `x`.
 
   Returns:
-    float
+    float, or an array (a Series if `x` is one) with the shape of `x`.
   """
-  return a * x ** 5 + b * x ** 4 + c * x ** 3 + d * x ** 2 + e * x + f
+  if out is None and np.ndim(x) == 0:
+    return ((((a * x + b) * x + c) * x + d) * x + e) * x + f
 
+  x_arr = np.asarray(x)
+  if out is None:
+    out = np.empty(x_arr.shape, dtype=np.result_type(x_arr.dtype, 1.0))
 
-def cost_of_running(decimal_grade):
+  np.multiply(x_arr, a, out=out)
+  for coef in (b, c, d, e):
+    out += coef
+    out *= x_arr
+  out += f
+
+  return util.wrap_like(out, x)
+
+
+def cost_of_running(decimal_grade, out=None):
   """Energy consumption of running (per kg per m), according Minetti 2002.
 
   This is the curve fit supplied by the authors of the paper.
@@ -29,17 +59,21 @@ def cost_of_running(decimal_grade):
 
   Args:
     decimal_grade (float): decimal grade of terrain, i.e. 0.2 for 20%.
-    equation (str): 
+    out (numpy.ndarray): optional array to write the result into.
   Returns:
     float: the estimated cost of running, in J/kg/m, at the given grade.
+      Arrays give an array of the same float type (float32 stays
+      float32).
   """
   # Constrain decimal grade to the range of the equation's validity
-  decimal_grade = np.clip(decimal_grade, -0.45, 0.45)
+  clipped_grade = np.clip(decimal_grade, *GRADE_RANGE)
 
-  return poly_5(decimal_grade, 155.4, -30.4, -43.3, 46.3, 19.5, 3.6)
+  cost = poly_5(clipped_grade, *RUN_COEFFICIENTS, out=out)
 
+  return util.wrap_like(cost, decimal_grade)
 
-def cost_of_walking(decimal_grade):
+
+def cost_of_walking(decimal_grade, out=None):
   """Energy consumption of walking (per kg per m), according Minetti 2002.
 
   This is the curve fit supplied by the authors of the paper.
@@ -49,11 +83,15 @@ def cost_of_walking(decimal_grade):
 
   Args:
     decimal_grade (float): decimal grade of terrain, i.e. 0.2 for 20%.
-    equation (str): 
+    out (numpy.ndarray): optional array to write the result into.
   Returns:
     float: the estimated cost of walking, in J/kg/m, at the given grade.
+      Arrays give an array of the same float type (float32 stays
+      float32).
   """
   # Constrain decimal grade to the range of the equation's validity
-  decimal_grade = np.clip(decimal_grade, -0.45, 0.45)
+  clipped_grade = np.clip(decimal_grade, *GRADE_RANGE)
+
+  cost = poly_5(clipped_grade, *WALK_COEFFICIENTS, out=out)
 
-  return poly_5(decimal_grade, 280.5, -58.7, -76.8, 51.9, 19.6, 2.5)
\ No newline at end of file
+  return util.wrap_like(cost, decimal_grade)
\ No newline at end of file
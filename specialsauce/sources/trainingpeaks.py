@@ -1,9 +1,49 @@
-import numpy as np
-import pandas as pd
-from scipy.interpolate import interp1d
+import datetime
+import functools
+import json
+import struct
 
+import numpy as np
 
-def ngp_speed_factor(decimal_grade):
+from specialsauce import util
+
+
+# Range of decimal grades over which the NGP speed-factor is defined.
+GRADE_RANGE = (-0.25, 0.3)
+
+# Percent grades and the NGP speed-factors observed at each one,
+# in order of increasing grade.
+ADJUSTMENT_FACTORS = np.array([
+  [-45, 3.934],
+  [-30, 2.297],
+  [-27, 2.051],
+  [-26, 1.33],
+  [-25, 1.28],
+  [-20, 1.067],
+  [-15, 0.921],
+  [-10, 0.857],
+  [-8, 0.856],
+  [-6, 0.87],
+  [-4, 0.897],
+  [-2, 0.941],
+  [0, 1.0],
+  [2, 1.074],
+  [4, 1.162],
+  [6, 1.266],
+  [8, 1.383],
+  [10, 1.514],
+  [15, 1.905],
+  [20, 2.365],
+  [25, 2.874],
+  [30, 3.429],
+  [31, 3.556],
+  [32, 20.0],
+  [45, 28.235],
+])
+_DECIMAL_GRADES = ADJUSTMENT_FACTORS[:, 0] / 100
+
+
+def ngp_speed_factor(decimal_grade, resolution=None, dtype=None):
   """Calculate TrainingPeaks' NGP pace-factor as a function of percent grade.
 
   The factor will be greater than 1.0 if NGP is faster than horizontal speed,
@@ -24,49 +64,50 @@ def ngp_speed_factor(decimal_grade):
 
   Args:
     grade (float): Decimal grade to evaluate the NGP speed-factor.
+    resolution (float): If provided, look up the factor in a table
+      precomputed at this decimal-grade spacing (eg 0.001 for 0.1%)
+      rather than interpolating between the observed values. The
+      table is built once per resolution. This only speeds up arrays;
+      single numbers are always interpolated.
+    dtype (numpy.dtype): float type of the result for array inputs.
+      Default float64. float32 results are within 1e-7 (relative) of
+      the float64 ones, and are computed without float64 temporaries
+      the size of the input.
   Returns:
-    float: Factor that converts speed to NGP adjusted speed.
+    float or numpy.ndarray: Factor that converts speed to NGP adjusted
+      speed. A Series input gives a Series with the same index.
   """
-  # Constrain decimal grade to the range of the equation's validity
-  decimal_grade = np.clip(decimal_grade, -0.25, 0.3)
-
-  adjustment_factors = {
-    45: 28.235,
-    32: 20.0,
-    31: 3.556,
-    30: 3.429,
-    25: 2.874,
-    20: 2.365,
-    15: 1.905,
-    10: 1.514,
-    8: 1.383,
-    6: 1.266,
-    4: 1.162,
-    2: 1.074,
-    0: 1.0,
-    -2: 0.941,
-    -4: 0.897,
-    -6: 0.87,
-    -8: 0.856,
-    -10: 0.857,
-    -15: 0.921,
-    -20: 1.067,
-    -25: 1.28,
-    -26: 1.33,
-    -27: 2.051,
-    -30: 2.297,
-    -45: 3.934
-  }
-
-  interp_fn = interp1d(
-    list(adjustment_factors.keys()),
-    list(adjustment_factors.values())
+  # Constrain decimal grade to the range of the equation's validity.
+  # Single numbers are interpolated directly, which is faster than any
+  # table lookup.
+  if isinstance(decimal_grade, (int, float)):
+    return np.interp(
+      min(max(decimal_grade, GRADE_RANGE[0]), GRADE_RANGE[1]) * 100,
+      ADJUSTMENT_FACTORS[:, 0],
+      ADJUSTMENT_FACTORS[:, 1],
+    )
+
+  if resolution is not None:
+    factor = _ngp_table(resolution)(decimal_grade, dtype=dtype)
+    return util.wrap_like(factor, decimal_grade)
+
+  factor = util.interp(
+    decimal_grade,
+    _DECIMAL_GRADES,
+    ADJUSTMENT_FACTORS[:, 1],
+    bounds=GRADE_RANGE,
+    dtype=dtype,
   )
 
-  return interp_fn(decimal_grade * 100)
+  return util.wrap_like(factor, decimal_grade)
+
 
+@functools.lru_cache(maxsize=None)
+def _ngp_table(resolution):
+  return util.LookupTable(ngp_speed_factor, *GRADE_RANGE, resolution)
 
-def normalize(series):
+
+def normalize(series, time_series=None, window='30s'):
   """Calculates the TrainingPeaks norm of a series of data.
 
   This works like a modified version of an average, based on principles
@@ -90,37 +131,87 @@ def normalize(series):
   between VO2 (oxygen consumption) and blood lactate tend to follow a 
   4th-order relationship.
 
+  Args:
+    series (array-like): values to normalize, eg speed or power.
+    time_series (array-like): seconds from the start of the activity
+      (or datetimes) for each value. If None, values are assumed to be
+      recorded at 1-second intervals.
+    window (int, float, str, or pandas.Timedelta): duration of the
+      rolling average. Numbers are seconds.
+
   References:
     https://help.trainingpeaks.com/hc/en-us/articles/204071804-Normalized-Power
 
   """
-  series_rolling = sma(series, 30)
-  return l4_norm(series_rolling[29:])
+  window = util.duration_to_seconds(window)
+
+  if time_series is None:
+    window_len = int(round(window))
+    series_rolling = np.asarray(sma(series, window_len))
+    return l4_norm(series_rolling[window_len - 1:])
+
+  t = util.to_seconds(time_series)
+  if not len(t):
+    return np.nan
+  series_rolling = np.asarray(sma(series, window, time_series=t))
+
+  # Each sample covers the second leading up to its timestamp, so a
+  # sample's window is full once it is `window - 1` seconds in.
+  return l4_norm(series_rolling[t - t[0] >= window - 1])
 
 
 def sma(x_series, window_len, time_series=None):
-  """Simple moving average, as implemented by TrainingPeaks."""
+  """Simple moving average, as implemented by TrainingPeaks.
 
-  if time_series is None:
-    sma = x_series.rolling(window_len).mean()
-  else:
-    # Assume we are working with seconds.
-    if isinstance(window_len, (int, float)):
-      window_len = pd.to_timedelta(window_len, unit='s')
-    elif isinstance(window_len, str):
-      window_len = pd.to_timedelta(window_len)
+  Evaluated with cumulative sums, so the cost does not depend on the
+  window length. NaN values are left out of the averages.
 
-    x_series.index = time_series.map(lambda x: pd.to_datetime(x, unit='s'))
+  Args:
+    x_series (array-like): values to average.
+    window_len (int, float, str, or pandas.Timedelta): length of the
+      window. Without `time_series`, this is a number of samples, and
+      the first `window_len - 1` averages are NaN. With `time_series`,
+      it is a duration (numbers are seconds), and each average covers
+      the samples less than `window_len` before it.
+    time_series (array-like): increasing seconds from the start of the
+      activity (or datetimes) for each value.
 
-    sma = x_series.rolling(window_len).mean()
+  Returns:
+    numpy.ndarray, or pandas.Series with the index of `x_series` if
+    `x_series` is a Series.
+  """
+  x = np.asarray(x_series, dtype=float)
+  valid = ~np.isnan(x)
+  cum_sum = np.concatenate([[0.0], np.cumsum(np.where(valid, x, 0.0))])
+  cum_count = np.concatenate([[0], np.cumsum(valid)])
+
+  end = np.arange(1, len(x) + 1)
+  if time_series is None:
+    start = np.maximum(end - window_len, 0)
+    min_count = window_len
+  else:
+    window_len = util.duration_to_seconds(window_len)
+    t = util.to_seconds(time_series)
+    start = np.searchsorted(t, t - window_len, side='right')
+    min_count = 1
 
-    sma.index = time_series.index
+  count = cum_count[end] - cum_count[start]
+  with np.errstate(invalid='ignore', divide='ignore'):
+    sma = (cum_sum[end] - cum_sum[start]) / count
+  sma[count < min_count] = np.nan
 
-  return sma
+  return util.wrap_like(sma, x_series)
 
 
 def l4_norm(series):
-  return (series ** 4).mean() ** 0.25
+  """Fourth-root of the mean fourth power, ignoring NaN values.
+
+  NaN if there are no values, or they are all NaN.
+  """
+  x = np.asarray(series, dtype=float)
+  if not np.count_nonzero(~np.isnan(x)):
+    return np.nan
+  return np.nanmean(x ** 4) ** 0.25
 
 
 def training_stress_score(ngp, ftp, duration_sec):
@@ -128,45 +219,295 @@ def training_stress_score(ngp, ftp, duration_sec):
   return 100 * (ngp / ftp) ** 2 * (duration_sec / 3600)
 
 
-def acute_training_load(tss_array, init=0.0):
+def acute_training_load(tss_array, init=0.0, dates=None):
   """ATL
 
   Args:
     tss_arr (list-like): array of Training Stress Score values, assumed
-      to occur exactly [0, 1, 2, ...] days from now.
+      to occur exactly [0, 1, 2, ...] days from now. May be 2-D
+      (athletes x days).
+    init (float or list-like): ATL before the first day. One value per
+      athlete if `tss_arr` is 2-D.
+    dates (list-like): optional dates corresponding to each day of
+      `tss_arr`. See `ewma_days`.
   """
-  return ewma_days(tss_array, 7, init)
+  return ewma_days(tss_array, 7, init, dates=dates)
 
 
-def chronic_training_load(tss_array, init=0.0):
+def chronic_training_load(tss_array, init=0.0, dates=None):
   """CTL
 
   Args:
     tss_arr (list-like): array of Training Stress Score values, assumed
-      to occur exactly [0, 1, 2, ...] days from now.
+      to occur exactly [0, 1, 2, ...] days from now. May be 2-D
+      (athletes x days).
+    init (float or list-like): CTL before the first day. One value per
+      athlete if `tss_arr` is 2-D.
+    dates (list-like): optional dates corresponding to each day of
+      `tss_arr`. See `ewma_days`.
   """
-  return ewma_days(tss_array, 42, init)
+  return ewma_days(tss_array, 42, init, dates=dates)
+
+
+def ewma_days(x_array, n_days, init=0.0, dates=None):
+  """Exponentially-weighted moving average of daily values.
+
+  Each day's average is `(1 - alpha)` times the previous day's average
+  plus `alpha` times that day's value, with `alpha = 1 / n_days`. This is
+  evaluated as a first-order recursive filter, so the cost is linear in
+  the number of days.
 
+  Args:
+    x_array (list-like): daily values, assumed to occur exactly
+      [0, 1, 2, ...] days from now. If 2-D, each row is treated as a
+      separate series (eg athletes x days) and filtered independently.
+    n_days (int): time constant of the average, in days.
+    init (float or list-like): initial value of the average. If
+      `x_array` is 2-D, this may contain one value per row.
+    dates (list-like): optional dates (or datetimes) corresponding to
+      each column of `x_array`. Values are summed into calendar days,
+      and days with no value are filled with zeros. Dates need not be
+      sorted or unique.
+
+  Returns:
+    numpy.ndarray (a Series with the same index if `x_array` is one),
+    or if `dates` is provided, a pandas.Series (1-D input) or
+    pandas.DataFrame (2-D input, one column per day) indexed by the
+    filled range of calendar days.
+  """
+  from scipy.signal import lfilter
 
-def ewma_days(x_array, n_days, init=0.0):
   alpha = 1 / n_days
+
+  if dates is not None:
+    x_array, days = _fill_days(x_array, dates)
+
+  values = np.asarray(x_array, dtype=float)
+  init = np.asarray(init, dtype=float)
+  zi = np.broadcast_to(init, values.shape[:-1])[..., np.newaxis]
+
+  result, _ = lfilter([alpha], [1.0, alpha - 1.0], values, zi=zi)
+
+  if dates is None:
+    return util.wrap_like(result, x_array)
+
+  import pandas as pd
+
+  if result.ndim == 1:
+    return pd.Series(result, index=days)
+  else:
+    return pd.DataFrame(result, columns=days)
+
+
+def _fill_days(x_array, dates):
+  """Sum values into calendar days, zero-filling any days without data.
   
-  return [
-    init * (1 - alpha) ** i + sum(
-      x_array[i - n] * alpha * (1 - alpha) ** n 
-      for n in range(i + 1)) 
-    for i in range(len(x_array))
-  ]
+  Returns:
+    tuple(numpy.ndarray, pandas.DatetimeIndex): the daily values (with
+    days along the last axis) and the days they correspond to.
+  """
+  import pandas as pd
+
+  x_array = np.asarray(x_array, dtype=float)
+  days = pd.DatetimeIndex(pd.to_datetime(dates)).normalize()
+  if len(days) != x_array.shape[-1]:
+    raise ValueError(
+      f'Got {len(days)} dates for {x_array.shape[-1]} values.'
+    )
+
+  day_range = pd.date_range(days.min(), days.max(), freq='D')
+  day_ix = (days - day_range[0]).days.to_numpy()
+
+  filled = np.zeros(x_array.shape[:-1] + (len(day_range),))
+  np.add.at(filled, (..., day_ix), x_array)
+
+  return filled, day_range
+
+
+# Training statuses in order of increasing TSB, each with the TSB above
+# which it applies.
+TRAINING_STATUSES = (
+  ('Overreaching', -np.inf),
+  ('Productive', -30),
+  ('Maintenance', -10),
+  ('Extensively recovered and likely losing fitness', 15),
+  ('Likely losing fitness quickly', 25),
+)
 
 
 def training_status(training_stress_balance):
-  if training_stress_balance > 25:
-    return 'Likely losing fitness quickly'
-  elif training_stress_balance > 15:
-    return 'Extensively recovered and likely losing fitness'
-  elif training_stress_balance > -10:
-    return 'Maintenance'
-  elif training_stress_balance > -30:
-    return 'Productive'
-  else:
-    return 'Overreaching'
+  """Describe the training status implied by TSB.
+
+  Args:
+    training_stress_balance (float or array-like): TSB, ie CTL - ATL.
+
+  Returns:
+    str, or an object array (a Series if the input is one) of str.
+  """
+  codes = training_status_codes(training_stress_balance)
+  labels = np.array([status for status, _ in TRAINING_STATUSES], dtype=object)
+  if np.ndim(codes) == 0:
+    return labels[codes]
+
+  return util.wrap_like(labels[codes], training_stress_balance)
+
+
+def training_status_codes(training_stress_balance):
+  """Index into `TRAINING_STATUSES` for each TSB.
+
+  NaN TSB counts as 'Overreaching', like any TSB at or below -30.
+
+  Returns:
+    int, or numpy.ndarray(int8) for array inputs.
+  """
+  tsb = np.asarray(training_stress_balance, dtype=float)
+  codes = np.zeros(tsb.shape, dtype=np.int8)
+  for _, lower in TRAINING_STATUSES[1:]:
+    codes += tsb > lower
+
+  return int(codes) if codes.ndim == 0 else codes
+
+
+class TrainingLoadState(object):
+  """Running ATL and CTL, updated one day at a time.
+
+  Applying `update` to each day's TSS in turn gives the same values as
+  `acute_training_load` and `chronic_training_load` over the whole
+  history, but each update only needs the previous state.
+
+  Args:
+    atl (float): acute training load as of `date`.
+    ctl (float): chronic training load as of `date`.
+    date (datetime.date): day that `atl` and `ctl` apply to. If None,
+      the values are treated like the `init` argument of
+      `acute_training_load` and `chronic_training_load`: the first
+      update builds on them directly, whatever its date.
+  """
+  atl_days = 7
+  ctl_days = 42
+
+  _struct = struct.Struct('<ddq')
+
+  def __init__(self, atl=0.0, ctl=0.0, date=None):
+    self.atl = float(atl)
+    self.ctl = float(ctl)
+    self.date = _to_date(date) if date is not None else None
+
+  def __repr__(self):
+    return (
+      f'{type(self).__name__}(atl={self.atl!r}, ctl={self.ctl!r}, '
+      f'date={self.date!r})'
+    )
+
+  def __eq__(self, other):
+    if not isinstance(other, TrainingLoadState):
+      return NotImplemented
+    return (self.atl, self.ctl, self.date) == (other.atl, other.ctl, other.date)
+
+  @property
+  def tsb(self):
+    """Training Stress Balance: CTL minus ATL."""
+    return self.ctl - self.atl
+
+  @property
+  def status(self):
+    """The `training_status` corresponding to the current TSB."""
+    return training_status(self.tsb)
+
+  def update(self, date, tss):
+    """Add a day's Training Stress Score to the running loads.
+
+    Days skipped since the last update are treated as rest days (zero
+    TSS). Several updates on the same day add up, as if their TSS had
+    been summed.
+
+    Args:
+      date (datetime.date, datetime.datetime, or str): the day of the
+        workout(s).
+      tss (float): Training Stress Score to add on that day.
+
+    Returns:
+      TrainingLoadState: this object, updated in-place.
+    """
+    date = _to_date(date)
+
+    if self.date is None:
+      days = 0
+    else:
+      days = (date - self.date).days
+      if days < 0:
+        raise ValueError(
+          f'Cannot update a state dated {self.date} with TSS from {date}.'
+        )
+
+    self.atl = _ewma_step(self.atl, tss, self.atl_days, days)
+    self.ctl = _ewma_step(self.ctl, tss, self.ctl_days, days)
+    self.date = date
+
+    return self
+
+  def to_dict(self):
+    return {
+      'atl': self.atl,
+      'ctl': self.ctl,
+      'date': self.date.isoformat() if self.date is not None else None,
+    }
+
+  @classmethod
+  def from_dict(cls, d):
+    return cls(d['atl'], d['ctl'], d.get('date'))
+
+  def to_json(self):
+    return json.dumps(self.to_dict())
+
+  @classmethod
+  def from_json(cls, s):
+    return cls.from_dict(json.loads(s))
+
+  def to_bytes(self):
+    """Pack the state into 24 bytes (two doubles and a day ordinal)."""
+    ordinal = self.date.toordinal() if self.date is not None else 0
+    return self._struct.pack(self.atl, self.ctl, ordinal)
+
+  @classmethod
+  def from_bytes(cls, b):
+    atl, ctl, ordinal = cls._struct.unpack(b)
+    date = datetime.date.fromordinal(ordinal) if ordinal > 0 else None
+    return cls(atl, ctl, date)
+
+  @classmethod
+  def from_history(cls, tss_array, dates, atl=0.0, ctl=0.0):
+    """Initialize the state from a TSS history.
+
+    Args:
+      tss_array (list-like): TSS values.
+      dates (list-like): dates corresponding to each TSS value. See
+        `ewma_days`.
+      atl (float): ATL before the first day.
+      ctl (float): CTL before the first day.
+    """
+    atl_series = acute_training_load(tss_array, init=atl, dates=dates)
+    ctl_series = chronic_training_load(tss_array, init=ctl, dates=dates)
+
+    return cls(atl_series.iloc[-1], ctl_series.iloc[-1], atl_series.index[-1])
+
+
+def _ewma_step(avg, x, n_days, days):
+  """Advance a daily EWMA by `days` days, ending with a value of `x`."""
+  alpha = 1 / n_days
+
+  if days == 0:
+    return avg + alpha * x
+
+  return avg * (1 - alpha) ** days + alpha * x
+
+
+def _to_date(date):
+  if isinstance(date, datetime.datetime):
+    return date.date()
+  elif isinstance(date, datetime.date):
+    return date
+
+  import pandas as pd
+
+  return pd.Timestamp(date).date()
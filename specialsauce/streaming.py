@@ -0,0 +1,201 @@
+"""Chunk-by-chunk versions of the time-series calculations.
+
+For live data, samples arrive a few at a time. The classes here carry
+the state of a calculation from one chunk to the next, so the outputs
+are the same as running the batch function over everything received so
+far, with memory bounded by the length of the rolling window (if any)
+and constant cost per sample.
+
+Times, if given, are seconds (or datetimes, which are converted to
+seconds since the first one received) and must increase from chunk to
+chunk.
+"""
+import math
+
+import numpy as np
+
+from specialsauce import core, util
+from specialsauce.sources import trainingpeaks
+
+
+class _Clock(object):
+  """Converts each chunk's times to seconds on a common scale."""
+  def __init__(self):
+    self.origin = None
+
+  def to_seconds(self, time):
+    time = np.asarray(time)
+    if len(time) and time.dtype.kind in 'MO':
+      if self.origin is None:
+        self.origin = np.datetime64(time[0], 'ns')
+      return util.to_seconds(time, origin=self.origin)
+    return util.to_seconds(time)
+
+
+class PowerMetStream(object):
+  """Metabolic power, chunk by chunk. See `core.power_met`.
+
+  Args:
+    tau (float): time constant of the metabolic response, in seconds.
+  """
+  def __init__(self, tau=20):
+    self.half_life = tau * math.log(2)
+    self.power = 0.0
+    self.time = None
+    self._clock = _Clock()
+
+  def update(self, speed, grade=None, time=None):
+    """Calculate metabolic power for the next chunk of samples.
+
+    Args:
+      speed (array-like): horizontal speed in meters per second.
+      grade (array-like): decimal grade at each sample.
+      time (array-like): seconds (or datetimes) of each sample. Either
+        every chunk has times, or none do, in which case samples are
+        taken to be 1 second apart.
+
+    Returns:
+      numpy.ndarray: metabolic power in W/kg at each sample.
+    """
+    power_ss = np.asarray(core.power_met_ss(speed, grade), dtype=float)
+    valid = np.flatnonzero(~np.isnan(power_ss))
+
+    # `self.time` is the time of the last valid sample (or one unit
+    # before the first sample). Without times, samples are counted.
+    if time is None:
+      if self.time is None:
+        self.time = -1.0
+    else:
+      time = self._clock.to_seconds(time)
+      if self.time is None and len(time):
+        self.time = time[0] - 1
+
+    power = util.ewma_halflife(
+      power_ss,
+      self.half_life,
+      time_series=time,
+      init=self.power,
+      init_time=self.time,
+    )
+
+    if len(valid):
+      self.power = power[-1]
+      self.time = self.time + len(valid) if time is None else time[valid[-1]]
+
+    return power
+
+
+class NormalizeStream(object):
+  """TrainingPeaks norm (eg NGP or NP), chunk by chunk.
+
+  See `trainingpeaks.normalize`. Only the last `window` of samples is
+  kept between chunks, along with a running sum of fourth powers.
+
+  Args:
+    window (int, float, str, or pandas.Timedelta): duration of the
+      rolling average. Numbers are seconds.
+  """
+  def __init__(self, window='30s'):
+    self.window = util.duration_to_seconds(window)
+    self.sum_4 = 0.0
+    self.count = 0
+    self._x = np.empty(0)
+    self._t = np.empty(0)
+    self._t0 = None
+    self._n = 0
+    self._clock = _Clock()
+
+  @property
+  def value(self):
+    """The norm of all samples received so far."""
+    return (self.sum_4 / self.count) ** 0.25 if self.count else np.nan
+
+  def update(self, values, time=None):
+    """Add the next chunk of samples.
+
+    Args:
+      values (array-like): values to normalize.
+      time (array-like): seconds (or datetimes) of each sample. Either
+        every chunk has times, or none do, in which case samples are
+        taken to be 1 second apart.
+
+    Returns:
+      numpy.ndarray: the running norm after each sample.
+    """
+    x_new = np.asarray(values, dtype=float)
+    n_new = len(x_new)
+    if not n_new:
+      return np.empty(0)
+    x = np.concatenate([self._x, x_new])
+
+    if time is None:
+      window_len = int(round(self.window))
+      rolling = trainingpeaks.sma(x, window_len)[len(x) - n_new:]
+      keep = self._n + np.arange(n_new) >= window_len - 1
+
+      # Keep the samples the next chunk's first window will need.
+      self._x = x[len(x) - min(len(x), window_len - 1):]
+    else:
+      t_new = self._clock.to_seconds(time)
+      t = np.concatenate([self._t, t_new])
+      if self._t0 is None:
+        self._t0 = t_new[0]
+      rolling = trainingpeaks.sma(x, self.window, time_series=t)
+      rolling = rolling[len(x) - n_new:]
+      keep = t_new - self._t0 >= self.window - 1
+
+      start = np.searchsorted(t, t[-1] - self.window, side='right')
+      self._x = x[start:]
+      self._t = t[start:]
+
+    self._n += n_new
+
+    rolling_4 = np.where(keep, rolling, np.nan) ** 4
+    valid = ~np.isnan(rolling_4)
+    sum_4 = self.sum_4 + np.cumsum(np.where(valid, rolling_4, 0.0))
+    count = self.count + np.cumsum(valid)
+    self.sum_4 = sum_4[-1]
+    self.count = count[-1]
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+      return (sum_4 / count) ** 0.25
+
+
+def iter_power_met(chunks, tau=20):
+  """Generate metabolic power for each chunk of a stream.
+
+  Args:
+    chunks (iterable): mappings (eg dicts or DataFrames) with a 'speed'
+      entry and optional 'grade' and 'time' entries.
+    tau (float): time constant of the metabolic response, in seconds.
+
+  Yields:
+    numpy.ndarray: metabolic power for each chunk.
+  """
+  stream = PowerMetStream(tau=tau)
+  for chunk in chunks:
+    yield stream.update(
+      chunk['speed'],
+      grade=chunk['grade'] if 'grade' in chunk else None,
+      time=chunk['time'] if 'time' in chunk else None,
+    )
+
+
+def iter_normalize(chunks, window='30s'):
+  """Generate the running norm for each chunk of a stream.
+
+  Args:
+    chunks (iterable): mappings (eg dicts or DataFrames) with a 'value'
+      entry and an optional 'time' entry.
+    window (int, float, str, or pandas.Timedelta): duration of the
+      rolling average. Numbers are seconds.
+
+  Yields:
+    numpy.ndarray: the running norm after each sample of each chunk.
+  """
+  stream = NormalizeStream(window=window)
+  for chunk in chunks:
+    yield stream.update(
+      chunk['value'],
+      time=chunk['time'] if 'time' in chunk else None,
+    )
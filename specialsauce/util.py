@@ -1,4 +1,134 @@
-import pandas as pd
+import datetime
+import functools
+import re
+import sys
+
+import numpy as np
+
+
+def first_series(*inputs):
+  """The first of `inputs` that is a pandas Series, or None.
+
+  pandas, scipy and numba are slow to import, so throughout the package
+  they are imported only by the functions that need them, and numeric
+  code runs on numpy alone. Checking for a Series must not import
+  pandas either: if pandas has not been imported, none of the inputs
+  can be a Series.
+  """
+  pd = sys.modules.get('pandas')
+  if pd is None:
+    return None
+
+  for x in inputs:
+    if isinstance(x, pd.Series):
+      return x
+
+  return None
+
+
+def wrap_like(values, *inputs):
+  """Wrap an array in a pandas Series if any of the inputs was one.
+
+  The Series takes the index of the first Series in `inputs`, and
+  shares memory with `values`.
+  """
+  series = first_series(*inputs)
+  if series is None:
+    return values
+
+  pd = sys.modules['pandas']
+  return pd.Series(values, index=series.index, copy=False)
+
+
+# Float arrays are processed in blocks of this many samples wherever
+# NumPy would otherwise make float64 temporaries of the whole input.
+BLOCK_SIZE = 1 << 16
+
+
+def float_dtype(dtype=None):
+  """Validate a `dtype` option, where None means float64.
+
+  Raises:
+    ValueError: if `dtype` is not a floating-point type.
+  """
+  dtype = np.dtype(float if dtype is None else dtype)
+  if dtype.kind != 'f':
+    raise ValueError(f'dtype must be a floating-point type, not {dtype}.')
+  return dtype
+
+
+def interp(x, xp, fp, bounds=None, dtype=None):
+  """`numpy.interp`, evaluated block by block into an array of `dtype`.
+
+  `numpy.interp` always computes in float64. Working in blocks keeps
+  its temporaries small, so a float32 result needs little more memory
+  than the result itself.
+
+  Args:
+    x (array-like): points at which to evaluate.
+    xp (numpy.ndarray): increasing x-coordinates of the data points.
+    fp (numpy.ndarray): y-coordinates of the data points.
+    bounds (tuple(float)): if given, `x` is clipped to this range first.
+    dtype (numpy.dtype): float type of the result. Default float64.
+
+  Returns:
+    numpy.ndarray: the interpolated values, with the shape of `x`.
+  """
+  x = np.asarray(x)
+  out = np.empty(x.shape, dtype=float_dtype(dtype))
+  for x_block, out_block in blocks(x, out):
+    if bounds is not None:
+      x_block = np.clip(x_block, *bounds)
+    out_block[:] = np.interp(x_block, xp, fp)
+  return out
+
+
+def blocks(x, out):
+  """Generate matching flat slices of `x` and `out`, `BLOCK_SIZE` at a time.
+
+  `out` must be contiguous, so that its slices are views.
+  """
+  x_flat = x.reshape(-1)
+  out_flat = out.reshape(-1)
+  for start in range(0, x_flat.size, BLOCK_SIZE):
+    yield (
+      x_flat[start:start + BLOCK_SIZE], out_flat[start:start + BLOCK_SIZE])
+
+
+class LookupTable(object):
+  """A function tabulated at evenly-spaced points for fast evaluation.
+
+  Inputs are clipped to the table's range and rounded to the nearest
+  tabulated point, so the error is bounded by half the resolution
+  times the function's steepest slope.
+
+  Args:
+    func (callable): vectorized function to tabulate.
+    x_min (float): lower end of the table's range.
+    x_max (float): upper end of the table's range.
+    resolution (float): spacing between tabulated points.
+  """
+  def __init__(self, func, x_min, x_max, resolution):
+    if resolution <= 0:
+      raise ValueError('resolution must be positive.')
+    self.x_min = x_min
+    self.x_max = x_max
+    self.resolution = resolution
+    n = int(np.ceil((x_max - x_min) / resolution)) + 1
+    self.x = np.minimum(x_min + resolution * np.arange(n), x_max)
+    self.y = np.asarray(func(self.x), dtype=float)
+
+  def __call__(self, x, dtype=None):
+    x = np.asarray(x)
+    out = np.empty(x.shape, dtype=float_dtype(dtype))
+    for x_block, out_block in blocks(x, out):
+      # NaN has no index; look up zero in its place and restore it after.
+      missing = np.isnan(x_block)
+      x_block = np.clip(np.nan_to_num(x_block), self.x_min, self.x_max)
+      ix = np.rint((x_block - self.x_min) / self.resolution).astype(np.intp)
+      out_block[:] = self.y[ix]
+      out_block[missing] = np.nan
+    return out
 
 
 def ewma(x_arr, time_arr, alpha, init=0.0):
@@ -8,34 +138,42 @@ def ewma(x_arr, time_arr, alpha, init=0.0):
   steady-state when starting out. This is different than the pandas EWMA
   implementation, which keeps the first value of x-arr as the first
   value of the average.
+
+  The first value of the average is `init + alpha * x_arr[0]`. After
+  that, the average decays by `(1 - alpha) ** dt`, where `dt` is the
+  number of days since the previous value, and adds `alpha` times the
+  new value.
   
   Args:
-    x_arr (list(float)): A series of values to calculate a EWMA of.
-    time_arr (list(datetime.timedelta, datetime.datetime, or datetime.date)):
-      Times corresponding to each value of x_arr.
+    x_arr (array-like): A series of values to calculate a EWMA of. If
+      2-D, each row is a separate series (eg one per athlete) sharing
+      the same times.
+    time_arr (array-like): Times corresponding to each value (column)
+      of x_arr, as datetime.timedelta, datetime.datetime, or
+      datetime.date objects, numpy datetime64 or timedelta64 values, or
+      numbers of days.
     alpha (float): Decay coefficient for the EWMA. Must be 0 <= alpha <= 1.
       The smaller the alpha, the more important old values are to the
       average, or in other words longer the average's memory.
-  """
-  time_arr = pd.Series(time_arr)
-
-  # Convert to timedelta with first value at 0.
-  timedelta_array = time_arr - time_arr[0]
+    init (float or array-like): initial value of the average. If `x_arr`
+      is 2-D, this may contain one value per row.
 
-  # Convert to decimal days
-  delta_day_decimal_array = [d.total_seconds() / 86400 for d in timedelta_array]
+  Returns:
+    numpy.ndarray: the moving average, with the same shape as `x_arr`.
+  """
+  t = np.asarray(time_arr)
+  if not len(t):
+    return np.empty(np.shape(x_arr))
+  if t.dtype.kind in 'iuf':
+    days = t.astype(float)
+  else:
+    days = to_seconds(t) / 86400
 
-  # Initialize the moving average
-  x_avg_arr = [init + x_arr[0] * alpha]
+  delta_days = np.diff(days, prepend=days[0])
 
-  # Recursively calculate the average at each time step
-  for i in range(1, len(x_arr)):
-    x_avg_arr.append(
-      x_avg_arr[i-1] * (1 - alpha) ** (delta_day_decimal_array[i] - delta_day_decimal_array[i-1])
-      + x_arr[i] * alpha
-    )
+  decay = (1 - alpha) ** delta_days
 
-  return x_avg_arr
+  return _decay_filter(x_arr, decay, alpha, init)
 
 
 def ewma_pandas(x_series, half_life, time_series=None):
@@ -44,97 +182,289 @@ def ewma_pandas(x_series, half_life, time_series=None):
   Behaves like O2 consumption - takes a while to reach steady-state
   when starting out.
 
+  This used to be a pandas-only copy of `ewma_halflife`, and is kept as
+  an alias of it. Arrays and Series are both accepted.
+
   Args:
-    x_series (pandas.Series): Values to make a EWMA of.
+    x_series (array-like): Values to make a EWMA of.
     half_life (int, str, or pandas.timedelta): half-life of the EWMA.
       If int, and time_series is provided, assumed to be integer seconds.
-    time_series (pandas.Series): integer seconds from the start of the
+    time_series (array-like): integer seconds from the start of the
       activity. If present, these will be used as coordinates over which
       we take the moving average. Default None.
   """
+  return ewma_halflife(x_series, half_life, time_series=time_series)
 
-  # (no longer necessary) Calculate alpha from half-life.
-  # alpha = 1 - math.exp(-math.log(2) / half_life)
-  # alpha = 1 - math.exp(-1 / tau)
-
-  x_series_pad = pd.concat([pd.Series([0.0]), x_series])
 
-  if time_series is None:
-    ewm_pad = x_series_pad.ewm(
-      # alpha=(1 - math.exp(-1 / tau)),
-      # halflife=(-1.0 * math.log(0.5) * tau),
-      halflife=half_life,
-      adjust=False,
-      ignore_na=True,
-    ).mean()
-
-    return ewm_pad[1:]
-  
-
-def ewma_halflife(x_series, half_life, time_series=None):
+def ewma_halflife(
+  x_series,
+  half_life,
+  time_series=None,
+  init=0.0,
+  init_time=None,
+  dtype=None,
+):
   """Exponentially-weighted moving average.
   
   Behaves like O2 consumption - takes a while to reach steady-state
-  when starting out.
+  when starting out. The average is taken to be `init` (zero) one time
+  unit before the first sample, and at each sample it moves toward that
+  sample's value by `1 - 0.5 ** (dt / half_life)`, where `dt` is the
+  time since the previous sample. This is evaluated directly, in
+  linear time, rather than by padding the series with zeros.
+
+  NaN values are skipped: the average holds its previous value, and
+  the next valid sample decays it over the full time since the last
+  valid sample.
 
   Args:
-    x_series (pandas.Series): Values to make a EWMA of.
-    half_life (int, str, or pandas.timedelta): half-life of the EWMA.
-      If int, and time_series is provided, assumed to be integer seconds.
-    time_series (pandas.Series): integer seconds from the start of the
-      activity. If present, these will be used as coordinates over which
-      we take the moving average. Default None.
-  """
+    x_series (array-like): Values to make a EWMA of.
+    half_life (int, float, str, or pandas.Timedelta): half-life of the
+      EWMA. If numeric, it is in the same units as `time_series`
+      (or in samples, if `time_series` is not provided). Strings and
+      timedeltas are converted to seconds.
+    time_series (array-like): seconds from the start of the activity,
+      or datetimes. If present, these will be used as coordinates over
+      which we take the moving average. Default None.
+    init (float): value of the average at `init_time`, for continuing
+      an average from a previous series.
+    init_time (float): time of `init`, in the units of `time_series`.
+      Defaults to one unit before the first sample. Without
+      `time_series`, the valid samples are taken to fall at
+      `init_time + 1`, `init_time + 2`, and so on.
+    dtype (numpy.dtype): float type for the values and the result.
+      Default float64. In float32 the relative error, compared with
+      float64, stays within about 1e-6 times the half-life in samples.
 
-  # (no longer necessary) Calculate alpha from half-life.
-  # alpha = 1 - math.exp(-math.log(2) / half_life)
-  # alpha = 1 - math.exp(-1 / tau)
+  Returns:
+    numpy.ndarray, or pandas.Series with the index of `x_series` if
+    `x_series` is a Series.
+  """
+  x = np.asarray(x_series, dtype=float_dtype(dtype))
+  half_life = duration_to_seconds(half_life)
 
-  x_series_pad = pd.concat([pd.Series([0.0]), x_series])
+  valid = ~np.isnan(x)
+  all_valid = valid.all()
 
   if time_series is None:
-    ewm_pad = x_series_pad.ewm(
-      # alpha=(1 - math.exp(-1 / tau)),
-      # halflife=(-1.0 * math.log(0.5) * tau),
-      halflife=half_life,
-      adjust=False,
-      ignore_na=True,
-    ).mean()
-
-    return ewm_pad[1:]
+    # Samples are 1 unit apart, and skipped NaNs take up no time, so
+    # every step has the same decay.
+    decay = np.exp2(-1.0 / half_life)
   else:
-    # Assume we are working with seconds.
-    if isinstance(half_life, (int, float)):
-      half_life = pd.to_timedelta(half_life, unit='s')
-    elif isinstance(half_life, str):
-      half_life = pd.to_timedelta(half_life)
-
-    # Initialize the moving average so it takes off from 0 and tends
-    # toward steady-state.
-    num_padding = int(half_life.seconds * 40)
-    x_series_pad = pd.Series(
-      [0.0 for i in range(num_padding)] + x_series.to_list()
+    t = to_seconds(time_series)
+    if init_time is None:
+      init_time = t[0] - 1 if len(t) else 0.0
+    if not all_valid:
+      t = t[valid]
+
+    # Times stay in float64, so that long activities keep sub-second
+    # resolution; only the per-step decay is stored in `dtype`.
+    dt = np.empty(len(t))
+    dt[:1] = t[:1] - init_time
+    np.subtract(t[1:], t[:-1], out=dt[1:])
+    dt *= -1.0 / half_life
+    decay = np.exp2(dt, out=dt).astype(x.dtype, copy=False)
+    del dt
+
+  ewm = _decay_filter(
+    x if all_valid else x[valid], decay, 1.0 - decay, init=init)
+
+  if not all_valid:
+    ewm = _fill_skipped(ewm, valid, init)
+
+  return wrap_like(ewm, x_series)
+
+
+def to_seconds(time_series, origin=None):
+  """Convert times to float seconds.
+
+  Args:
+    time_series (array-like): numeric seconds, timedeltas, or
+      datetimes.
+    origin (numpy.datetime64): datetimes are converted to seconds
+      since this time. Defaults to the first value.
+
+  Returns:
+    numpy.ndarray(float): may share memory with `time_series` if it is
+    already a float64 array.
+  """
+  t = np.asarray(time_series)
+  if not len(t):
+    return np.empty(0)
+
+  if t.dtype.kind == 'O':
+    import pandas as pd
+
+    if isinstance(t.flat[0], datetime.timedelta):
+      t = pd.to_timedelta(t).to_numpy()
+    elif isinstance(t.flat[0], datetime.date):
+      t = pd.to_datetime(t, utc=True).tz_localize(None).to_numpy()
+
+  if t.dtype.kind == 'M':
+    t = t - (t[0] if origin is None else np.datetime64(origin, 'ns'))
+
+  if t.dtype.kind == 'm':
+    return t / np.timedelta64(1, 's')
+
+  return t.astype(float, copy=False)
+
+
+def duration_to_seconds(value):
+  """Convert a duration (number of seconds, string, or timedelta) to seconds."""
+  if isinstance(value, datetime.timedelta):
+    return value.total_seconds()
+  elif isinstance(value, np.timedelta64):
+    return value / np.timedelta64(1, 's')
+  elif isinstance(value, str):
+    match = _DURATION_RE.match(value)
+    if match:
+      return float(match.group(1)) * _DURATION_UNITS[match.group(2)]
+
+    import pandas as pd
+
+    return pd.to_timedelta(value).total_seconds()
+  return float(value)
+
+
+# Simple durations like '30s' or '1.5 min' are parsed without pandas.
+# Units follow pandas.to_timedelta.
+_DURATION_UNITS = {
+  'ms': 1e-3, 'milliseconds': 1e-3,
+  's': 1.0, 'sec': 1.0, 'second': 1.0, 'seconds': 1.0,
+  'm': 60.0, 'min': 60.0, 'minute': 60.0, 'minutes': 60.0,
+  'h': 3600.0, 'hour': 3600.0, 'hours': 3600.0,
+  'd': 86400.0, 'day': 86400.0, 'days': 86400.0, 'D': 86400.0,
+}
+_DURATION_RE = re.compile(
+  r'^\s*(\d+(?:\.\d*)?)\s*(' + '|'.join(
+    sorted(_DURATION_UNITS, key=len, reverse=True)) + r')\s*$'
+)
+
+
+def _fill_skipped(y, valid, init):
+  """Expand values computed at the valid samples to every sample.
+
+  Skipped samples take the value of the last valid sample before them,
+  or `init` if there is none.
+  """
+  last_valid = np.maximum.accumulate(
+    np.where(valid, np.arange(valid.shape[-1]), -1)
+  )
+  filled = np.take(y, np.cumsum(valid) - 1, axis=-1)
+  return np.where(last_valid >= 0, filled, init)
+
+
+def _decay_filter(x, decay, gain, init=0.0):
+  """Evaluate `y[i] = decay[i] * y[i-1] + gain[i] * x[i]` along the last axis.
+
+  `y[-1]` is `init`. If `x` is 2-D, `decay` and `gain` are shared by
+  every row. float32 inputs give a float32 result; anything else is
+  computed in float64.
+
+  This is the recursion behind every EWMA in the package. When the
+  decay is constant it is a linear filter; otherwise it runs in numba
+  if installed, or in blocks of a closed-form cumulative sum.
+  """
+  x = np.asarray(x)
+  if x.dtype != np.float32:
+    x = x.astype(float, copy=False)
+  decay = np.broadcast_to(np.asarray(decay, dtype=x.dtype), x.shape[-1:])
+  gain = np.broadcast_to(np.asarray(gain, dtype=x.dtype), x.shape[-1:])
+  init = np.broadcast_to(np.asarray(init, dtype=x.dtype), x.shape[:-1])
+
+  if x.shape[-1] == 0:
+    return np.empty(x.shape, dtype=x.dtype)
+
+  if (decay[1:] == decay[-1]).all() and (gain == gain[0]).all():
+    from scipy import signal
+
+    # The first step's decay only scales the initial value.
+    y, _ = signal.lfilter(
+      gain[:1], np.array([1.0, -decay[-1]], dtype=x.dtype), x,
+      zi=(decay[0] * init)[..., np.newaxis]
+    )
+    return y
+
+  out = np.empty(x.shape, dtype=x.dtype)
+  loop_jit = _decay_filter_loop_jit()
+  if loop_jit is not None:
+    loop_jit(
+      x.reshape(-1, x.shape[-1]),
+      decay,
+      gain,
+      np.ascontiguousarray(init).reshape(-1),
+      out.reshape(-1, x.shape[-1])
+    )
+  else:
+    _decay_filter_blocks(x, decay, gain, init, out)
+
+  return out
+
+
+def _decay_filter_loop(x, decay, gain, init, out):
+  """Reference loop for `_decay_filter`, compiled by numba if available.
+  
+  `x` and `out` are 2-D; `init` is 1-D with one value per row.
+  """
+  for row in range(x.shape[0]):
+    y = init[row]
+    for i in range(x.shape[1]):
+      y = decay[i] * y + gain[i] * x[row, i]
+      out[row, i] = y
+
+
+@functools.lru_cache(maxsize=None)
+def _decay_filter_loop_jit():
+  """`_decay_filter_loop` compiled with numba, or None if not installed."""
+  try:
+    import numba
+  except ImportError:
+    return None
+  return numba.njit(cache=True)(_decay_filter_loop)
+
+
+# Largest log-decay spanned by one block of `_decay_filter_blocks`,
+# which bounds its intermediate values by exp(_MAX_BLOCK_LOG_DECAY).
+_MAX_BLOCK_LOG_DECAY = 50.0
+
+
+def _decay_filter_blocks(x, decay, gain, init, out):
+  """Evaluate `_decay_filter` with cumulative sums, block by block.
+
+  Within a block starting at sample `s`, with `L[i]` the cumulative sum
+  of `-log(decay)`,
+
+    y[i] = exp(L[s] - L[i]) * (decay[s] * y[s-1]
+      + sum(gain[j] * x[j] * exp(L[j] - L[s]) for j in s..i))
+
+  Blocks are kept short enough that the exponentials stay finite.
+  """
+  # The cumulative sum is kept in float64 even for float32 inputs,
+  # since it is differenced within each block.
+  with np.errstate(divide='ignore'):
+    log_decay = -np.log(decay, dtype=float)
+
+  # The first step of each block enters through `decay[s]` directly,
+  # so it may be arbitrarily large (eg a long pause). Capping the steps
+  # keeps the cumulative sum finite while still forcing a new block
+  # to start at any step larger than the cap.
+  np.minimum(log_decay, 2 * _MAX_BLOCK_LOG_DECAY, out=log_decay)
+  log_decay[:1] = 0.0
+  cum_log_decay = np.cumsum(log_decay, out=log_decay)
+
+  y_prev = init
+  start = 0
+  n = x.shape[-1]
+  while start < n:
+    end = np.searchsorted(
+      cum_log_decay,
+      cum_log_decay[start] + _MAX_BLOCK_LOG_DECAY,
+      side='right'
     )
-    time_series = time_series - time_series[0]
-    time_series_pad = pd.Series(
-      [i for i in range(num_padding)] + (time_series + num_padding).to_list(),
-    ).apply(pd.to_datetime, unit='s')
-
-    # time_series_pad = pd.concat([
-    #   pd.Series([0], dtype='datetime64[s]'),
-    #   (time_series + 1).apply(pd.to_datetime, unit='s')
-    # ])
-
-    ewm_pad = x_series_pad.ewm(
-      # alpha=(1 - math.exp(-1 / tau)),
-      # halflife=(-1.0 * math.log(0.5) * tau),
-      halflife=half_life,
-      times=time_series_pad,
-      adjust=False,
-      ignore_na=True,
-    ).mean()
-
-    ewm = ewm_pad[num_padding:]
-    ewm.index = x_series.index
-
-    return ewm
\ No newline at end of file
+    rel = cum_log_decay[start:end] - cum_log_decay[start]
+    acc = np.cumsum(gain[start:end] * x[..., start:end] * np.exp(rel), axis=-1)
+    acc += (decay[start] * y_prev)[..., np.newaxis]
+    acc *= np.exp(-rel)
+    out[..., start:end] = acc
+    y_prev = acc[..., -1]
+    start = end
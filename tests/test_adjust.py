@@ -0,0 +1,76 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from specialsauce import adjust, grade
+from specialsauce.core import power_met_ss
+
+
+class TestAdjustedSpeed(unittest.TestCase):
+  def setUp(self):
+    rng = np.random.default_rng(0)
+    self.speed = rng.uniform(1, 5, 1000)
+    self.grade = rng.uniform(-0.5, 0.5, 1000)
+
+  def test_round_trip(self):
+    for model in adjust.MODELS:
+      adjusted = adjust.adjusted_speed(self.speed, self.grade, model=model)
+      np.testing.assert_allclose(
+        adjust.actual_speed_for_adjusted(adjusted, self.grade, model=model),
+        self.speed
+      )
+
+  def test_minetti_equal_power(self):
+    adjusted = adjust.adjusted_speed(self.speed, self.grade, model='minetti')
+    np.testing.assert_allclose(
+      power_met_ss(adjusted),
+      power_met_ss(self.speed, self.grade)
+    )
+
+  def test_series(self):
+    speed = pd.Series(self.speed, index=pd.RangeIndex(5, 1005))
+    result = adjust.adjusted_speed(speed, self.grade)
+    self.assertTrue(result.index.equals(speed.index))
+
+  def test_nan_grade(self):
+    for model in adjust.MODELS:
+      adjusted = adjust.adjusted_speed([3, 3], [0.05, np.nan], model=model)
+      self.assertFalse(np.isnan(adjusted[0]))
+      self.assertTrue(np.isnan(adjusted[1]))
+      actual = adjust.actual_speed_for_adjusted(
+        adjusted, [0.05, np.nan], model=model)
+      self.assertAlmostEqual(actual[0], 3)
+      self.assertTrue(np.isnan(actual[1]))
+
+  def test_unknown_model(self):
+    with self.assertRaises(ValueError):
+      adjust.adjusted_speed(self.speed, self.grade, model='garmin')
+
+
+class TestGradeForFactor(unittest.TestCase):
+  def test_inverse(self):
+    for model in adjust.MODELS:
+      lo, hi = grade.GRADE_RANGES[model]
+      grades = np.linspace(lo, hi, 501)
+      factors = adjust.speed_factor(grades, model)
+      g_min = grades[np.argmin(factors)]
+      for side, mask in (
+        ('uphill', grades > g_min + 0.02),
+        ('downhill', grades < g_min - 0.02),
+      ):
+        np.testing.assert_allclose(
+          adjust.grade_for_factor(factors[mask], model, side=side),
+          grades[mask],
+          atol=1e-3,
+        )
+
+  def test_unreachable(self):
+    self.assertTrue(np.isnan(adjust.grade_for_factor(0.5, 'strava')))
+    self.assertTrue(np.isnan(adjust.grade_for_factor(5.0, 'strava')))
+    self.assertTrue(
+      np.isnan(adjust.grade_for_factor(2.5, 'strava', side='downhill')))
+
+  def test_grade_for_adjusted(self):
+    grade = adjust.grade_for_adjusted(3.0, 3.0 * 1.459, 'strava')
+    self.assertAlmostEqual(float(grade), 0.10, places=4)
@@ -0,0 +1,77 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from specialsauce import archive, batch, core
+from specialsauce.sources import strava, trainingpeaks
+
+
+class TestArchive(unittest.TestCase):
+  def setUp(self):
+    self.dir = tempfile.TemporaryDirectory()
+    self.addCleanup(self.dir.cleanup)
+    self.path = os.path.join(self.dir.name, 'run.ssa')
+
+    rng = np.random.default_rng(0)
+    n = 5000
+    self.columns = {
+      'time': np.cumsum(rng.choice([1, 1, 1, 2, 30], n)).astype(float),
+      'speed': rng.uniform(2.5, 4.5, n),
+      'grade': rng.uniform(-0.2, 0.2, n).astype(np.float32),
+    }
+    self.columns['speed'][[3, 400]] = np.nan
+
+  def test_round_trip(self):
+    archive.write_archive(self.path, self.columns)
+    result = archive.open_archive(self.path)
+    self.assertEqual(result.length, 5000)
+    self.assertEqual(list(result), ['time', 'speed', 'grade'])
+    for name, values in self.columns.items():
+      self.assertIsInstance(result[name], np.memmap)
+      self.assertEqual(result[name].dtype, values.dtype)
+      self.assertEqual(result[name].offset % archive.ALIGNMENT, 0)
+      np.testing.assert_array_equal(result[name], values)
+
+    windows = list(result.windows(1200))
+    self.assertEqual([len(w['speed']) for w in windows], [1200] * 4 + [200])
+
+  def test_empty_and_bad_files(self):
+    archive.write_archive(self.path, {'speed': np.empty(0)})
+    self.assertEqual(len(archive.open_archive(self.path)['speed']), 0)
+
+    with open(self.path, 'wb') as f:
+      f.write(b'speed\n1.0\n')
+    with self.assertRaises(ValueError):
+      archive.open_archive(self.path)
+
+    with self.assertRaises(ValueError):
+      archive.write_archive(self.path, {'a': np.zeros(3), 'b': np.zeros(4)})
+
+  def test_evaluate(self):
+    archive.write_archive(self.path, self.columns)
+    out = os.path.join(self.dir.name, 'out.ssa')
+    summary = archive.evaluate_archive(self.path, out=out, window_size=777)
+
+    speed, grade, time = (
+      self.columns['speed'], self.columns['grade'], self.columns['time'])
+    power = core.power_met(speed, grade, time)
+    gap = speed * strava.gap_speed_factor(grade)
+    ngp_speed = speed * trainingpeaks.ngp_speed_factor(grade)
+
+    result = archive.open_archive(out)
+    np.testing.assert_allclose(result['power_met'], power)
+    np.testing.assert_allclose(result['gap_speed'], gap)
+    np.testing.assert_allclose(result['ngp_speed'], ngp_speed)
+    self.assertAlmostEqual(summary['power_met'], np.nanmean(power))
+    self.assertAlmostEqual(summary['gap_speed'], np.nanmean(gap))
+    self.assertAlmostEqual(
+      summary['ngp'], trainingpeaks.normalize(ngp_speed, time_series=time))
+
+  def test_activity_summary(self):
+    archive.write_archive(self.path, self.columns)
+    self.assertEqual(
+      batch.activity_summary(archive.open_archive(self.path), 4.0),
+      batch.activity_summary(self.columns, 4.0),
+    )
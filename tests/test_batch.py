@@ -0,0 +1,104 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from specialsauce import batch, cli
+from specialsauce.sources.trainingpeaks import ngp_speed_factor, normalize
+
+
+def make_activity(seed, n=1200, step=1):
+  rng = np.random.default_rng(seed)
+  return pd.DataFrame({
+    'time': np.arange(n) * step,
+    'speed': rng.uniform(2.5, 4.5, n),
+    'grade': rng.uniform(-0.1, 0.1, n),
+  })
+
+
+class TestActivitySummary(unittest.TestCase):
+  def test_summary(self):
+    df = make_activity(0)
+    summary = batch.activity_summary(df, threshold_speed=4.0)
+    ngp = normalize(df['speed'] * ngp_speed_factor(df['grade']))
+    self.assertAlmostEqual(summary['duration'], 1200)
+    self.assertAlmostEqual(summary['distance'], df['speed'].sum())
+    self.assertAlmostEqual(summary['ngp'], ngp)
+    self.assertAlmostEqual(summary['intensity_factor'], ngp / 4.0)
+    self.assertAlmostEqual(summary['tss'], 100 * (ngp / 4.0) ** 2 / 3)
+
+  def test_missing_columns(self):
+    df = make_activity(0)[['speed']]
+    summary = batch.activity_summary(df, threshold_speed=4.0)
+    self.assertAlmostEqual(summary['ngp'], normalize(df['speed']))
+
+  def test_pause(self):
+    # A 10-minute pause halfway through adds no distance.
+    df = make_activity(0)
+    df.loc[600:, 'time'] += 600
+    summary = batch.activity_summary(df, threshold_speed=4.0)
+    self.assertAlmostEqual(summary['duration'], 1800)
+    self.assertAlmostEqual(summary['distance'], df['speed'].sum())
+
+  def test_dict_of_arrays(self):
+    df = make_activity(0)
+    summary = batch.activity_summary(
+      {col: df[col].to_numpy() for col in df}, threshold_speed=4.0)
+    self.assertEqual(
+      summary, batch.activity_summary(df, threshold_speed=4.0))
+
+
+class TestSummarizeActivities(unittest.TestCase):
+  def setUp(self):
+    self.activities = {
+      f'run{i}': make_activity(i, step=1 + i % 2) for i in range(4)}
+
+  def test_pool(self):
+    serial = batch.summarize_activities(
+      self.activities, 4.0, processes=1)
+    pooled = batch.summarize_activities(
+      self.activities, 4.0, processes=2, chunksize=2)
+    self.assertEqual(list(serial.index), list(self.activities))
+    pd.testing.assert_frame_equal(serial, pooled)
+
+    from_list = batch.summarize_activities(
+      list(self.activities.values()), 4.0, processes=1)
+    np.testing.assert_allclose(from_list.to_numpy(), serial.to_numpy())
+
+  def test_directory_and_cli(self):
+    with tempfile.TemporaryDirectory() as tmpdir:
+      for name, df in self.activities.items():
+        df.to_csv(os.path.join(tmpdir, f'{name}.csv'), index=False)
+      expected = batch.summarize_activities(
+        self.activities, 4.0, processes=1)
+
+      result = batch.summarize_activities(tmpdir, 4.0, processes=1)
+      pd.testing.assert_frame_equal(result, expected)
+
+      out_path = os.path.join(tmpdir, 'summary.txt')
+      cli.main([
+        'summarize', tmpdir, '--threshold-speed', '4.0', '-j', '1',
+        '-o', out_path
+      ])
+      pd.testing.assert_frame_equal(
+        pd.read_csv(out_path, index_col='activity'),
+        expected
+      )
+
+  def test_duplicate_file_names(self):
+    with tempfile.TemporaryDirectory() as tmpdir:
+      paths = []
+      for i, subdir in enumerate(('a', 'b')):
+        os.mkdir(os.path.join(tmpdir, subdir))
+        paths.append(os.path.join(tmpdir, subdir, 'run.csv'))
+        make_activity(i).to_csv(paths[-1], index=False)
+
+      result = batch.summarize_activities(paths, 4.0, processes=1)
+      self.assertEqual(
+        list(result.index),
+        [os.path.join('a', 'run.csv'), os.path.join('b', 'run.csv')])
+
+      with self.assertRaises(ValueError):
+        batch.summarize_activities(paths + paths[:1], 4.0, processes=1)
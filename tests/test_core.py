@@ -0,0 +1,122 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from specialsauce.core import power_met, power_met_ss
+from specialsauce.sources.minetti import cost_of_running, cost_of_walking
+
+
+class TestPowerMetSs(unittest.TestCase):
+  def setUp(self):
+    rng = np.random.default_rng(0)
+    self.speed = rng.uniform(0, 6, 500)
+    self.grade = rng.uniform(-0.6, 0.6, 500)
+    self.expected = (
+      cost_of_running(self.grade) * self.speed
+      / np.cos(np.arctan(self.grade))
+    )
+
+  def test_input_types(self):
+    for wrap in (list, np.asarray):
+      result = power_met_ss(wrap(self.speed), wrap(self.grade))
+      self.assertIsInstance(result, np.ndarray)
+      np.testing.assert_allclose(result, self.expected)
+
+    index = pd.RangeIndex(100, 600)
+    result = power_met_ss(
+      pd.Series(self.speed, index=index),
+      pd.Series(self.grade, index=index)
+    )
+    self.assertIsInstance(result, pd.Series)
+    self.assertTrue(result.index.equals(index))
+    np.testing.assert_allclose(result.to_numpy(), self.expected)
+
+  def test_flat(self):
+    np.testing.assert_allclose(
+      power_met_ss(self.speed),
+      self.speed * cost_of_running(0.0)
+    )
+    self.assertAlmostEqual(
+      power_met_ss(3.0, 0.1),
+      3.0 * cost_of_running(0.1) / np.cos(np.arctan(0.1))
+    )
+
+  def test_out(self):
+    out = np.empty(500)
+    result = power_met_ss(self.speed, self.grade, out=out)
+    self.assertIs(result, out)
+    np.testing.assert_allclose(out, self.expected)
+
+  def test_out_aliases_input(self):
+    speed = np.array([3.0, 4.0, 5.0])
+    grade = np.array([0.1, 0.0, -0.1])
+    expected = power_met_ss(speed, grade)
+
+    speed_out = speed.copy()
+    result = power_met_ss(speed_out, grade, out=speed_out)
+    self.assertIs(result, speed_out)
+    np.testing.assert_allclose(result, expected)
+
+    grade_out = grade.copy()
+    result = power_met_ss(speed, grade_out, out=grade_out)
+    self.assertIs(result, grade_out)
+    np.testing.assert_allclose(result, expected)
+
+  def test_gait(self):
+    walk_expected = (
+      cost_of_walking(self.grade) * self.speed
+      / np.cos(np.arctan(self.grade))
+    )
+    np.testing.assert_allclose(
+      power_met_ss(self.speed, self.grade, gait='walk'), walk_expected)
+
+    walk = self.speed < 2.0
+    np.testing.assert_allclose(
+      power_met_ss(self.speed, self.grade, gait='auto'),
+      np.where(walk, walk_expected, self.expected)
+    )
+
+    walk |= self.grade > 0.2
+    np.testing.assert_allclose(
+      power_met_ss(self.speed, self.grade, gait='auto', walk_grade=0.2),
+      np.where(walk, walk_expected, self.expected)
+    )
+
+    # Flat and scalar inputs, and broadcasting a single grade.
+    np.testing.assert_allclose(
+      power_met_ss(self.speed, gait='auto'),
+      self.speed * np.where(
+        self.speed < 2.0, cost_of_walking(0.0), cost_of_running(0.0))
+    )
+    self.assertAlmostEqual(
+      power_met_ss(1.5, 0.1, gait='auto'),
+      1.5 * cost_of_walking(0.1) / np.cos(np.arctan(0.1))
+    )
+    np.testing.assert_allclose(
+      power_met_ss(self.speed, 0.1, gait='auto'),
+      power_met_ss(self.speed, np.full(500, 0.1), gait='auto')
+    )
+
+    with self.assertRaises(ValueError):
+      power_met_ss(self.speed, gait='hop')
+
+  def test_float32(self):
+    result = power_met_ss(self.speed, self.grade, dtype=np.float32)
+    self.assertEqual(result.dtype, np.float32)
+    np.testing.assert_allclose(result, self.expected, rtol=1e-5)
+
+    # The dtype of `out` is used by default.
+    out = np.empty(500, dtype=np.float32)
+    power_met_ss(self.speed, self.grade, out=out)
+    np.testing.assert_allclose(out, self.expected, rtol=1e-5)
+
+    # A dtype that disagrees with `out` is an error.
+    with self.assertRaises(ValueError):
+      power_met_ss(self.speed, self.grade, out=out, dtype=np.float64)
+
+    t = np.cumsum(np.random.default_rng(1).choice([1, 1, 2, 30], 500))
+    result = power_met(self.speed, self.grade, t, dtype=np.float32)
+    self.assertEqual(result.dtype, np.float32)
+    np.testing.assert_allclose(
+      result, power_met(self.speed, self.grade, t), rtol=1e-5)
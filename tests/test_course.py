@@ -0,0 +1,59 @@
+import unittest
+
+import numpy as np
+
+from specialsauce import course
+from specialsauce.sources.strava import gap_speed_factor
+
+
+class TestCoursePlan(unittest.TestCase):
+  def setUp(self):
+    # An out-and-back 10.05 km course: 5 km at +5%, then 5.05 km at -5%.
+    self.distance = np.linspace(0, 10050, 2011)
+    self.elevation = np.where(
+      self.distance <= 5000,
+      0.05 * self.distance,
+      250 - 0.05 * (self.distance - 5000)
+    )
+    self.plan = course.CoursePlan(self.distance, self.elevation)
+
+  def test_segments(self):
+    self.assertEqual(len(self.plan), 101)
+    self.assertAlmostEqual(self.plan.lengths[-1], 50.0)
+    np.testing.assert_allclose(self.plan.grades[:50], 0.05)
+    np.testing.assert_allclose(self.plan.grades[50:], -0.05)
+
+  def test_finish_time(self):
+    expected = (
+      5000 * gap_speed_factor(0.05) + 5050 * gap_speed_factor(-0.05)) / 4.0
+    self.assertAlmostEqual(self.plan.finish_time(4.0), expected)
+    np.testing.assert_allclose(
+      self.plan.finish_time([4.0, 2.0]), [expected, 2 * expected])
+    self.assertAlmostEqual(self.plan.target_speed(expected), 4.0)
+
+  def test_overrides(self):
+    base = self.plan.segment_times(4.0)
+    slowed = self.plan.finish_time(4.0, overrides={0: 2.0, 100: 1.5})
+    self.assertAlmostEqual(
+      slowed, base.sum() + base[0] + 0.5 * base[100])
+    multipliers = np.ones(101)
+    multipliers[[0, 100]] = [2.0, 1.5]
+    self.assertAlmostEqual(
+      self.plan.finish_time(4.0, overrides=multipliers), slowed)
+
+  def test_splits(self):
+    distances, times = self.plan.splits([4.0, 3.0], split_length=1000)
+    self.assertEqual(len(distances), 11)
+    self.assertAlmostEqual(distances[-1], 10050)
+    np.testing.assert_allclose(times[:, -1], self.plan.finish_time([4.0, 3.0]))
+    self.assertAlmostEqual(
+      times[0, 0], 1000 * gap_speed_factor(0.05) / 4.0)
+    np.testing.assert_allclose(times[1], times[0] * 4 / 3)
+
+  def test_cache(self):
+    course.clear_plan_cache()
+    plan = course.get_plan(self.distance, self.elevation)
+    self.assertIs(plan, course.get_plan(self.distance, self.elevation))
+    self.assertIsNot(
+      plan, course.get_plan(self.distance, self.elevation, 200.0))
+    np.testing.assert_allclose(plan.grades, self.plan.grades)
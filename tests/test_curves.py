@@ -0,0 +1,85 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from specialsauce import curves
+
+
+def brute_force(x, window):
+  if len(x) < window:
+    return np.nan
+  return max(x[i:i + window].mean() for i in range(len(x) - window + 1))
+
+
+class TestMeanMaxCurve(unittest.TestCase):
+  def setUp(self):
+    rng = np.random.default_rng(0)
+    self.activities = [
+      rng.normal(10, 2, n) for n in (1, 50, 400, 1000, 30, 1000)]
+    self.durations = [1, 2, 7, 30, 120, 500]
+
+  def test_brute_force(self):
+    for x in self.activities:
+      np.testing.assert_allclose(
+        curves.mean_max_curve(x, self.durations),
+        [brute_force(x, w) for w in self.durations],
+      )
+
+  def test_batch(self):
+    result = curves.mean_max_curves(self.activities, self.durations)
+    self.assertEqual(result.shape, (6, 6))
+    for row, x in zip(result, self.activities):
+      np.testing.assert_allclose(
+        row, curves.mean_max_curve(x, self.durations))
+
+  def test_step(self):
+    x = self.activities[2]
+    np.testing.assert_allclose(
+      curves.mean_max_curve(x, [10, 60], step=5.0),
+      curves.mean_max_curve(x, [2, 12]),
+    )
+
+  def test_default_durations(self):
+    curve = curves.mean_max_curve(np.ones(3600))
+    self.assertEqual(len(curve), len(curves.DEFAULT_DURATIONS))
+    long = curves.DEFAULT_DURATIONS > 3600
+    self.assertTrue(np.isnan(curve[long]).all())
+    np.testing.assert_allclose(curve[~long], 1.0)
+
+  def test_nan(self):
+    np.testing.assert_allclose(
+      curves.mean_max_curve([1.0, np.nan, 4.0, 2.0], [1, 2]), [4.0, 3.0])
+
+  def test_series(self):
+    series = pd.Series(self.activities[2])
+    curve = curves.mean_max_curve(series, self.durations)
+    self.assertIsInstance(curve, pd.Series)
+    self.assertEqual(curve.index.tolist(), self.durations)
+
+  def test_invalid_durations(self):
+    with self.assertRaises(ValueError):
+      curves.mean_max_curve(self.activities[2], [0, 10])
+
+  def test_empty(self):
+    self.assertEqual(curves.mean_max_curves([], [1, 2]).shape, (0, 2))
+    self.assertTrue(np.isnan(curves.mean_max_curve([], [1, 2])).all())
+
+
+class TestMergeCurves(unittest.TestCase):
+  def test_merge(self):
+    merged = curves.merge_curves([
+      [5.0, 4.0, np.nan],
+      [6.0, 3.0, np.nan],
+      [4.0, 3.5, 2.0],
+    ])
+    np.testing.assert_array_equal(merged, [6.0, 4.0, 2.0])
+
+  def test_season_best(self):
+    rng = np.random.default_rng(1)
+    activities = [rng.normal(10, 2, n) for n in (100, 700, 300)]
+    merged = curves.merge_curves(curves.mean_max_curves(activities, [1, 500]))
+    np.testing.assert_allclose(
+      merged,
+      [max(x.max() for x in activities), brute_force(activities[1], 500)],
+    )
@@ -1,7 +1,10 @@
 import unittest
+from unittest import mock
 
+import numpy as np
 import pandas as pd
 
+from specialsauce import datasets
 from specialsauce.datasets import load_ngp_gap
 
 
@@ -12,4 +15,35 @@ class TestDatasets(unittest.TestCase):
         self.assertTrue(all(
             [pd.api.types.is_timedelta64_dtype(dtype) 
              for dtype in data.dtypes]
-        ))
\ No newline at end of file
+        ))
+
+    def test_as_seconds(self):
+        data = load_ngp_gap(as_seconds=True)
+        self.assertTrue(all(
+            [pd.api.types.is_float_dtype(dtype) for dtype in data.dtypes]
+        ))
+        np.testing.assert_allclose(
+            data.to_numpy(),
+            load_ngp_gap().apply(lambda s: s.dt.total_seconds()).to_numpy()
+        )
+        self.assertEqual(data.loc[45, 'Pace'], 480.0)
+        self.assertTrue(np.isnan(data.loc[32, 'GAP']))
+
+    def test_copies(self):
+        data = load_ngp_gap()
+        data.iloc[0, 0] = pd.NaT
+        self.assertFalse(pd.isnull(load_ngp_gap().iloc[0, 0]))
+
+    def test_binary_matches_csv(self):
+        pd.testing.assert_frame_equal(
+            datasets._read_ngp_gap_npz(),
+            datasets._read_ngp_gap_csv()
+        )
+
+    def test_stale_binary(self):
+        with mock.patch.object(datasets, '_csv_sha1', return_value='edited'):
+            self.assertIsNone(datasets._read_ngp_gap_npz())
+        with mock.patch.object(
+            datasets, '_npz_filename', return_value='missing.npz'
+        ):
+            self.assertIsNone(datasets._read_ngp_gap_npz())
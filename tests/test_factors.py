@@ -1,8 +1,10 @@
 import unittest
 
+import numpy as np
 import pandas as pd
 
-from specialsauce.sources.minetti import cost_of_running, cost_of_walking
+from specialsauce.sources.minetti import (
+  cost_of_running, cost_of_walking, poly_5)
 from specialsauce.sources.strava import gap_speed_factor
 from specialsauce.sources.trainingpeaks import ngp_speed_factor
 
@@ -58,6 +60,36 @@ class FactorTestMixin:
     )
 
 
+class TestFloat32(unittest.TestCase):
+  def setUp(self):
+    self.grades = np.random.default_rng(0).uniform(-0.5, 0.5, 1000)
+
+  def test_minetti(self):
+    # float32 grades keep their dtype through Horner's method.
+    for func in (cost_of_running, cost_of_walking):
+      result = func(self.grades.astype(np.float32))
+      self.assertEqual(result.dtype, np.float32)
+      np.testing.assert_allclose(result, func(self.grades), rtol=1e-5)
+
+  def test_speed_factors(self):
+    for func in (gap_speed_factor, ngp_speed_factor):
+      result = func(self.grades.astype(np.float32), dtype=np.float32)
+      self.assertEqual(result.dtype, np.float32)
+      np.testing.assert_allclose(result, func(self.grades), rtol=1e-5)
+
+      result = func(self.grades, resolution=0.001, dtype=np.float32)
+      self.assertEqual(result.dtype, np.float32)
+      np.testing.assert_allclose(
+        result, func(self.grades, resolution=0.001), rtol=1e-5)
+
+  def test_poly_5_out(self):
+    out = np.empty(1000)
+    result = poly_5(self.grades, 1.0, 2.0, 3.0, 4.0, 5.0, 6.0, out=out)
+    self.assertIs(result, out)
+    np.testing.assert_allclose(
+      out, np.polyval([1.0, 2.0, 3.0, 4.0, 5.0, 6.0], self.grades))
+
+
 class TestMinettiRun(FactorTestMixin, unittest.TestCase):
   func = cost_of_running
   range_min = -0.45
@@ -80,3 +112,35 @@ class TestGap(FactorTestMixin, unittest.TestCase):
   func = gap_speed_factor
   range_min = -0.45
   range_max = 0.45
+
+
+class TestLookupTable(unittest.TestCase):
+  def test_matches_interpolation(self):
+    grid = np.linspace(-0.5, 0.5, 1001)
+    grades = np.random.default_rng(0).uniform(-0.5, 0.5, 1000)
+    for func in (gap_speed_factor, ngp_speed_factor):
+      np.testing.assert_allclose(func(grid, resolution=0.001), func(grid))
+
+      # Errors from rounding to the table are bounded by the resolution.
+      np.testing.assert_allclose(
+        func(grades, resolution=0.001),
+        func(grades),
+        atol=0.0005 * 12,
+      )
+
+  def test_scalar(self):
+    # Single numbers skip the table and are interpolated exactly.
+    for func in (gap_speed_factor, ngp_speed_factor):
+      self.assertEqual(func(0.1234, resolution=0.01), func(0.1234))
+
+  def test_nan(self):
+    for func in (gap_speed_factor, ngp_speed_factor):
+      result = func(np.array([0.1, np.nan]), resolution=0.001)
+      np.testing.assert_array_equal(
+        np.isnan(result), np.isnan(func(np.array([0.1, np.nan]))))
+
+  def test_uneven_resolution(self):
+    self.assertEqual(
+      gap_speed_factor(0.45, resolution=0.07),
+      gap_speed_factor(0.45)
+    )
@@ -0,0 +1,66 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from specialsauce import fitness
+from specialsauce.sources import trainingpeaks
+
+
+class TestTrainingLoadTable(unittest.TestCase):
+  def setUp(self):
+    rng = np.random.default_rng(0)
+    n = 600
+    self.table = pd.DataFrame({
+      'athlete': rng.choice(['ann', 'bob', 'cy'], n),
+      'date': pd.Timestamp('2022-01-01') + pd.to_timedelta(
+        rng.integers(0, 300, n), 'D'),
+      'tss': rng.uniform(0, 150, n),
+    })
+
+  def test_matches_single_athlete(self):
+    result = fitness.training_load_table(
+      self.table, init_atl=[10.0, 20.0, 30.0], init_ctl=40.0)
+    end = self.table['date'].max()
+
+    for i, (athlete, group) in enumerate(self.table.groupby('athlete')):
+      rows = result[result['athlete'] == athlete].set_index('date')
+      days = pd.date_range(group['date'].min(), end, freq='D')
+      self.assertTrue(rows.index.equals(days))
+
+      # Rest days after the athlete's last activity are zero-filled.
+      tss = np.zeros(len(days))
+      np.add.at(tss, (group['date'] - days[0]).dt.days, group['tss'])
+      atl = trainingpeaks.acute_training_load(tss, init=10.0 * (i + 1))
+      ctl = trainingpeaks.chronic_training_load(tss, init=40.0)
+      np.testing.assert_allclose(rows['tss'], tss)
+      np.testing.assert_allclose(rows['atl'], atl)
+      np.testing.assert_allclose(rows['ctl'], ctl)
+      np.testing.assert_allclose(rows['tsb'], ctl - atl)
+      self.assertEqual(
+        list(rows['status']), list(trainingpeaks.training_status(ctl - atl)))
+
+  def test_end(self):
+    end = pd.Timestamp('2022-06-30')
+    result = fitness.training_load_table(self.table, end=end)
+    self.assertEqual(result['date'].max(), end)
+    expected = fitness.training_load_table(
+      self.table[self.table['date'] <= end], end=end)
+    pd.testing.assert_frame_equal(result, expected)
+
+  def test_dict_of_arrays(self):
+    result = fitness.training_load_table(
+      {col: self.table[col].to_numpy() for col in self.table})
+    pd.testing.assert_frame_equal(
+      result, fitness.training_load_table(self.table))
+
+
+class TestTrainingStatus(unittest.TestCase):
+  def test_vectorized(self):
+    tsb = np.array([30, 25, 20, 0, -10, -20, -30, -40, np.nan])
+    self.assertEqual(
+      list(trainingpeaks.training_status(tsb)),
+      [trainingpeaks.training_status(x) for x in tsb]
+    )
+    self.assertEqual(trainingpeaks.training_status(-10), 'Productive')
+    self.assertEqual(trainingpeaks.training_status(np.nan), 'Overreaching')
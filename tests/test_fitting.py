@@ -0,0 +1,86 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from specialsauce import cli, fitting
+from specialsauce.datasets import load_ngp_gap
+from specialsauce.sources import strava, trainingpeaks
+
+
+class TestSpeedFactors(unittest.TestCase):
+  def test_factors(self):
+    factors = fitting.speed_factors(load_ngp_gap(), pace=480)
+    self.assertTrue(factors.index.is_monotonic_increasing)
+    self.assertAlmostEqual(factors.loc[45, 'GAP'], 480 / 112)
+    self.assertAlmostEqual(factors.loc[0, 'NGP'], 1.0)
+
+    # Seconds work as well as timedeltas.
+    pd.testing.assert_frame_equal(
+      fitting.speed_factors(load_ngp_gap(as_seconds=True), pace=480),
+      factors
+    )
+
+  def test_pace_dependence(self):
+    spread = fitting.pace_dependence(load_ngp_gap())
+    self.assertEqual(list(spread.index), [10])
+    self.assertLess(spread.to_numpy().max(), 0.01)
+
+
+class TestFitFactors(unittest.TestCase):
+  def test_reproduces_tables(self):
+    fits = fitting.fit_dataset(load_ngp_gap(), pace=480)
+    np.testing.assert_array_equal(
+      fits['GAP'].table(), strava.ADJUSTMENT_FACTORS)
+
+    in_range = (
+      (trainingpeaks.ADJUSTMENT_FACTORS[:, 0] >= -25)
+      & (trainingpeaks.ADJUSTMENT_FACTORS[:, 0] <= 30)
+    )
+    np.testing.assert_array_equal(
+      fits['NGP'].table(), trainingpeaks.ADJUSTMENT_FACTORS[in_range])
+
+  def test_poly(self):
+    grades = np.linspace(-40, 40, 17)
+    coefficients = [155.4, -30.4, -43.3, 46.3, 19.5, 3.6]
+    fit = fitting.fit_factors(
+      grades, np.polyval(coefficients, grades / 100), method='poly')
+    np.testing.assert_allclose(fit.coefficients, coefficients, rtol=1e-6)
+
+    report = fit.report()
+    self.assertEqual(report['n_points'], 17)
+    self.assertLess(report['max_abs_error'], 1e-9)
+    self.assertLess(report['loo_rmse'], 1e-9)
+    self.assertTrue(report['monotone'])
+
+    # The model is constant outside the data's range.
+    self.assertEqual(fit(0.5), fit(0.4))
+
+  def test_errors(self):
+    factors = fitting.speed_factors(load_ngp_gap(), pace=480)['GAP']
+    fit = fitting.fit_factors(factors.index, factors, method='poly')
+    errors = fit.errors()
+    np.testing.assert_allclose(errors['factor'], factors.dropna())
+    np.testing.assert_allclose(
+      errors['error'], fit(factors.dropna().index / 100) - factors.dropna())
+    self.assertTrue(np.isnan(errors['loo_error'].iloc[[0, -1]]).all())
+    self.assertFalse(np.isnan(errors['loo_error'].iloc[1:-1]).any())
+
+    # A wiggly fit is flagged.
+    wiggly = fitting.fit_factors(
+      factors.index, factors, method='poly', degree=12)
+    self.assertFalse(wiggly.report()['monotone'])
+
+    with self.assertRaises(ValueError):
+      fitting.fit_factors(factors.index, factors, method='spline')
+
+  def test_cli(self):
+    with tempfile.TemporaryDirectory() as tmpdir:
+      cli.main(['fit-factors', '-o', tmpdir])
+      gap = pd.read_csv(os.path.join(tmpdir, 'GAP.csv'))
+      np.testing.assert_array_equal(
+        gap.to_numpy(), strava.ADJUSTMENT_FACTORS)
+      report = pd.read_csv(os.path.join(tmpdir, 'report.csv'), index_col=0)
+      self.assertEqual(list(report.index), ['GAP', 'NGP'])
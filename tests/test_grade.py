@@ -0,0 +1,58 @@
+import unittest
+
+import numpy as np
+
+from specialsauce.grade import grade_from_elevation
+
+
+class TestGradeFromElevation(unittest.TestCase):
+  def setUp(self):
+    rng = np.random.default_rng(0)
+    # 20 km at irregular spacing, over rolling hills.
+    self.distance = np.cumsum(rng.uniform(0.5, 5.0, 8000))
+    self.true_grade = 0.2 * np.cos(self.distance / 500)
+    self.elevation = 1000 + 100 * np.sin(self.distance / 500)
+
+  def test_constant_grade(self):
+    for method in ('regression', 'savgol'):
+      grade = grade_from_elevation(
+        self.distance, 0.08 * self.distance, method=method)
+      np.testing.assert_allclose(grade, 0.08, atol=1e-6)
+
+  def test_smoothing(self):
+    noisy = self.elevation + np.random.default_rng(1).normal(
+      0, 1.0, len(self.elevation))
+    for method in ('regression', 'savgol'):
+      grade = grade_from_elevation(
+        self.distance, noisy, window=100, method=method)
+      self.assertLess(np.abs(grade - self.true_grade).max(), 0.05)
+      self.assertLess(np.abs(grade - self.true_grade).mean(), 0.01)
+
+  def test_nan(self):
+    elevation = self.elevation.copy()
+    elevation[100:120] = np.nan
+    grade = grade_from_elevation(self.distance, elevation, window=100)
+    self.assertFalse(np.isnan(grade).any())
+    self.assertLess(np.abs(grade - self.true_grade).max(), 0.01)
+
+  def test_clip(self):
+    grade = grade_from_elevation(
+      self.distance, 5 * self.elevation, clip='trainingpeaks')
+    self.assertAlmostEqual(grade.min(), -0.25)
+    self.assertAlmostEqual(grade.max(), 0.3)
+    grade = grade_from_elevation(
+      self.distance, 5 * self.elevation, clip=(-0.1, 0.1))
+    self.assertAlmostEqual(grade.max(), 0.1)
+
+  def test_degenerate(self):
+    for method in ('regression', 'savgol'):
+      with self.subTest(method=method):
+        self.assertEqual(
+          len(grade_from_elevation([], [], method=method)), 0)
+        np.testing.assert_array_equal(
+          grade_from_elevation([0.0], [100.0], method=method), [np.nan])
+        np.testing.assert_array_equal(
+          grade_from_elevation(
+            [5.0, 5.0, 5.0], [100.0, 101.0, 102.0], method=method),
+          [np.nan] * 3,
+        )
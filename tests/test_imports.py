@@ -0,0 +1,56 @@
+import subprocess
+import sys
+import unittest
+
+
+def modules_loaded_by(module):
+  """Heavy dependencies loaded when importing `module` in a fresh interpreter."""
+  code = (
+    'import sys\n'
+    f'import {module}\n'
+    'print(" ".join(m for m in ("pandas", "scipy", "numba") if m in sys.modules))'
+  )
+  output = subprocess.run(
+    [sys.executable, '-c', code], check=True, capture_output=True, text=True
+  ).stdout
+  return output.split()
+
+
+class TestLazyImports(unittest.TestCase):
+  def test_light_modules(self):
+    for module in (
+      'specialsauce.core',
+      'specialsauce.util',
+      'specialsauce.sources.minetti',
+      'specialsauce.sources.strava',
+      'specialsauce.sources.trainingpeaks',
+    ):
+      with self.subTest(module=module):
+        self.assertEqual(modules_loaded_by(module), [])
+
+  def test_array_pipeline(self):
+    # A full activity-to-fitness pipeline on plain arrays never needs
+    # pandas.
+    code = (
+      'import sys\n'
+      'import numpy as np\n'
+      'from specialsauce import core\n'
+      'from specialsauce.sources import strava, trainingpeaks\n'
+      't = np.arange(3600.0)\n'
+      'speed = np.full(t.size, 3.5)\n'
+      'grade = np.sin(t / 300) * 0.05\n'
+      'power = core.power_met(speed, grade, time_series=t)\n'
+      'gap = speed * strava.gap_speed_factor(grade)\n'
+      'ngp = trainingpeaks.normalize(\n'
+      '  speed * trainingpeaks.ngp_speed_factor(grade), time_series=t)\n'
+      'tss = trainingpeaks.training_stress_score(ngp, 4.0, t.size)\n'
+      'atl = trainingpeaks.acute_training_load(np.full(30, tss))\n'
+      'assert isinstance(power, np.ndarray) and isinstance(gap, np.ndarray)\n'
+      'assert np.isfinite(atl).all()\n'
+      'print("pandas" in sys.modules)'
+    )
+    output = subprocess.run(
+      [sys.executable, '-c', code], check=True, capture_output=True,
+      text=True,
+    ).stdout
+    self.assertEqual(output.strip(), "False")
@@ -0,0 +1,98 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from specialsauce import models
+from specialsauce.sources import minetti, strava, trainingpeaks
+
+
+class TestRegistry(unittest.TestCase):
+  def test_names(self):
+    for name in ('strava', 'trainingpeaks', 'minetti', 'minetti_run_cost',
+                 'minetti_walk_cost'):
+      self.assertIn(name, models.names())
+
+  def test_unknown(self):
+    with self.assertRaises(ValueError):
+      models.get('nope')
+
+  def test_duplicate(self):
+    with self.assertRaises(ValueError):
+      models.register(models.TableModel('strava', [0, 1], [1, 2]))
+
+
+class TestModels(unittest.TestCase):
+  def setUp(self):
+    self.grade = np.random.default_rng(0).uniform(-0.6, 0.6, 1000)
+    self.grade[:4] = [0.0, 0.3, -0.45, 0.45]
+
+  def test_tables(self):
+    np.testing.assert_allclose(
+      models.get('strava')(self.grade),
+      strava.gap_speed_factor(self.grade),
+      rtol=1e-12,
+    )
+    np.testing.assert_allclose(
+      models.get('trainingpeaks')(self.grade),
+      trainingpeaks.ngp_speed_factor(self.grade),
+      rtol=1e-12,
+    )
+
+  def test_polynomials(self):
+    np.testing.assert_allclose(
+      models.get('minetti_run_cost')(self.grade),
+      minetti.cost_of_running(self.grade),
+    )
+    np.testing.assert_allclose(
+      models.get('minetti_walk_cost')(self.grade),
+      minetti.cost_of_walking(self.grade),
+    )
+    np.testing.assert_allclose(
+      models.get('minetti')(self.grade),
+      minetti.cost_of_running(self.grade) / minetti.cost_of_running(0.0)
+      * np.sqrt(1 + self.grade ** 2),
+    )
+
+  def test_nan(self):
+    grade = np.array([0.05, np.nan, -0.1])
+    for name in models.names():
+      result = models.get(name)(grade)
+      self.assertTrue(np.isnan(result[1]))
+      self.assertFalse(np.isnan(result[[0, 2]]).any())
+
+  def test_scalar(self):
+    self.assertIsInstance(models.get('strava')(0.1), float)
+    self.assertEqual(models.get('minetti')(0.0), 1.0)
+
+  def test_float32(self):
+    result = models.get('strava')(self.grade, dtype=np.float32)
+    self.assertEqual(result.dtype, np.float32)
+    np.testing.assert_allclose(
+      result, strava.gap_speed_factor(self.grade), rtol=1e-6)
+
+  def test_inverse(self):
+    model = models.TableModel('v', [-0.2, 0.0, 0.2], [2.0, 1.0, 3.0])
+    np.testing.assert_allclose(model.inverse(2.0), 0.1)
+    np.testing.assert_allclose(model.inverse(2.0, side='downhill'), -0.2)
+    self.assertTrue(np.isnan(model.inverse(0.5)))
+
+  def test_unsorted_table(self):
+    with self.assertRaises(ValueError):
+      models.TableModel('bad', [0.0, 0.2, 0.1], [1, 2, 3])
+
+
+class TestEvaluateMany(unittest.TestCase):
+  def test_matches_separate(self):
+    grade = np.linspace(-0.5, 0.5, 200001)
+    results = models.evaluate_many(grade)
+    self.assertEqual(list(results), models.names())
+    for name, values in results.items():
+      np.testing.assert_array_equal(values, models.get(name)(grade))
+
+  def test_series(self):
+    grade = pd.Series([0.0, 0.1, -0.1], index=[3, 4, 5])
+    result = models.evaluate_many(grade, models=['strava', 'minetti'])
+    self.assertIsInstance(result, pd.DataFrame)
+    self.assertEqual(list(result.columns), ['strava', 'minetti'])
+    pd.testing.assert_index_equal(result.index, grade.index)
@@ -0,0 +1,87 @@
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+import numpy as np
+
+from specialsauce import core, profiling, util
+from specialsauce.sources import minetti
+
+
+class TestProfiler(unittest.TestCase):
+  def test_records(self):
+    speed = np.full(1000, 3.0)
+    grade = np.zeros(1000)
+    with profiling.Profiler() as profiler:
+      core.power_met_ss(speed, grade)
+      core.power_met_ss(speed, grade)
+    stats = profiler.stats()
+
+    record = stats['core.power_met_ss']
+    self.assertEqual(record['calls'], 2)
+    self.assertEqual(record['elements'], 4000)
+    self.assertEqual(record['max_elements'], 2000)
+    # The result alone is 8 kB.
+    self.assertGreaterEqual(record['peak_bytes'], 8000)
+
+    # Nested calls are recorded, and excluded from the caller's self time.
+    self.assertEqual(stats['sources.minetti.cost_of_running']['calls'], 2)
+    self.assertLess(record['self_time'], record['time'])
+
+  def test_restores(self):
+    originals = (core.power_met_ss, util.interp, minetti.poly_5)
+    with profiling.Profiler() as profiler:
+      self.assertTrue(profiler.active)
+      self.assertIsNot(core.power_met_ss, originals[0])
+    self.assertFalse(profiler.active)
+    self.assertEqual(
+      (core.power_met_ss, util.interp, minetti.poly_5), originals)
+
+  def test_restores_on_error(self):
+    original = core.power_met_ss
+    with self.assertRaises(ValueError):
+      with profiling.Profiler() as profiler:
+        core.power_met_ss(3.0, gait='fly')
+    self.assertIs(core.power_met_ss, original)
+    self.assertEqual(profiler.stats()['core.power_met_ss']['calls'], 1)
+
+  def test_no_memory(self):
+    with profiling.Profiler(track_memory=False) as profiler:
+      minetti.cost_of_running(np.zeros(10))
+    self.assertEqual(
+      profiler.stats()['sources.minetti.cost_of_running']['peak_bytes'], 0)
+
+  def test_without_reset_peak(self):
+    # Python 3.8 has no tracemalloc.reset_peak.
+    speed = np.full(1000, 3.0)
+    with mock.patch.object(profiling, '_RESET_PEAK', False):
+      with profiling.Profiler() as profiler:
+        result = core.power_met_ss(speed, np.zeros(1000))
+    # The result is still allocated when the call returns.
+    self.assertGreaterEqual(
+      profiler.stats()['core.power_met_ss']['peak_bytes'], result.nbytes)
+
+  def test_to_json(self):
+    with profiling.Profiler() as profiler:
+      minetti.cost_of_running(0.1)
+    self.assertEqual(json.loads(profiler.to_json()), profiler.stats())
+
+  def test_env_var(self):
+    with tempfile.TemporaryDirectory() as tmp:
+      path = os.path.join(tmp, 'profile.json')
+      code = (
+        'from specialsauce.sources import minetti\n'
+        'minetti.cost_of_running(0.1)\n'
+      )
+      subprocess.run(
+        [sys.executable, '-c', code],
+        check=True,
+        env=dict(os.environ, **{profiling.ENV_VAR: path}),
+      )
+      with open(path) as f:
+        stats = json.load(f)
+    self.assertEqual(stats['sources.minetti.cost_of_running']['calls'], 1)
@@ -0,0 +1,96 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from specialsauce import resample
+from specialsauce.sources import trainingpeaks
+
+
+class TestPauses(unittest.TestCase):
+  def setUp(self):
+    self.time = np.array([0.0, 1.0, 3.0, 4.0, 60.0, 61.0])
+
+  def test_pause_mask(self):
+    np.testing.assert_array_equal(
+      resample.pause_mask(self.time),
+      [False, False, False, False, True, False],
+    )
+
+  def test_sample_weights(self):
+    np.testing.assert_array_equal(
+      resample.sample_weights(self.time), [1, 1, 2, 1, 1, 1])
+
+  def test_datetimes(self):
+    time = pd.Timestamp('2024-01-01') + pd.to_timedelta(self.time, unit='s')
+    np.testing.assert_array_equal(
+      resample.sample_weights(time), resample.sample_weights(self.time))
+
+
+class TestResample(unittest.TestCase):
+  def setUp(self):
+    self.time = np.array([10.0, 11.0, 14.0, 15.0, 60.0, 62.0])
+    self.speed = np.array([1.0, 2.0, 5.0, 3.0, 4.0, 2.0])
+    self.grade = np.array([0.0, 0.1, 0.4, 0.0, 0.0, 0.2])
+
+  def test_interpolates(self):
+    result = resample.resample(self.time, self.speed, self.grade)
+    np.testing.assert_array_equal(
+      result['time'], [0, 1, 2, 3, 4, 5, 50, 51, 52])
+    np.testing.assert_allclose(
+      result['speed'], [1, 2, 3, 4, 5, 3, 4, 3, 2])
+    np.testing.assert_allclose(
+      result['grade'], [0, 0.1, 0.2, 0.3, 0.4, 0, 0, 0.1, 0.2])
+
+  def test_moving_time(self):
+    # The resampled samples cover the same moving time as the weights.
+    rng = np.random.default_rng(0)
+    dt = rng.choice([1.0, 1.0, 2.0, 3.0], 5000)
+    dt[::700] = 300
+    time = np.cumsum(dt)
+    speed = rng.uniform(2, 4, time.size)
+    result = resample.resample(time, speed)
+    self.assertEqual(
+      len(result['time']), resample.sample_weights(time).sum())
+
+  def test_pause_modes(self):
+    zero = resample.resample(self.time, self.speed, self.grade, pauses='zero')
+    self.assertEqual(len(zero['time']), 53)
+    self.assertEqual(zero['speed'][6:50].tolist(), [0.0] * 44)
+    self.assertEqual(zero['speed'][50], 4.0)
+    self.assertFalse(np.isnan(zero['grade']).any())
+
+    nan = resample.resample(self.time, self.speed, self.grade, pauses='nan')
+    self.assertTrue(np.isnan(nan['speed'][6:50]).all())
+    self.assertTrue(np.isnan(nan['grade'][6:50]).all())
+
+    with self.assertRaises(ValueError):
+      resample.resample(self.time, self.speed, pauses='skip')
+
+  def test_min_speed(self):
+    result = resample.resample(self.time, self.speed, min_speed=1.5)
+    self.assertNotIn(0.0, result['time'])
+
+  def test_uniform_unchanged(self):
+    time = np.arange(100.0)
+    speed = np.random.default_rng(1).uniform(2, 4, 100)
+    result = resample.resample(time, speed)
+    np.testing.assert_array_equal(result['time'], time)
+    np.testing.assert_array_equal(result['speed'], speed)
+
+  def test_downstream(self):
+    # NGP on the resampled streams matches NGP with the 1 Hz times.
+    time = np.arange(600.0)
+    speed = 3 + np.sin(time / 30)
+    result = resample.resample(time[::2], speed[::2])
+    self.assertAlmostEqual(
+      trainingpeaks.normalize(result['speed']),
+      trainingpeaks.normalize(speed, time_series=time),
+      places=2,
+    )
+
+  def test_errors(self):
+    with self.assertRaises(ValueError):
+      resample.resample([0.0, 2.0, 1.0], [1.0, 1.0, 1.0])
+    self.assertEqual(
+      list(resample.resample([], [], [])), ['time', 'speed', 'grade'])
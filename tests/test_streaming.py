@@ -0,0 +1,74 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from specialsauce import core, streaming
+from specialsauce.sources.trainingpeaks import normalize
+
+
+def split(n, seed=0):
+  """Random chunk boundaries, including some empty chunks."""
+  cuts = np.sort(np.random.default_rng(seed).integers(0, n, 40))
+  return list(zip(np.concatenate([[0], cuts]), np.concatenate([cuts, [n]])))
+
+
+class StreamTestMixin:
+  def setUp(self):
+    rng = np.random.default_rng(1)
+    n = 3000
+    self.speed = rng.uniform(2, 5, n)
+    self.speed[[0, 7, 100, 101, 2999]] = np.nan
+    self.grade = rng.uniform(-0.2, 0.2, n)
+    self.time = np.cumsum(rng.choice([1, 1, 1, 2, 7], n)).astype(float)
+    self.chunks = split(n)
+
+
+class TestPowerMetStream(StreamTestMixin, unittest.TestCase):
+  def test_no_time(self):
+    stream = streaming.PowerMetStream()
+    result = np.concatenate([
+      stream.update(self.speed[a:b], self.grade[a:b])
+      for a, b in self.chunks
+    ])
+    np.testing.assert_allclose(
+      result, core.power_met(self.speed, self.grade))
+
+  def test_time(self):
+    time = pd.to_datetime(self.time, unit='s', origin='2022-06-01')
+    chunks = (
+      pd.DataFrame({
+        'speed': self.speed[a:b],
+        'grade': self.grade[a:b],
+        'time': time[a:b]
+      })
+      for a, b in self.chunks
+    )
+    result = np.concatenate(list(streaming.iter_power_met(chunks)))
+    np.testing.assert_allclose(
+      result, core.power_met(self.speed, self.grade, self.time))
+
+
+class TestNormalizeStream(StreamTestMixin, unittest.TestCase):
+  def test_no_time(self):
+    stream = streaming.NormalizeStream()
+    result = np.concatenate([
+      stream.update(self.speed[a:b]) for a, b in self.chunks])
+    self.assertAlmostEqual(stream.value, normalize(self.speed))
+    for i in (37, 500, 2998):
+      self.assertAlmostEqual(result[i], normalize(self.speed[:i + 1]))
+
+    # Every window up to here includes a NaN, so nothing is averaged yet.
+    self.assertTrue(np.isnan(result[36]))
+
+  def test_time(self):
+    chunks = (
+      {'value': self.speed[a:b], 'time': self.time[a:b]}
+      for a, b in self.chunks
+    )
+    result = np.concatenate(list(streaming.iter_normalize(chunks)))
+    for i in (500, 1000, 2999):
+      self.assertAlmostEqual(
+        result[i],
+        normalize(self.speed[:i + 1], time_series=self.time[:i + 1])
+      )
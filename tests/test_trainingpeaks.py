@@ -1,6 +1,30 @@
 import unittest
+import warnings
 
-from specialsauce.sources.trainingpeaks import ewma_days, sma
+import numpy as np
+import pandas as pd
+
+from specialsauce.sources.trainingpeaks import (
+  acute_training_load,
+  chronic_training_load,
+  ewma_days,
+  normalize,
+  sma,
+  training_status,
+  TrainingLoadState,
+)
+
+
+def ewma_days_reference(x_array, n_days, init=0.0):
+  """The original (quadratic) definition of `ewma_days`."""
+  alpha = 1 / n_days
+  
+  return [
+    init * (1 - alpha) ** i + sum(
+      x_array[i - n] * alpha * (1 - alpha) ** n 
+      for n in range(i + 1)) 
+    for i in range(len(x_array))
+  ]
 
 
 class TestEwmaDays(unittest.TestCase):
@@ -14,15 +38,147 @@ class TestEwmaDays(unittest.TestCase):
     for el in result:
       self.assertAlmostEqual(el, init)
 
+  def test_matches_reference(self):
+    x = np.random.default_rng(0).uniform(0, 200, 400)
+    np.testing.assert_allclose(
+      ewma_days(x, 42, init=35.0),
+      ewma_days_reference(x, 42, init=35.0),
+    )
+
+  def test_2d(self):
+    x = np.random.default_rng(1).uniform(0, 200, (3, 100))
+    result = ewma_days(x, 7, init=[0.0, 10.0, 20.0])
+    self.assertEqual(result.shape, x.shape)
+    for row, init in zip(range(3), [0.0, 10.0, 20.0]):
+      np.testing.assert_allclose(
+        result[row],
+        ewma_days_reference(x[row], 7, init=init)
+      )
+
+  def test_dates(self):
+    result = ewma_days(
+      [50.0, 100.0, 25.0],
+      7,
+      dates=['2022-06-04', '2022-06-01', '2022-06-04'],
+    )
+    self.assertIsInstance(result, pd.Series)
+    self.assertEqual(len(result), 4)
+    np.testing.assert_allclose(
+      result.to_numpy(),
+      ewma_days_reference([100.0, 0.0, 0.0, 75.0], 7)
+    )
+
+  def test_series_index(self):
+    tss = pd.Series(
+      [50.0, 100.0, 25.0],
+      index=pd.date_range('2022-06-01', periods=3, name='day'),
+    )
+    for func in (acute_training_load, chronic_training_load):
+      result = func(tss)
+      self.assertIsInstance(result, pd.Series)
+      pd.testing.assert_index_equal(result.index, tss.index)
+    np.testing.assert_allclose(
+      ewma_days(tss, 7).to_numpy(),
+      ewma_days_reference(tss.to_numpy(), 7)
+    )
+
 
 class TestSma(unittest.TestCase):
+  def setUp(self):
+    self.x = pd.Series([float(i) for i in range(60)])
+    self.x[[5, 40, 41]] = np.nan
+
   def test_sma(self):
-    # x = pd.Series([10 for i in range(60)])
-    # x.rolling(30).mean()  # nan until 29
+    np.testing.assert_allclose(
+      sma(self.x, 30),
+      self.x.rolling(30).mean()
+    )
 
-    # x.index = [pd.to_datetime(2*i, unit='s') for i in range(len(x))]
-    # x = pd.Series([i for i in range(60)])
-    # x.index = [pd.to_datetime(2*i, unit='s') for i in range(len(x))]
-    # x.rolling('30s').mean()
+  def test_sma_time(self):
+    t = pd.Series([2 * i for i in range(60)])
+    x_time_index = self.x.copy()
+    x_time_index.index = pd.to_datetime(t, unit='s')
+    expected = x_time_index.rolling('30s').mean().to_numpy()
 
-    pass
\ No newline at end of file
+    result = sma(self.x, '30s', time_series=t)
+    np.testing.assert_allclose(result, expected)
+    self.assertTrue(result.index.equals(self.x.index))
+    np.testing.assert_allclose(sma(self.x, 30, time_series=t), expected)
+
+    # The input is not modified.
+    self.assertTrue(self.x.index.equals(pd.RangeIndex(60)))
+
+
+class TestNormalize(unittest.TestCase):
+  def setUp(self):
+    self.x = np.random.default_rng(0).uniform(0, 5, 3000)
+
+  def test_1hz(self):
+    expected = (pd.Series(self.x).rolling(30).mean()[29:] ** 4).mean() ** 0.25
+    self.assertAlmostEqual(normalize(self.x), expected)
+    self.assertAlmostEqual(
+      normalize(self.x, time_series=np.arange(3000) + 10), expected)
+
+  def test_variable_rate(self):
+    # The same signal, recorded every second or every 2 seconds.
+    x_2s = self.x[::2]
+    t_2s = np.arange(0, 3000, 2)
+    self.assertAlmostEqual(
+      normalize(x_2s, time_series=t_2s, window=30),
+      normalize(np.repeat(x_2s, 2)),
+      delta=0.01
+    )
+
+  def test_empty(self):
+    with warnings.catch_warnings():
+      warnings.simplefilter('error')
+      self.assertTrue(np.isnan(normalize([])))
+      self.assertTrue(np.isnan(normalize([], time_series=[])))
+
+  def test_shorter_than_window(self):
+    with warnings.catch_warnings():
+      warnings.simplefilter('error')
+      self.assertTrue(np.isnan(normalize(self.x[:10])))
+      self.assertTrue(
+        np.isnan(normalize(self.x[:10], time_series=np.arange(10))))
+
+
+class TestTrainingLoadState(unittest.TestCase):
+  def setUp(self):
+    self.tss = [80.0, 0.0, 120.0, 45.0, 60.0, 200.0]
+    self.dates = pd.to_datetime([
+      '2022-06-01', '2022-06-02', '2022-06-05',
+      '2022-06-05', '2022-06-06', '2022-06-20',
+    ])
+
+  def test_matches_batch(self):
+    state = TrainingLoadState(atl=10.0, ctl=30.0)
+    for date, tss in zip(self.dates, self.tss):
+      state.update(date, tss)
+
+    atl = acute_training_load(self.tss, init=10.0, dates=self.dates)
+    ctl = chronic_training_load(self.tss, init=30.0, dates=self.dates)
+    self.assertAlmostEqual(state.atl, atl.iloc[-1])
+    self.assertAlmostEqual(state.ctl, ctl.iloc[-1])
+    self.assertEqual(state.date, atl.index[-1].date())
+
+    from_history = TrainingLoadState.from_history(
+      self.tss, self.dates, atl=10.0, ctl=30.0)
+    self.assertAlmostEqual(state.atl, from_history.atl)
+    self.assertAlmostEqual(state.ctl, from_history.ctl)
+    self.assertEqual(state.date, from_history.date)
+
+  def test_out_of_order(self):
+    state = TrainingLoadState(date='2022-06-02')
+    with self.assertRaises(ValueError):
+      state.update('2022-06-01', 50.0)
+
+  def test_serialization(self):
+    state = TrainingLoadState.from_history(self.tss, self.dates)
+    self.assertEqual(state, TrainingLoadState.from_json(state.to_json()))
+    self.assertEqual(state, TrainingLoadState.from_bytes(state.to_bytes()))
+    self.assertEqual(
+      TrainingLoadState(),
+      TrainingLoadState.from_bytes(TrainingLoadState().to_bytes())
+    )
+    self.assertEqual(state.status, training_status(state.ctl - state.atl))
@@ -48,3 +48,143 @@ class TestMovingAverage(unittest.TestCase):
       0
     )
 
+
+def ewma_halflife_reference(x, half_life, t):
+  """Sample-by-sample loop, starting from 0 one second before `t[0]`."""
+  y = 0.0
+  t_prev = t[0] - 1
+  result = []
+  for x_i, t_i in zip(x, t):
+    if not np.isnan(x_i):
+      decay = 0.5 ** ((t_i - t_prev) / half_life)
+      y = decay * y + (1 - decay) * x_i
+      t_prev = t_i
+    result.append(y)
+  return np.array(result)
+
+
+class TestEwmaHalflife(unittest.TestCase):
+  def setUp(self):
+    rng = np.random.default_rng(0)
+    self.x = rng.uniform(0, 20, 5000)
+    self.t = np.cumsum(rng.choice([1, 1, 1, 2, 5, 600], 5000)).astype(float)
+    self.half_life = 20 * math.log(2)
+
+  def test_regular(self):
+    expected = pd.concat([pd.Series([0.0]), pd.Series(self.x)]).ewm(
+      halflife=self.half_life, adjust=False).mean()[1:]
+    np.testing.assert_allclose(
+      putil.ewma_halflife(self.x, self.half_life),
+      expected
+    )
+    np.testing.assert_allclose(
+      putil.ewma_halflife(self.x, self.half_life, np.arange(5000) + 30),
+      expected
+    )
+
+  def test_irregular(self):
+    np.testing.assert_allclose(
+      putil.ewma_halflife(self.x, self.half_life, self.t),
+      ewma_halflife_reference(self.x, self.half_life, self.t)
+    )
+
+  def test_nan(self):
+    x = self.x.copy()
+    x[[0, 1, 10, 11, 12, 4000]] = np.nan
+    np.testing.assert_allclose(
+      putil.ewma_halflife(x, self.half_life, self.t),
+      ewma_halflife_reference(x, self.half_life, self.t)
+    )
+
+  def test_float32(self):
+    x = self.x.copy()
+    x[[10, 4000]] = np.nan
+    for t in (None, self.t):
+      result = putil.ewma_halflife(x, self.half_life, t, dtype=np.float32)
+      self.assertEqual(result.dtype, np.float32)
+      np.testing.assert_allclose(
+        result, putil.ewma_halflife(x, self.half_life, t), rtol=1e-5)
+
+    with self.assertRaises(ValueError):
+      putil.ewma_halflife(x, self.half_life, dtype=int)
+
+  def test_series(self):
+    index = pd.RangeIndex(10, 5010)
+    result = putil.ewma_halflife(
+      pd.Series(self.x, index=index),
+      f'{self.half_life}s',
+      time_series=pd.to_datetime(self.t, unit='s'),
+    )
+    self.assertTrue(result.index.equals(index))
+    np.testing.assert_allclose(
+      result,
+      ewma_halflife_reference(self.x, self.half_life, self.t)
+    )
+
+  def test_kernels(self):
+    decay = np.exp2(-np.diff(self.t, prepend=0) / self.half_life)
+    x = np.vstack([self.x, self.x[::-1]])
+    init = np.array([5.0, 0.0])
+    expected = np.empty(x.shape)
+    putil._decay_filter_loop(x, decay, 1 - decay, init, expected)
+    result = np.empty(x.shape)
+    putil._decay_filter_blocks(x, decay, 1 - decay, init, result)
+    np.testing.assert_allclose(result, expected)
+
+
+def ewma_reference(x_arr, day_arr, alpha, init=0.0):
+  """Loop over values, with times given as numbers of days."""
+  x_avg_arr = [init + x_arr[0] * alpha]
+  for i in range(1, len(x_arr)):
+    x_avg_arr.append(
+      x_avg_arr[i-1] * (1 - alpha) ** (day_arr[i] - day_arr[i-1])
+      + x_arr[i] * alpha
+    )
+  return x_avg_arr
+
+
+class TestEwma(unittest.TestCase):
+  def setUp(self):
+    rng = np.random.default_rng(0)
+    self.days = np.cumsum(rng.choice([0, 1, 1, 1, 2, 7], 300))
+    self.x = rng.uniform(0, 200, 300)
+    self.expected = ewma_reference(self.x, self.days, 1 / 42, init=30.0)
+
+  def test_time_types(self):
+    start = datetime.date(2022, 1, 1)
+    dates = [start + datetime.timedelta(days=int(d)) for d in self.days]
+    for time_arr in (
+      self.days,
+      dates,
+      [datetime.timedelta(days=int(d)) for d in self.days],
+      np.array(dates, dtype='datetime64[D]'),
+      pd.to_datetime(dates),
+    ):
+      result = putil.ewma(self.x, time_arr, 1 / 42, init=30.0)
+      self.assertIsInstance(result, np.ndarray)
+      np.testing.assert_allclose(result, self.expected)
+
+  def test_2d(self):
+    result = putil.ewma(
+      np.vstack([self.x, 2 * self.x]),
+      self.days,
+      1 / 42,
+      init=[30.0, 60.0]
+    )
+    np.testing.assert_allclose(result[0], self.expected)
+    np.testing.assert_allclose(result[1], 2 * np.array(self.expected))
+
+  def test_empty(self):
+    result = putil.ewma([], [], 1 / 42)
+    self.assertIsInstance(result, np.ndarray)
+    self.assertEqual(result.shape, (0,))
+
+
+class TestDurationToSeconds(unittest.TestCase):
+  def test_matches_pandas(self):
+    for value in ('30s', '1.5 min', '2h', '250ms', '3 days', '0.5D'):
+      with self.subTest(value=value):
+        self.assertAlmostEqual(
+          putil.duration_to_seconds(value),
+          pd.to_timedelta(value).total_seconds()
+        )